@@ -0,0 +1,96 @@
+from datetime import datetime
+import click
+from sqlalchemy import Column, DateTime, MetaData, String, Table, false, select, text
+from src.models.user import db
+from src.migrations.versions import MIGRATIONS
+
+# Tabela de controle fora do metadata dos modelos, para não ser criada por create_all
+_metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations', _metadata,
+    Column('version', String(100), primary_key=True),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+# Chave do advisory lock do PostgreSQL que serializa as migrations entre processos
+MIGRATION_LOCK_KEY = 8342017
+
+def lock_migrations(connection):
+    """
+    Impede que dois processos apliquem migrations ao mesmo tempo; o lock vale
+    até o fim da transação de `connection`. No PostgreSQL usa um advisory lock;
+    nos demais bancos (SQLite), a primeira escrita da transação obtém o lock de
+    escrita do banco e os outros workers aguardam (busy_timeout).
+    """
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': MIGRATION_LOCK_KEY})
+        _metadata.create_all(bind=connection)
+    else:
+        connection.execute(text(
+            'CREATE TABLE IF NOT EXISTS schema_migrations ('
+            ' version VARCHAR(100) NOT NULL PRIMARY KEY,'
+            ' applied_at DATETIME NOT NULL)'
+        ))
+        connection.execute(schema_migrations.delete().where(false()))
+
+def applied_versions(connection):
+    _metadata.create_all(bind=connection)
+    return {row[0] for row in connection.execute(select(schema_migrations.c.version))}
+
+def run_migrations(engine=None):
+    """
+    Aplica, em ordem, as migrations ainda não registradas em schema_migrations.
+    Cada migration roda em sua própria transação, sob lock_migrations; a lista
+    de versões aplicadas é relida dentro do lock, então workers iniciando juntos
+    não repetem a mesma migration. Retorna as versões aplicadas.
+    """
+    engine = engine or db.engine
+    with engine.begin() as connection:
+        lock_migrations(connection)
+        done = applied_versions(connection)
+    if all(version in done for version, _ in MIGRATIONS):
+        return []
+
+    applied = []
+    for version, migration in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as connection:
+            lock_migrations(connection)
+            if version in applied_versions(connection):
+                continue
+            migration(connection)
+            connection.execute(schema_migrations.insert().values(
+                version=version, applied_at=datetime.utcnow()
+            ))
+        applied.append(version)
+    return applied
+
+@click.command('migrate')
+def migrate_command():
+    """Aplica as migrations pendentes do banco de dados."""
+    applied = run_migrations()
+    if not applied:
+        click.echo('Banco de dados já está atualizado.')
+        return
+    for version in applied:
+        click.echo(f'Aplicada: {version}')
+
+@click.command('migrations-status')
+def migrations_status_command():
+    """Lista as migrations e indica quais já foram aplicadas."""
+    with db.engine.begin() as connection:
+        done = applied_versions(connection)
+    for version, _ in MIGRATIONS:
+        click.echo(f"[{'x' if version in done else ' '}] {version}")
+
+def init_migrations(app, run_on_startup=True):
+    """
+    Registra os comandos de CLI e, por padrão, aplica as migrations pendentes
+    na inicialização (substitui o antigo db.create_all()).
+    """
+    app.cli.add_command(migrate_command)
+    app.cli.add_command(migrations_status_command)
+    if run_on_startup:
+        with app.app_context():
+            run_migrations()
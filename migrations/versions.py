@@ -0,0 +1,75 @@
+from sqlalchemy import text
+from src.models.user import db
+from src.models.indexes import uq_attendance_student_class_date, HOT_INDEXES, dedupe_attendance
+from src.models.attendance_bitmap import AttendanceBitmap
+from src.models.job import Job
+from src.models.revenue_rollup import RevenueRollup
+from src.models.billing_status import BillingStatus
+from src.models.revoked_token import RevokedToken
+
+# Cada migration recebe a conexão da transação em andamento.
+# As funções devem ser idempotentes: bancos criados por versões anteriores
+# (db.create_all + ensure_indexes) podem já ter parte do esquema.
+
+def initial_schema(connection):
+    """Cria as tabelas que ainda não existem."""
+    db.metadata.create_all(bind=connection)
+
+def attendance_unique_constraint(connection):
+    """Remove presenças duplicadas (fica a mais recente) e cria a restrição única (aluno, turma, data)."""
+    dedupe_attendance(connection)
+    uq_attendance_student_class_date.create(bind=connection, checkfirst=True)
+
+def hot_filter_indexes(connection):
+    """Índices compostos para as consultas mais frequentes."""
+    for index in HOT_INDEXES:
+        index.create(bind=connection, checkfirst=True)
+
+def attendance_bitmaps(connection):
+    """Cria a tabela de bitsets de presença e a preenche a partir de attendance."""
+    from src.utils.attendance_bitmap import rebuild_bitmaps
+    AttendanceBitmap.__table__.create(bind=connection, checkfirst=True)
+    rebuild_bitmaps(bind=connection)
+
+def jobs_table(connection):
+    """Cria a tabela da fila de jobs em segundo plano."""
+    Job.__table__.create(bind=connection, checkfirst=True)
+
+def revenue_rollup(connection):
+    """Cria o rollup mensal de receita e o preenche a partir de payment."""
+    from src.utils.revenue import rebuild_revenue_rollup
+    RevenueRollup.__table__.create(bind=connection, checkfirst=True)
+    rebuild_revenue_rollup(bind=connection)
+
+def billing_status(connection):
+    """Cria a situação de cobrança pré-calculada e a preenche a partir de student."""
+    from src.utils.billing import refresh_all
+    BillingStatus.__table__.create(bind=connection, checkfirst=True)
+    refresh_all(bind=connection)
+
+def revoked_tokens(connection):
+    """Cria a lista de revogação dos tokens de acesso."""
+    RevokedToken.__table__.create(bind=connection, checkfirst=True)
+
+def teacher_stats(connection):
+    """Preenche teacher_stats a partir das tabelas base."""
+    from src.utils.teacher_stats import rebuild_teacher_stats
+    rebuild_teacher_stats(bind=connection)
+
+def drop_teacher_monthly_revenue(connection):
+    """Remove teacher_monthly_revenue: a receita mensal por professor vem de revenue_rollup."""
+    connection.execute(text('DROP TABLE IF EXISTS teacher_monthly_revenue'))
+
+# Ordem de aplicação; a versão é o identificador gravado em schema_migrations
+MIGRATIONS = [
+    ('0001_initial_schema', initial_schema),
+    ('0002_attendance_unique_constraint', attendance_unique_constraint),
+    ('0003_hot_filter_indexes', hot_filter_indexes),
+    ('0004_attendance_bitmaps', attendance_bitmaps),
+    ('0005_jobs', jobs_table),
+    ('0006_revenue_rollup', revenue_rollup),
+    ('0007_billing_status', billing_status),
+    ('0008_revoked_tokens', revoked_tokens),
+    ('0009_teacher_stats', teacher_stats),
+    ('0010_drop_teacher_monthly_revenue', drop_teacher_monthly_revenue),
+]
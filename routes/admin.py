@@ -1,50 +1,30 @@
 from flask import Blueprint, request, jsonify
-from src.models import db, Student, DanceClass, Payment, User
-from sqlalchemy import func
+from src.models import Student, DanceClass, Payment, User
+from datetime import date
+from src.utils.statistics import get_admin_statistics
+from src.utils.pagination import paginate, wants_pagination, capped_list, with_next_cursor
+from src.utils.response_cache import cached_response
+from src.utils.serialization import json_response, PAYMENT_SCHEMA
 
 admin_bp = Blueprint("admin_bp", __name__)
 
 @admin_bp.route("/admin/dashboard", methods=["GET"])
+# Vencidos/próximos do vencimento dependem da data: o escopo do dia renova a chave diariamente
+@cached_response(lambda: ["students", "classes", "payments", "users", f"day:{date.today().isoformat()}"])
 def get_admin_dashboard_data():
     """Obter dados do dashboard administrativo (visão geral de todos os professores)"""
     try:
         # Verificar se o usuário é admin (isso seria feito com autenticação real)
         # Por enquanto, vamos assumir que a rota só é acessada por admins
 
-        total_students = Student.query.count()
-        total_classes = DanceClass.query.count()
-        total_teachers = User.query.filter_by(role='teacher').count()
-        total_admins = User.query.filter_by(role='admin').count()  # Corrigido aspas e indentação
-        total_revenue = db.session.query(func.sum(Payment.amount)).scalar() or 0
-
-        # Alunos com pagamentos vencidos (todos os professores)
-        overdue_students_count = Student.query.filter(
-            Student.payment_due_date < datetime.now().date(),
-            Student.scholarship_percentage < 100
-        ).count()
-
-        # Alunos com pagamentos próximos do vencimento (todos os professores)
-        due_soon_students_count = Student.query.filter(
-            Student.payment_due_date >= datetime.now().date(),
-            Student.payment_due_date <= datetime.now().date() + timedelta(days=7),
-            Student.scholarship_percentage < 100
-        ).count()
-
         return jsonify({
-            "statistics": {
-                "total_students": total_students,
-                "total_classes": total_classes,
-                "total_teachers": total_teachers,
-                "total_admins": total_admins,
-                "total_revenue": float(total_revenue),
-                "overdue_students_count": overdue_students_count,
-                "due_soon_students_count": due_soon_students_count
-            }
+            "statistics": get_admin_statistics()
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @admin_bp.route("/admin/teachers", methods=["GET"])
+@cached_response(lambda: ["users"])
 def get_all_teachers():
     """Listar todos os professores"""
     try:
@@ -54,29 +34,45 @@ def get_all_teachers():
         return jsonify({"error": str(e)}), 500
 
 @admin_bp.route("/admin/students", methods=["GET"])
+@cached_response(lambda: ["students"])
 def get_all_students():
     """Listar todos os alunos (para admin)"""
     try:
-        students = Student.query.all()
-        return jsonify([student.to_dict() for student in students])
+        if wants_pagination(request.args):
+            return json_response(paginate(Student.query, Student, request.args))
+        students, next_cursor = capped_list(Student.query, Student)
+        return with_next_cursor(jsonify([student.to_dict() for student in students]), next_cursor)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @admin_bp.route("/admin/classes", methods=["GET"])
+@cached_response(lambda: ["classes"])
 def get_all_classes():
     """Listar todas as turmas (para admin)"""
     try:
-        classes = DanceClass.query.all()
-        return jsonify([cls.to_dict() for cls in classes])
+        if wants_pagination(request.args):
+            return json_response(paginate(DanceClass.query, DanceClass, request.args))
+        classes, next_cursor = capped_list(DanceClass.query, DanceClass)
+        return with_next_cursor(jsonify([cls.to_dict() for cls in classes]), next_cursor)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @admin_bp.route("/admin/payments", methods=["GET"])
+@cached_response(lambda: ["payments"])
 def get_all_payments():
     """Listar todos os pagamentos (para admin)"""
     try:
-        payments = Payment.query.all()
-        return jsonify([payment.to_dict() for payment in payments])
+        if wants_pagination(request.args):
+            return json_response(paginate(Payment.query, Payment, request.args))
+        # Linhas lidas como tuplas e serializadas pelo schema compilado
+        payments, next_cursor = capped_list(Payment.query, Payment, rows=PAYMENT_SCHEMA.rows)
+        return with_next_cursor(json_response(payments), next_cursor)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
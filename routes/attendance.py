@@ -1,10 +1,22 @@
 from flask import Blueprint, request, jsonify
 from src.models import db, Attendance, Student, DanceClass
-from datetime import datetime, date
-from sqlalchemy import func
+from datetime import datetime, date, timedelta
+from sqlalchemy import func, case
+from src.utils.bulk import upsert_rows
+from src.utils.pagination import paginate, wants_pagination, capped_list, with_next_cursor
+from src.utils.serialization import json_response
+from src.utils.response_cache import cached_response, bump_scopes
+from src.utils.roster import load_roster
+from src.utils.attendance_bitmap import apply_marks, student_history
+from src.utils.attendance_stats import students_attendance_stats, parse_last_sessions
+from src.utils.periods import parse_period_args, bucket_expression, bucket_end, iter_buckets, to_date
+import uuid
 
 attendance_bp = Blueprint('attendance', __name__)
 
+# Limite de alunos por requisição nas estatísticas em lote
+MAX_BATCH_STUDENTS = 500
+
 @attendance_bp.route('/attendance', methods=['GET'])
 def get_attendance():
     """Listar registros de presença"""
@@ -25,8 +37,13 @@ def get_attendance():
             attendance_date = datetime.strptime(date_str, '%Y-%m-%d').date()
             query = query.filter(Attendance.date == attendance_date)
         
-        attendance_records = query.all()
-        return jsonify([record.to_dict() for record in attendance_records])
+        if wants_pagination(request.args):
+            return json_response(paginate(query, Attendance, request.args))
+        
+        attendance_records, next_cursor = capped_list(query, Attendance)
+        return with_next_cursor(jsonify([record.to_dict() for record in attendance_records]), next_cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -76,30 +93,23 @@ def create_attendance():
         return jsonify({'error': str(e)}), 500
 
 @attendance_bp.route('/attendance/class/<class_id>/date/<date_str>', methods=['GET'])
+@cached_response(lambda class_id, date_str: [f'class:{class_id}', 'students'])
 def get_class_attendance_by_date(class_id, date_str):
     """Obter lista de chamada de uma turma para uma data específica"""
     try:
         attendance_date = datetime.strptime(date_str, '%Y-%m-%d').date()
         
-        # Obter todos os alunos da turma
         dance_class = DanceClass.query.get_or_404(class_id)
-        students = dance_class.students.all()
-        
-        # Obter registros de presença para esta data
-        attendance_records = Attendance.query.filter_by(
-            class_id=class_id,
-            date=attendance_date
-        ).all()
         
-        # Criar dicionário de presença por aluno
-        attendance_dict = {record.student_id: record.is_present for record in attendance_records}
+        # Alunos da turma e presença na data em uma única consulta (OUTER JOIN)
+        roster = load_roster(class_id, attendance_date)
         
         # Montar resposta com todos os alunos e seu status de presença
         result = []
-        for student in students:
+        for student, is_present in roster:
             result.append({
                 'student': student.to_dict(),
-                'is_present': attendance_dict.get(student.id, None)  # None se não foi registrado
+                'is_present': is_present  # None se não foi registrado
             })
         
         return jsonify({
@@ -123,7 +133,8 @@ def bulk_create_attendance(class_id):
         attendance_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
         attendance_list = data['attendance']  # Lista de {student_id, is_present}
         
-        results = []
+        # Consolidar o lote por aluno (a última marcação enviada prevalece)
+        marks = {}
         for item in attendance_list:
             student_id = item.get('student_id')
             is_present = item.get('is_present')
@@ -131,89 +142,168 @@ def bulk_create_attendance(class_id):
             if not student_id or is_present is None:
                 continue
             
-            # Verificar se já existe registro
-            existing = Attendance.query.filter_by(
-                student_id=student_id,
-                class_id=class_id,
-                date=attendance_date
-            ).first()
+            marks[student_id] = bool(is_present)
+        
+        if marks:
+            now = datetime.utcnow()
+            rows = [{
+                'id': str(uuid.uuid4()),
+                'student_id': student_id,
+                'class_id': class_id,
+                'date': attendance_date,
+                'is_present': is_present,
+                'created_at': now,
+                'updated_at': now
+            } for student_id, is_present in marks.items()]
+            
+            # Um único INSERT ... ON CONFLICT DO UPDATE para toda a chamada
+            upsert_rows(
+                Attendance,
+                rows,
+                index_elements=['student_id', 'class_id', 'date'],
+                update_columns=['is_present', 'updated_at']
+            )
             
-            if existing:
-                existing.is_present = is_present
-                existing.updated_at = datetime.utcnow()
-                results.append(existing.to_dict())
-            else:
-                attendance = Attendance(
-                    student_id=student_id,
-                    class_id=class_id,
-                    date=attendance_date,
-                    is_present=is_present
-                )
-                db.session.add(attendance)
-                results.append(attendance.to_dict())
+            # O upsert não passa pelo ORM: atualizar bitsets e cache explicitamente
+            apply_marks([
+                (student_id, class_id, attendance_date, is_present)
+                for student_id, is_present in marks.items()
+            ])
+            bump_scopes('attendance', f'class:{class_id}')
         
         db.session.commit()
+        
+        # Uma única consulta para devolver os registros do lote
+        records = Attendance.query.filter(
+            Attendance.class_id == class_id,
+            Attendance.date == attendance_date,
+            Attendance.student_id.in_(list(marks))
+        ).all() if marks else []
+        records_by_student = {record.student_id: record for record in records}
+        results = [records_by_student[student_id].to_dict() for student_id in marks if student_id in records_by_student]
+        
         return jsonify(results), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _parse_date_range(source):
+    """Lê start_date/end_date opcionais (AAAA-MM-DD)"""
+    start_str = source.get('start_date')
+    end_str = source.get('end_date')
+    start = datetime.strptime(start_str, '%Y-%m-%d').date() if start_str else None
+    end = datetime.strptime(end_str, '%Y-%m-%d').date() if end_str else None
+    return start, end
+
 @attendance_bp.route('/attendance/student/<student_id>/stats', methods=['GET'])
 def get_student_attendance_stats(student_id):
-    """Obter estatísticas de presença de um aluno"""
+    """Obter estatísticas de presença de um aluno, com detalhamento por turma"""
     try:
-        # Contar presenças e faltas
-        total_records = Attendance.query.filter_by(student_id=student_id).count()
-        present_count = Attendance.query.filter_by(student_id=student_id, is_present=True).count()
-        absent_count = total_records - present_count
+        start, end = _parse_date_range(request.args)
+        last_sessions = parse_last_sessions(request.args.get('last_sessions'))
         
-        attendance_rate = (present_count / total_records * 100) if total_records > 0 else 0
+        stats = students_attendance_stats([student_id], start, end, last_sessions)
+        return jsonify(stats[student_id])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@attendance_bp.route('/attendance/student/<student_id>/history', methods=['GET'])
+def get_student_attendance_history(student_id):
+    """Histórico de presença de um aluno (taxa, sequência e mapa de calor).
+    
+    Lido dos bitsets anuais, sem varrer os registros de Attendance.
+    Parâmetros opcionais: start_date, end_date (padrão: últimos 12 meses) e class_id.
+    """
+    try:
+        start, end = _parse_date_range(request.args)
+        end = end or date.today()
+        start = start or end - timedelta(days=364)
+        if start > end:
+            return jsonify({'error': 'start_date deve ser anterior a end_date'}), 400
         
-        return jsonify({
-            'student_id': student_id,
-            'total_classes': total_records,
-            'present_count': present_count,
-            'absent_count': absent_count,
-            'attendance_rate': round(attendance_rate, 2)
-        })
+        return jsonify(student_history(student_id, start, end, request.args.get('class_id')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@attendance_bp.route('/attendance/students/stats', methods=['POST'])
+def get_students_attendance_stats():
+    """Obter estatísticas de presença de vários alunos de uma só vez"""
+    try:
+        data = request.get_json()
+        
+        student_ids = data.get('student_ids') if data else None
+        if not student_ids or not isinstance(student_ids, list):
+            return jsonify({'error': 'student_ids é obrigatório e deve ser uma lista'}), 400
+        if len(student_ids) > MAX_BATCH_STUDENTS:
+            return jsonify({'error': f'Máximo de {MAX_BATCH_STUDENTS} alunos por requisição'}), 400
+        
+        start, end = _parse_date_range(data)
+        last_sessions = parse_last_sessions(data.get('last_sessions'))
+        
+        stats = students_attendance_stats(student_ids, start, end, last_sessions)
+        return jsonify([stats[student_id] for student_id in dict.fromkeys(student_ids)])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @attendance_bp.route('/attendance/class/<class_id>/stats', methods=['GET'])
 def get_class_attendance_stats(class_id):
-    """Obter estatísticas de presença de uma turma"""
+    """Obter estatísticas de presença de uma turma por período.
+    
+    Parâmetros opcionais: weeks (quantidade de períodos, padrão 4),
+    granularity (day, week ou month; padrão week), start_date e end_date.
+    """
     try:
-        # Estatísticas por semana (últimas 4 semanas)
-        from datetime import timedelta
+        granularity, start, end = parse_period_args(request.args)
         
-        today = date.today()
-        weeks_data = []
+        # Uma única consulta agrupada por período
+        bucket = bucket_expression(Attendance.date, granularity).label('bucket')
+        rows = db.session.query(
+            bucket,
+            func.count(Attendance.id),
+            func.sum(case((Attendance.is_present, 1), else_=0))
+        ).filter(
+            Attendance.class_id == class_id,
+            Attendance.date >= start,
+            Attendance.date <= end
+        ).group_by(bucket).all()
         
-        for i in range(4):
-            week_start = today - timedelta(days=today.weekday() + (i * 7))
-            week_end = week_start + timedelta(days=6)
-            
-            week_attendance = Attendance.query.filter(
-                Attendance.class_id == class_id,
-                Attendance.date >= week_start,
-                Attendance.date <= week_end
-            ).all()
-            
-            total_week = len(week_attendance)
-            present_week = sum(1 for a in week_attendance if a.is_present)
-            
-            weeks_data.append({
-                'week_start': week_start.isoformat(),
-                'week_end': week_end.isoformat(),
-                'total_classes': total_week,
-                'present_count': present_week,
-                'attendance_rate': round((present_week / total_week * 100) if total_week > 0 else 0, 2)
-            })
+        totals = {to_date(row[0]): (row[1], row[2] or 0) for row in rows}
         
-        return jsonify({
+        # Incluir períodos sem registros, do mais recente para o mais antigo
+        stats = []
+        for period_start in reversed(list(iter_buckets(start, end, granularity))):
+            total, present = totals.get(period_start, (0, 0))
+            period_end = bucket_end(period_start, granularity)
+            item = {
+                'period_start': period_start.isoformat(),
+                'period_end': period_end.isoformat(),
+                'total_classes': total,
+                'present_count': present,
+                'attendance_rate': round((present / total * 100) if total > 0 else 0, 2)
+            }
+            if granularity == 'week':
+                # Campos mantidos para compatibilidade com o front end
+                item['week_start'] = item['period_start']
+                item['week_end'] = item['period_end']
+            stats.append(item)
+        
+        response = {
             'class_id': class_id,
-            'weekly_stats': weeks_data
-        })
+            'granularity': granularity,
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat(),
+            'stats': stats
+        }
+        if granularity == 'week':
+            response['weekly_stats'] = stats
+        return jsonify(response)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-
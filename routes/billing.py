@@ -0,0 +1,48 @@
+from flask import Blueprint, request, jsonify, g
+from src.utils.auth import require_auth
+from src.utils.billing import billing_alerts, ALERT_STATUSES
+from datetime import date
+
+billing_bp = Blueprint("billing_bp", __name__)
+
+@billing_bp.route("/billing/alerts", methods=["GET"])
+@require_auth
+def get_billing_alerts():
+    """Alunos vencidos e próximos do vencimento.
+    
+    Professores veem apenas os próprios alunos; admin vê todos ou filtra por
+    teacher_id. O parâmetro status (overdue ou due_soon) restringe a lista.
+    """
+    try:
+        if g.current_user.role == "admin":
+            teacher_id = request.args.get("teacher_id")
+        else:
+            teacher_id = g.current_user.id
+
+        status = request.args.get("status")
+        if status and status not in ALERT_STATUSES:
+            return jsonify({"error": f"status deve ser um de: {', '.join(ALERT_STATUSES)}"}), 400
+        statuses = (status,) if status else ALERT_STATUSES
+
+        today = date.today()
+        overdue, due_soon = [], []
+        for billing, student in billing_alerts(teacher_id=teacher_id, statuses=statuses):
+            if billing.status == "overdue":
+                overdue.append({
+                    "student": student.to_dict(),
+                    "days_overdue": (today - billing.next_due_date).days
+                })
+            else:
+                due_soon.append({
+                    "student": student.to_dict(),
+                    "days_until_due": (billing.next_due_date - today).days
+                })
+
+        return jsonify({
+            "overdue": overdue,
+            "due_soon": due_soon,
+            "overdue_count": len(overdue),
+            "due_soon_count": len(due_soon)
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,15 +1,16 @@
 from flask import Blueprint, request, jsonify
 from src.models import db, DanceClass, Student, student_classes, User # Importar User
+from src.utils.auth import get_current_user_id
+from src.utils.bulk import insert_ignore
+from src.utils.response_cache import cached_response, bump_scopes
+from src.utils.roster import load_roster
+from src.utils.schedule import check_slot
 from datetime import datetime, time
 
 dance_class_bp = Blueprint("dance_class", __name__)
 
-# Helper para obter o user_id (temporário, será substituído pela autenticação real)
-def get_current_user_id():
-    # TODO: Implementar autenticação real e obter o user_id do usuário logado
-    # Por enquanto, para testes, podemos usar um user_id fixo ou passar via header/query param
-    # Exemplo: return request.headers.get("X-User-ID", "some_default_user_id")
-    return request.args.get("user_id") # Mantendo como query param por enquanto para compatibilidade
+# Limite de alunos por requisição nas rotas de matrícula em lote
+MAX_BATCH_STUDENTS = 500
 
 @dance_class_bp.route("/classes", methods=["GET"])
 def get_classes():
@@ -19,7 +20,7 @@ def get_classes():
         if not user_id:
             return jsonify({"error": "user_id é obrigatório"}), 400
             
-        classes = DanceClass.query.filter_by(user_id=user_id).all()
+        classes = DanceClass.query.filter_by(teacher_id=user_id).all()
         return jsonify([dance_class.to_dict() for dance_class in classes])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -40,9 +41,18 @@ def create_class():
         # Converter strings de tempo para objetos time
         start_time = datetime.strptime(data["start_time"], ",%H:%M").time()
         end_time = datetime.strptime(data["end_time"], ",%H:%M").time()
+        if end_time <= start_time:
+            return jsonify({"error": "end_time deve ser posterior a start_time"}), 400
+        
+        # Horário não pode coincidir com outra turma no mesmo local ou do mesmo professor;
+        # o horário fica travado até o commit, para duas criações não passarem juntas
+        conflicts = check_slot(data["day_of_week"], start_time, end_time, data["location"], user_id)
+        if conflicts:
+            db.session.rollback()
+            return jsonify({"error": "Conflito de horário com outra turma", "conflicts": conflicts}), 409
         
         dance_class = DanceClass(
-            user_id=user_id,
+            teacher_id=user_id,
             name=data["name"],
             day_of_week=data["day_of_week"],
             start_time=start_time,
@@ -60,16 +70,17 @@ def create_class():
         return jsonify({"error": str(e)}), 500
 
 @dance_class_bp.route("/classes/<class_id>", methods=["GET"])
+@cached_response(lambda class_id: [f"class:{class_id}", f"teacher:{get_current_user_id()}", "students"])
 def get_class(class_id):
     """Obter detalhes de uma turma específica do usuário logado"""
     try:
         user_id = get_current_user_id()
-        dance_class = DanceClass.query.filter_by(id=class_id, user_id=user_id).first_or_404()
+        dance_class = DanceClass.query.filter_by(id=class_id, teacher_id=user_id).first_or_404()
         class_data = dance_class.to_dict()
         
-        # Adicionar lista de alunos da turma
-        students = Student.query.join(student_classes).filter(student_classes.c.class_id == class_id).all()
-        class_data["students"] = [student.to_dict() for student in students]
+        # Adicionar lista de alunos da turma (carregamento antecipado, sem N+1)
+        roster = load_roster(class_id)
+        class_data["students"] = [student.to_dict() for student, _ in roster]
         
         return jsonify(class_data)
     except Exception as e:
@@ -80,7 +91,7 @@ def update_class(class_id):
     """Atualizar informações de uma turma do usuário logado"""
     try:
         user_id = get_current_user_id()
-        dance_class = DanceClass.query.filter_by(id=class_id, user_id=user_id).first_or_404()
+        dance_class = DanceClass.query.filter_by(id=class_id, teacher_id=user_id).first_or_404()
         data = request.get_json()
         
         # Atualizar campos se fornecidos
@@ -97,6 +108,19 @@ def update_class(class_id):
         if "monthly_fee" in data:
             dance_class.monthly_fee = data["monthly_fee"]
         
+        if dance_class.start_time and dance_class.end_time and dance_class.end_time <= dance_class.start_time:
+            db.session.rollback()
+            return jsonify({"error": "end_time deve ser posterior a start_time"}), 400
+        
+        if {"day_of_week", "start_time", "end_time", "location"} & set(data):
+            conflicts = check_slot(
+                dance_class.day_of_week, dance_class.start_time, dance_class.end_time,
+                dance_class.location, user_id, exclude_id=dance_class.id
+            )
+            if conflicts:
+                db.session.rollback()
+                return jsonify({"error": "Conflito de horário com outra turma", "conflicts": conflicts}), 409
+        
         dance_class.updated_at = datetime.utcnow()
         db.session.commit()
         
@@ -110,7 +134,7 @@ def delete_class(class_id):
     """Excluir uma turma do usuário logado"""
     try:
         user_id = get_current_user_id()
-        dance_class = DanceClass.query.filter_by(id=class_id, user_id=user_id).first_or_404()
+        dance_class = DanceClass.query.filter_by(id=class_id, teacher_id=user_id).first_or_404()
         db.session.delete(dance_class)
         db.session.commit()
         
@@ -131,8 +155,8 @@ def add_student_to_class(class_id):
             return jsonify({"error": "student_id é obrigatório"}), 400
         
         # Verificar se o aluno e a turma existem e pertencem ao usuário
-        student = Student.query.filter_by(id=student_id, user_id=user_id).first_or_404()
-        dance_class = DanceClass.query.filter_by(id=class_id, user_id=user_id).first_or_404()
+        student = Student.query.filter_by(id=student_id, teacher_id=user_id).first_or_404()
+        dance_class = DanceClass.query.filter_by(id=class_id, teacher_id=user_id).first_or_404()
         
         # Verificar se o aluno já está na turma
         existing = db.session.query(student_classes).filter_by(
@@ -158,8 +182,8 @@ def remove_student_from_class(class_id, student_id):
     try:
         user_id = get_current_user_id()
         # Verificar se o aluno e a turma existem e pertencem ao usuário
-        student = Student.query.filter_by(id=student_id, user_id=user_id).first_or_404()
-        dance_class = DanceClass.query.filter_by(id=class_id, user_id=user_id).first_or_404()
+        student = Student.query.filter_by(id=student_id, teacher_id=user_id).first_or_404()
+        dance_class = DanceClass.query.filter_by(id=class_id, teacher_id=user_id).first_or_404()
         
         # Remover aluno da turma
         student.classes.remove(dance_class)
@@ -170,5 +194,89 @@ def remove_student_from_class(class_id, student_id):
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
+def _batch_student_ids(data):
+    """Lista de student_ids do corpo da requisição, sem repetições"""
+    student_ids = (data or {}).get("student_ids")
+    if not isinstance(student_ids, list) or not student_ids:
+        raise ValueError("student_ids deve ser uma lista não vazia")
+    if len(student_ids) > MAX_BATCH_STUDENTS:
+        raise ValueError(f"Máximo de {MAX_BATCH_STUDENTS} alunos por requisição")
+    return list(dict.fromkeys(str(student_id) for student_id in student_ids))
 
+def _owned_student_ids(student_ids, user_id):
+    """Ids, entre os informados, dos alunos que pertencem ao usuário (uma consulta IN)"""
+    rows = db.session.query(Student.id).filter(Student.id.in_(student_ids), Student.teacher_id == user_id)
+    return {student_id for (student_id,) in rows}
+
+@dance_class_bp.route("/classes/<class_id>/students/batch", methods=["POST"])
+def add_students_to_class_batch(class_id):
+    """Matricular vários alunos em uma turma do usuário logado.
+    
+    Corpo: {"student_ids": [...]}. Alunos já matriculados são ignorados.
+    """
+    try:
+        user_id = get_current_user_id()
+        student_ids = _batch_student_ids(request.get_json(silent=True))
+        DanceClass.query.filter_by(id=class_id, teacher_id=user_id).first_or_404()
 
+        owned = _owned_student_ids(student_ids, user_id)
+        enrolled = {
+            student_id for (student_id,) in db.session.query(student_classes.c.student_id).filter(
+                student_classes.c.class_id == class_id,
+                student_classes.c.student_id.in_(owned)
+            )
+        } if owned else set()
+        added = [student_id for student_id in student_ids if student_id in owned and student_id not in enrolled]
+
+        # Um único INSERT com todas as linhas; conflitos concorrentes são ignorados
+        now = datetime.utcnow()
+        insert_ignore(student_classes, [
+            {"student_id": student_id, "class_id": class_id, "created_at": now}
+            for student_id in added
+        ])
+        if added:
+            bump_scopes("students", f"teacher:{user_id}", f"class:{class_id}")
+        db.session.commit()
+
+        return jsonify({
+            "added": added,
+            "already_enrolled": [student_id for student_id in student_ids if student_id in enrolled],
+            "not_found": [student_id for student_id in student_ids if student_id not in owned]
+        }), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@dance_class_bp.route("/classes/<class_id>/students/batch", methods=["DELETE"])
+def remove_students_from_class_batch(class_id):
+    """Remover vários alunos de uma turma do usuário logado.
+    
+    Corpo: {"student_ids": [...]}.
+    """
+    try:
+        user_id = get_current_user_id()
+        student_ids = _batch_student_ids(request.get_json(silent=True))
+        DanceClass.query.filter_by(id=class_id, teacher_id=user_id).first_or_404()
+
+        owned = _owned_student_ids(student_ids, user_id)
+        removed = 0
+        if owned:
+            removed = db.session.execute(student_classes.delete().where(
+                student_classes.c.class_id == class_id,
+                student_classes.c.student_id.in_(owned)
+            )).rowcount
+        if removed:
+            bump_scopes("students", f"teacher:{user_id}", f"class:{class_id}")
+        db.session.commit()
+
+        return jsonify({
+            "removed_count": removed,
+            "not_found": [student_id for student_id in student_ids if student_id not in owned]
+        }), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,40 @@
+from flask import Blueprint, request, jsonify, g
+from src.models import db
+from src.utils.auth import require_auth
+from src.utils.export import export_response
+from src.utils.jobs import enqueue_job
+
+export_bp = Blueprint("export_bp", __name__)
+
+def run_export(kind):
+    """
+    Gera a exportação na própria requisição ou, com ?async=1, enfileira um job
+    e devolve o id para acompanhamento em /jobs/<id>.
+    """
+    filters = {key: value for key, value in request.args.items() if key != "async"}
+    if request.args.get("async") in ("1", "true"):
+        job = enqueue_job("export", {"export": kind, "filters": filters}, g.current_user.id)
+        return jsonify(job.to_dict()), 202
+    return export_response(kind, g.current_user, filters)
+
+@export_bp.route("/payments/export/xlsx", methods=["GET"])
+@require_auth
+def export_payments_xlsx():
+    """Exportar pagamentos do usuário logado (ou todos se for admin) para Excel (xlsx)"""
+    try:
+        return run_export("payments")
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@export_bp.route("/attendance/export/xlsx", methods=["GET"])
+@require_auth
+def export_attendance_xlsx():
+    """Exportar registros de presença das turmas do usuário logado para Excel (xlsx)"""
+    try:
+        return run_export("attendance")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
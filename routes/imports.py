@@ -0,0 +1,72 @@
+from flask import Blueprint, request, jsonify, g
+from src.models import db
+from src.utils.auth import require_auth
+from src.utils.importer import import_file, ensure_teacher, IMPORT_KINDS
+from src.utils.jobs import ARTIFACT_DIR, enqueue_job
+import os
+import uuid
+
+import_bp = Blueprint("import_bp", __name__)
+
+ALLOWED_EXTENSIONS = (".xlsx", ".csv")
+
+@import_bp.route("/import", methods=["POST"])
+@require_auth
+def import_data():
+    """Importar turmas, alunos e matrículas de um arquivo .xlsx ou .csv.
+    
+    Campos do formulário: file, kind (obrigatório para CSV: classes, students
+    ou enrollments), teacher_id (obrigatório para admin) e dry_run=1 para
+    apenas validar. Com ?async=1 a importação roda como job e o relatório
+    fica disponível em /jobs/<id>/download.
+    """
+    path = None
+    try:
+        file = request.files.get("file")
+        if not file or not file.filename:
+            return jsonify({"error": "Nenhum arquivo enviado"}), 400
+
+        extension = os.path.splitext(file.filename)[1].lower()
+        if extension not in ALLOWED_EXTENSIONS:
+            return jsonify({"error": "Formato não suportado. Envie um arquivo .xlsx ou .csv"}), 400
+
+        kind = request.form.get("kind") or None
+        if kind and kind not in IMPORT_KINDS:
+            return jsonify({"error": f"kind deve ser um de: {', '.join(IMPORT_KINDS)}"}), 400
+
+        if g.current_user.role == "admin":
+            teacher_id = request.form.get("teacher_id")
+            if not teacher_id:
+                return jsonify({"error": "teacher_id é obrigatório para administradores"}), 400
+            ensure_teacher(teacher_id)
+        else:
+            teacher_id = g.current_user.id
+        dry_run = request.form.get("dry_run") in ("1", "true")
+
+        # O arquivo é gravado em disco para ser lido em modo streaming (ou pelo worker)
+        os.makedirs(ARTIFACT_DIR, exist_ok=True)
+        upload = f"import-{uuid.uuid4().hex}{extension}"
+        path = os.path.join(ARTIFACT_DIR, upload)
+        file.save(path)
+
+        if request.args.get("async") == "1":
+            job = enqueue_job("import", {
+                "upload": upload,
+                "kind": kind,
+                "teacher_id": teacher_id,
+                "dry_run": dry_run
+            }, g.current_user.id)
+            path = None
+            return jsonify(job.to_dict()), 202
+
+        with open(path, "rb") as f:
+            report = import_file(f, upload, teacher_id, kind=kind, dry_run=dry_run)
+        return jsonify(report), 200 if not report["error_count"] else 207
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if path and os.path.exists(path):
+            os.remove(path)
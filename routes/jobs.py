@@ -0,0 +1,60 @@
+from flask import Blueprint, request, jsonify, send_file, g
+from src.models import db
+from src.models.job import Job
+from src.utils.auth import require_auth
+from src.utils.jobs import enqueue_job
+import os
+
+jobs_bp = Blueprint("jobs_bp", __name__)
+
+def _get_own_job(job_id):
+    job = Job.query.get_or_404(job_id)
+    if g.current_user.role != "admin" and job.owner_id != g.current_user.id:
+        return None
+    return job
+
+@jobs_bp.route("/jobs", methods=["POST"])
+@require_auth
+def create_job():
+    """Enfileirar um job em segundo plano (ex.: {"kind": "export", "params": {"export": "students"}})"""
+    try:
+        data = request.get_json()
+        if not data or "kind" not in data:
+            return jsonify({"error": "kind é obrigatório"}), 400
+
+        job = enqueue_job(data["kind"], data.get("params", {}), g.current_user.id)
+        return jsonify(job.to_dict()), 202
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@jobs_bp.route("/jobs/<job_id>", methods=["GET"])
+@require_auth
+def get_job(job_id):
+    """Obter o status de um job"""
+    try:
+        job = _get_own_job(job_id)
+        if job is None:
+            return jsonify({"error": "Acesso negado"}), 403
+        return jsonify(job.to_dict())
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@jobs_bp.route("/jobs/<job_id>/download", methods=["GET"])
+@require_auth
+def download_job_result(job_id):
+    """Baixar o arquivo gerado por um job concluído"""
+    try:
+        job = _get_own_job(job_id)
+        if job is None:
+            return jsonify({"error": "Acesso negado"}), 403
+        if job.status != "done":
+            return jsonify({"error": "Job ainda não concluído", "status": job.status}), 409
+        if not job.result_path or not os.path.exists(job.result_path):
+            return jsonify({"error": "Resultado expirado ou indisponível"}), 410
+
+        return send_file(job.result_path, as_attachment=True, download_name=job.result_name)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
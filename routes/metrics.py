@@ -0,0 +1,27 @@
+from flask import Blueprint, request, jsonify, Response
+from src.utils.auth import get_current_user
+from src.utils.metrics import render_metrics
+import hmac
+import os
+
+metrics_bp = Blueprint("metrics_bp", __name__)
+
+# Token do coletor (Prometheus): "Authorization: Bearer <METRICS_TOKEN>".
+# Sem o token, apenas administradores autenticados podem ler as métricas.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+def _has_metrics_token():
+    if not METRICS_TOKEN:
+        return False
+    return hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {METRICS_TOKEN}")
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """Métricas de latência e de consultas SQL no formato do Prometheus"""
+    if not _has_metrics_token():
+        user = get_current_user()
+        if not user:
+            return jsonify({"error": "Autenticação necessária"}), 401
+        if user.role != "admin":
+            return jsonify({"error": "Acesso negado. Apenas administradores podem acessar esta funcionalidade."}), 403
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
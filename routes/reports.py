@@ -0,0 +1,61 @@
+from flask import Blueprint, request, jsonify, g
+from src.utils.auth import require_auth
+from src.models import db
+from src.utils.jobs import enqueue_job
+from src.utils.revenue import revenue_report, year_over_year, parse_report_params
+from datetime import date
+
+reports_bp = Blueprint("reports_bp", __name__)
+
+def _teacher_filter():
+    """Professores só veem a própria receita; admin pode filtrar por teacher_id"""
+    if g.current_user.role == "admin":
+        return request.args.get("teacher_id")
+    return g.current_user.id
+
+@reports_bp.route("/reports/revenue", methods=["GET"])
+@require_auth
+def get_revenue_report():
+    """Relatório de receita por mês, professor e/ou tipo de pagamento.
+    
+    Parâmetros: start_month e end_month (AAAA-MM; padrão: ano corrente),
+    group_by (lista separada por vírgula de month, teacher_id, payment_type),
+    teacher_id (apenas admin) e payment_type. Com ?async=1, a planilha do
+    relatório é gerada por um job (acompanhe em /jobs/<id>).
+    """
+    try:
+        params = parse_report_params(request.args)
+
+        if request.args.get("async") in ("1", "true"):
+            job = enqueue_job("revenue_report", dict(params, teacher_id=_teacher_filter()), g.current_user.id)
+            return jsonify(job.to_dict()), 202
+
+        rows = revenue_report(
+            params["start_month"], params["end_month"], params["group_by"],
+            teacher_id=_teacher_filter(),
+            payment_type=params["payment_type"]
+        )
+        return jsonify({
+            "start_month": params["start_month"],
+            "end_month": params["end_month"],
+            "group_by": params["group_by"],
+            "total_revenue": sum(row["revenue"] for row in rows),
+            "rows": rows
+        })
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@reports_bp.route("/reports/revenue/yoy", methods=["GET"])
+@require_auth
+def get_revenue_year_over_year():
+    """Receita mensal de um ano comparada com o ano anterior"""
+    try:
+        year = int(request.args.get("year", date.today().year))
+        return jsonify(year_over_year(year, teacher_id=_teacher_filter()))
+    except ValueError:
+        return jsonify({"error": "year deve ser um número inteiro"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,67 @@
+from flask import Blueprint, request, jsonify, g
+from src.utils.auth import require_auth
+from src.utils.response_cache import cached_response
+from src.utils.schedule import get_schedule_index, find_conflicts, slot_to_dict, public_slot_dict
+from datetime import datetime
+
+schedule_bp = Blueprint("schedule_bp", __name__)
+
+def _teacher_filter():
+    """Professores veem apenas as próprias turmas; admin pode filtrar por teacher_id"""
+    if g.current_user.role == "admin":
+        return request.args.get("teacher_id")
+    return g.current_user.id
+
+def _slot_view(slot):
+    """Turmas de outros professores aparecem só com horário e local"""
+    if g.current_user.role == "admin" or slot.teacher_id == g.current_user.id:
+        return slot_to_dict(slot)
+    return public_slot_dict(slot)
+
+@schedule_bp.route("/schedule/week", methods=["GET"])
+@require_auth
+@cached_response(lambda **kwargs: ["classes"])
+def get_week_schedule():
+    """Grade semanal das turmas, agrupada por dia da semana e ordenada por horário"""
+    try:
+        return jsonify(get_schedule_index().week(_teacher_filter()))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@schedule_bp.route("/schedule/conflicts", methods=["GET"])
+@require_auth
+def get_schedule_conflicts():
+    """Conflitos de horário.
+    
+    Sem parâmetros, lista os pares de turmas sobrepostas no mesmo local ou com o
+    mesmo professor. Com day_of_week, start_time e end_time (HH:MM), e
+    opcionalmente location, verifica um horário candidato.
+    """
+    try:
+        teacher_id = _teacher_filter()
+
+        if "day_of_week" in request.args:
+            start_time = datetime.strptime(request.args["start_time"], "%H:%M").time()
+            end_time = datetime.strptime(request.args["end_time"], "%H:%M").time()
+            if end_time <= start_time:
+                return jsonify({"error": "end_time deve ser posterior a start_time"}), 400
+            conflicts = find_conflicts(
+                request.args["day_of_week"], start_time, end_time,
+                location=request.args.get("location"),
+                teacher_id=teacher_id,
+                exclude_id=request.args.get("exclude_class_id")
+            )
+            return jsonify({"conflicts": conflicts, "has_conflicts": bool(conflicts)})
+
+        pairs = get_schedule_index().all_conflicts(teacher_id)
+        return jsonify({
+            "conflicts": [{
+                "reason": reason,
+                "classes": [_slot_view(slot), _slot_view(other)]
+            } for reason, slot, other in pairs],
+            "has_conflicts": bool(pairs)
+        })
+    except (KeyError, ValueError):
+        return jsonify({"error": "Informe day_of_week, start_time e end_time (HH:MM)"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
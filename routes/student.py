@@ -1,23 +1,36 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify
 from ..models.student import Student
 from ..models.user import db, User
 from ..utils.auth import require_auth, filter_by_user_access, can_access_student
+from ..utils.pagination import paginate, wants_pagination, capped_list, with_next_cursor
+from .export import run_export
+from ..utils.response_cache import cached_response
+from ..utils.serialization import json_response
 from flask import g
-from openpyxl import Workbook
-from io import BytesIO
 from datetime import datetime
 
 student_bp = Blueprint("student_bp", __name__)
 
+def _students_cache_scopes():
+    # Admin vê todos os alunos; professor apenas os seus
+    if g.current_user.role == "admin":
+        return ["students"]
+    return [f"teacher:{g.current_user.id}"]
+
 @student_bp.route("/students", methods=["GET"])
 @require_auth
+@cached_response(_students_cache_scopes)
 def get_students():
     """Listar todos os alunos do usuário logado (ou todos se for admin)"""
     try:
         query = Student.query
         filtered_query = filter_by_user_access(query, Student, g.current_user)
-        students = filtered_query.all()
-        return jsonify([student.to_dict() for student in students])
+        if wants_pagination(request.args):
+            return json_response(paginate(filtered_query, Student, request.args))
+        students, next_cursor = capped_list(filtered_query, Student)
+        return with_next_cursor(jsonify([student.to_dict() for student in students]), next_cursor)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -109,45 +122,8 @@ def delete_student(student_id):
 def export_students_xlsx():
     """Exportar lista de alunos para um arquivo Excel (xlsx)"""
     try:
-        query = Student.query
-        filtered_query = filter_by_user_access(query, Student, g.current_user)
-        students = filtered_query.all()
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Alunos ABAA"
-
-        headers = [
-            "ID", "Nome", "Telefone", "Data de Vencimento",
-            "Percentual de Bolsa", "Status da Bolsa", "Valor a Pagar (Mensalidade)"
-        ]
-        ws.append(headers)
-
-        for student in students:
-            base_monthly_fee = 120.00  # TODO: Este valor deve ser configurável por turma/professor
-            discounted_amount = student.calculate_discounted_amount(base_monthly_fee)
-
-            ws.append([
-                student.id,
-                student.name,
-                student.phone_number,
-                student.payment_due_date.strftime("%d/%m/%Y") if student.payment_due_date else "",
-                f"{student.scholarship_percentage}%",
-                student.get_scholarship_status(),
-                f"R$ {discounted_amount:.2f}"
-            ])
-
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-
-        return send_file(
-            output,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            as_attachment=True,
-            download_name="alunos_abaa.xlsx"
-        )
-
+        # Com ?async=1 a planilha é gerada pelo worker de jobs
+        return run_export("students")
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
@@ -1,6 +1,8 @@
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, request, jsonify
 from ..models.user import User, db
-from ..utils.auth import require_admin, require_auth
+from ..utils.auth import require_admin, require_auth, load_current_user, invalidate_user
+from ..utils.tokens import revoke_user_tokens
+from ..utils.teacher_stats import get_stats_for_teacher
 
 teacher_bp = Blueprint("teacher_bp", __name__)
 
@@ -70,6 +72,7 @@ def update_teacher(teacher_id):
         teacher.profile_picture_url = data.get("profile_picture_url", teacher.profile_picture_url)
         
         db.session.commit()
+        invalidate_user(teacher.id)
         return jsonify(teacher.to_dict())
     except Exception as e:
         db.session.rollback()
@@ -91,6 +94,8 @@ def delete_teacher(teacher_id):
         
         db.session.delete(teacher)
         db.session.commit()
+        invalidate_user(teacher.id)
+        revoke_user_tokens(teacher.id)
         return jsonify({"message": "Professor deletado com sucesso"})
     except Exception as e:
         db.session.rollback()
@@ -103,11 +108,13 @@ def get_teacher_stats(teacher_id):
     try:
         teacher = User.query.filter_by(id=teacher_id, role='teacher').first_or_404()
         
+        teacher_stats = get_stats_for_teacher(teacher.id)
+        
         stats = {
             "teacher_info": teacher.to_dict(),
-            "total_students": len(teacher.students),
-            "total_classes": len(teacher.classes),
-            "total_private_combos": len(teacher.private_class_combos)
+            "total_students": teacher_stats["student_count"],
+            "total_classes": teacher_stats["class_count"],
+            "total_private_combos": teacher_stats["combo_count"]
         }
         
         return jsonify(stats)
@@ -119,7 +126,7 @@ def get_teacher_stats(teacher_id):
 def get_my_profile():
     """Obter perfil do usuário logado"""
     try:
-        return jsonify(g.current_user.to_dict())
+        return jsonify(load_current_user().to_dict())
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -129,19 +136,21 @@ def update_my_profile():
     """Atualizar perfil do usuário logado"""
     try:
         data = request.get_json()
+        user = load_current_user()
         
         # Verificar se o novo email já existe (se estiver sendo alterado)
-        if data.get("email") and data["email"] != g.current_user.email:
+        if data.get("email") and data["email"] != user.email:
             existing_user = User.query.filter_by(email=data["email"]).first()
             if existing_user:
                 return jsonify({"error": "Email já está em uso"}), 400
         
-        g.current_user.email = data.get("email", g.current_user.email)
-        g.current_user.name = data.get("name", g.current_user.name)
-        g.current_user.profile_picture_url = data.get("profile_picture_url", g.current_user.profile_picture_url)
+        user.email = data.get("email", user.email)
+        user.name = data.get("name", user.name)
+        user.profile_picture_url = data.get("profile_picture_url", user.profile_picture_url)
         
         db.session.commit()
-        return jsonify(g.current_user.to_dict())
+        invalidate_user(user.id)
+        return jsonify(user.to_dict())
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
+from src.utils.photos import save_upload, schedule_variants, variant_filename, missing_variants, PhotoTooLarge, InvalidPhoto, VARIANTS
 import os
-import uuid
 
 upload_bp = Blueprint("upload_bp", __name__)
 
@@ -19,10 +19,27 @@ def upload_photo():
     if file.filename == "":
         return jsonify({"error": "Nenhum arquivo selecionado"}), 400
     if file and allowed_file(file.filename):
-        filename = str(uuid.uuid4()) + "." + file.filename.rsplit(".", 1)[1].lower()
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
-        return jsonify({"photo_url": f"/static/photos/{filename}"}), 200
-    return jsonify({"error": "Tipo de arquivo não permitido"}), 400
+        extension = file.filename.rsplit(".", 1)[1].lower()
+        try:
+            content_hash, filename = save_upload(file.stream, UPLOAD_FOLDER, extension)
+        except PhotoTooLarge as e:
+            return jsonify({"error": str(e)}), 413
+        except InvalidPhoto as e:
+            return jsonify({"error": str(e)}), 400
 
+        # Miniatura e versão para web são geradas em segundo plano. Só as que já
+        # existem vão como <variante>_url; as demais ficam em pending_variants,
+        # com a URL em que estarão disponíveis (determinística pelo hash)
+        pending = missing_variants(UPLOAD_FOLDER, content_hash)
+        if pending:
+            schedule_variants(UPLOAD_FOLDER, filename, content_hash)
 
+        response = {"photo_url": f"/static/photos/{filename}", "pending_variants": {}}
+        for variant in VARIANTS:
+            url = f"/static/photos/{variant_filename(content_hash, variant)}"
+            if variant in pending:
+                response["pending_variants"][variant] = url
+            else:
+                response[f"{variant}_url"] = url
+        return jsonify(response), 200
+    return jsonify({"error": "Tipo de arquivo não permitido"}), 400
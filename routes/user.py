@@ -1,7 +1,8 @@
-from flask import Blueprint, jsonify, request, session, redirect, url_for
+from flask import Blueprint, jsonify, request, g, session
 from src.models.user import User, db
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
+from src.utils.auth import invalidate_user, require_auth, require_admin, ALLOW_LEGACY_USER_ID
+from src.utils.tokens import issue_token, revoke_token, revoke_user_tokens
+from src.utils.google_tokens import verify_google_id_token
 import os
 
 user_bp = Blueprint("user", __name__)
@@ -19,11 +20,8 @@ def google_auth():
         return jsonify({"error": "Token não fornecido"}), 400
 
     try:
-        # Verificar o token de ID do Google
-        idinfo = id_token.verify_oauth2_token(token, google_requests.Request(), CLIENT_ID)
-
-        if idinfo["iss"] not in ["accounts.google.com", "https://accounts.google.com"]:
-            raise ValueError("Wrong issuer.")
+        # Verificar o token de ID do Google (certificados em cache local)
+        idinfo = verify_google_id_token(token, CLIENT_ID)
 
         user_google_id = idinfo["sub"]
         user_email = idinfo["email"]
@@ -52,12 +50,19 @@ def google_auth():
             user.name = user_name
             user.profile_picture_url = user_picture
             db.session.commit()
+            invalidate_user(user.id)
 
-        # Armazenar informações do usuário na sessão (ou retornar JWT)
-        session["user_id"] = user.id
-        session["user_role"] = user.role
+        # Sessão por cookie mantida apenas enquanto a identificação antiga estiver habilitada
+        if ALLOW_LEGACY_USER_ID:
+            session["user_id"] = user.id
+            session["user_role"] = user.role
 
-        return jsonify(user.to_dict()), 200
+        # Token assinado enviado pelo front-end em "Authorization: Bearer <token>"
+        token, expires_at = issue_token(user)
+        data = user.to_dict()
+        data["token"] = token
+        data["token_expires_at"] = expires_at.isoformat()
+        return jsonify(data), 200
 
     except ValueError as e:
         return jsonify({"error": f"Token inválido: {str(e)}"}), 401
@@ -66,43 +71,45 @@ def google_auth():
         return jsonify({"error": f"Erro na autenticação: {str(e)}"}), 500
 
 @user_bp.route("/logout", methods=["POST"])
+@require_auth
 def logout():
+    claims = g.get("token_claims")
+    if claims:
+        revoke_token(claims)
     session.pop("user_id", None)
     session.pop("user_role", None)
     return jsonify({"message": "Logout realizado com sucesso"}), 200
 
 @user_bp.route("/me", methods=["GET"])
+@require_auth
 def get_current_user():
-    user_id = session.get("user_id")
-    if not user_id:
-        return jsonify({"error": "Não autenticado"}), 401
-    
-    user = User.query.get(user_id)
+    user = User.query.get(g.current_user.id)
     if not user:
         return jsonify({"error": "Usuário não encontrado"}), 404
     
     return jsonify(user.to_dict()), 200
 
 @user_bp.route("/users", methods=["GET"])
+@require_admin
 def get_users():
     # Apenas administradores podem listar todos os usuários
-    if session.get("user_role") != "admin":
-        return jsonify({"error": "Acesso negado"}), 403
     users = User.query.all()
     return jsonify([user.to_dict() for user in users])
 
 @user_bp.route("/users/<user_id>", methods=["GET"])
+@require_auth
 def get_user(user_id):
     # Usuário pode ver seus próprios dados, admin pode ver qualquer um
-    if session.get("user_id") != user_id and session.get("user_role") != "admin":
+    if g.current_user.id != user_id and g.current_user.role != "admin":
         return jsonify({"error": "Acesso negado"}), 403
     user = User.query.get_or_404(user_id)
     return jsonify(user.to_dict())
 
 @user_bp.route("/users/<user_id>", methods=["PUT"])
+@require_auth
 def update_user(user_id):
     # Usuário pode atualizar seus próprios dados, admin pode atualizar qualquer um
-    if session.get("user_id") != user_id and session.get("user_role") != "admin":
+    if g.current_user.id != user_id and g.current_user.role != "admin":
         return jsonify({"error": "Acesso negado"}), 403
     
     user = User.query.get_or_404(user_id)
@@ -111,19 +118,24 @@ def update_user(user_id):
     user.email = data.get("email", user.email)
     user.profile_picture_url = data.get("profile_picture_url", user.profile_picture_url)
     # Apenas admin pode mudar o role
-    if session.get("user_role") == "admin" and "role" in data:
+    role_changed = False
+    if g.current_user.role == "admin" and "role" in data and data["role"] != user.role:
         user.role = data["role"]
+        role_changed = True
     db.session.commit()
+    invalidate_user(user.id)
+    # Tokens emitidos com o papel antigo deixam de valer
+    if role_changed:
+        revoke_user_tokens(user.id)
     return jsonify(user.to_dict())
 
 @user_bp.route("/users/<user_id>", methods=["DELETE"])
+@require_admin
 def delete_user(user_id):
     # Apenas administradores podem deletar usuários
-    if session.get("user_role") != "admin":
-        return jsonify({"error": "Acesso negado"}), 403
     user = User.query.get_or_404(user_id)
     db.session.delete(user)
     db.session.commit()
+    invalidate_user(user_id)
+    revoke_user_tokens(user_id)
     return "", 204
-
-
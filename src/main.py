@@ -3,9 +3,22 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask, jsonify
 from flask_cors import CORS
 from src.models.user import db
+from src.utils.database import configure_database
+from src.migrations import init_migrations
+from src.models.teacher_stats import TeacherStats
+from src.models.cache_version import CacheVersion
+from src.utils.teacher_stats import init_teacher_stats
+from src.utils.response_cache import init_response_cache
+from src.utils.attendance_bitmap import init_attendance_bitmaps
+from src.utils.jobs import init_jobs
+from src.utils.revenue import init_revenue
+from src.utils.billing import init_billing
+from src.utils.metrics import init_metrics
+from src.utils.importer import init_importer
+from src.utils.static_files import init_static, send_static
 from src.routes.user import user_bp
 from src.routes.student import student_bp
 from src.routes.dance_class import dance_class_bp
@@ -14,9 +27,18 @@ from src.routes.attendance import attendance_bp
 from src.routes.dashboard import dashboard_bp
 from src.routes.upload import upload_bp
 from src.routes.admin import admin_bp
+from src.routes.export import export_bp
+from src.routes.jobs import jobs_bp
+from src.routes.reports import reports_bp
+from src.routes.billing import billing_bp
+from src.routes.metrics import metrics_bp
+from src.routes.imports import import_bp
+from src.routes.schedule import schedule_bp
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+# Limite do corpo das requisições (fotos e planilhas de importação); acima dele a resposta é 413
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', str(16 * 1024 * 1024)))
 
 # Habilitar CORS para todas as rotas
 CORS(app, resources={r"/api/*": {"origins": "http://localhost:5173"}})
@@ -29,11 +51,34 @@ app.register_blueprint(attendance_bp, url_prefix='/api')
 app.register_blueprint(dashboard_bp, url_prefix='/api')
 app.register_blueprint(upload_bp, url_prefix="/api")
 app.register_blueprint(admin_bp, url_prefix="/api")
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+app.register_blueprint(export_bp, url_prefix="/api")
+app.register_blueprint(jobs_bp, url_prefix="/api")
+app.register_blueprint(reports_bp, url_prefix="/api")
+app.register_blueprint(billing_bp, url_prefix="/api")
+app.register_blueprint(metrics_bp, url_prefix="/api")
+app.register_blueprint(import_bp, url_prefix="/api")
+app.register_blueprint(schedule_bp, url_prefix="/api")
+# Banco configurado pelo ambiente (DATABASE_URL, pool etc.); SQLite local por padrão
+configure_database(app, os.path.join(os.path.dirname(__file__), 'database', 'app.db'))
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
-with app.app_context():
-    db.create_all()
+# Esquema criado e atualizado pelas migrations (defina RUN_MIGRATIONS=0 para usar só `flask migrate`)
+init_migrations(app, run_on_startup=os.environ.get('RUN_MIGRATIONS', '1') != '0')
+init_teacher_stats(app)
+init_response_cache(app)
+init_attendance_bitmaps(app)
+init_jobs(app)
+init_revenue(app)
+init_billing(app)
+init_metrics(app)
+init_importer(app)
+
+init_static(app)
+
+@app.errorhandler(413)
+def request_entity_too_large(e):
+    limit = app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
+    return jsonify({"error": f"Requisição maior que o limite de {limit} MB"}), 413
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
@@ -42,14 +87,17 @@ def serve(path):
     if static_folder_path is None:
             return "Static folder not configured", 404
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
+    # Arquivos com hash no nome são imutáveis; os demais são revalidados via ETag
+    if path != "":
+        response = send_static(static_folder_path, path)
+        if response is not None:
+            return response
+
+    # Rotas do SPA caem no index.html, sempre revalidado
+    response = send_static(static_folder_path, 'index.html', cache_control='no-cache')
+    if response is not None:
+        return response
+    return "index.html not found", 404
 
 
 if __name__ == '__main__':
@@ -0,0 +1,24 @@
+from src.models.user import db
+from datetime import datetime
+
+# 366 dias cabem em 46 bytes (um bit por dia do ano)
+BITMAP_BYTES = 46
+
+class AttendanceBitmap(db.Model):
+    """
+    Representação compacta do histórico de presença de um aluno em uma turma
+    durante um ano: um bit por dia do ano. `recorded_bits` marca os dias com
+    chamada registrada e `present_bits` os dias em que o aluno esteve presente.
+    Mantida em sincronia com Attendance por src/utils/attendance_bitmap.py.
+    """
+    __tablename__ = 'attendance_bitmap'
+
+    student_id = db.Column(db.String(36), db.ForeignKey('student.id', ondelete='CASCADE'), primary_key=True)
+    class_id = db.Column(db.String(36), db.ForeignKey('dance_class.id', ondelete='CASCADE'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)
+    recorded_bits = db.Column(db.LargeBinary(BITMAP_BYTES), nullable=False)
+    present_bits = db.Column(db.LargeBinary(BITMAP_BYTES), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<AttendanceBitmap {self.student_id} {self.class_id} {self.year}>'
@@ -0,0 +1,37 @@
+from src.models.user import db
+from datetime import datetime
+
+class BillingStatus(db.Model):
+    """
+    Situação de cobrança pré-calculada de cada aluno.
+    status: overdue, due_soon, ok, scholarship (bolsa integral) ou no_due_date.
+    Atualizada nas gravações de Student/Payment e recalculada diariamente
+    por src/utils/billing.py.
+    """
+    __tablename__ = 'billing_status'
+
+    student_id = db.Column(db.String(36), db.ForeignKey('student.id', ondelete='CASCADE'), primary_key=True)
+    teacher_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=True)
+    status = db.Column(db.String(20), nullable=False)
+    next_due_date = db.Column(db.Date, nullable=True)
+    days_overdue = db.Column(db.Integer, nullable=False, default=0)
+    computed_on = db.Column(db.Date, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_billing_status_teacher_status', 'teacher_id', 'status'),
+        db.Index('ix_billing_status_status', 'status'),
+    )
+
+    def __repr__(self):
+        return f'<BillingStatus {self.student_id} {self.status}>'
+
+    def to_dict(self):
+        return {
+            'student_id': self.student_id,
+            'teacher_id': self.teacher_id,
+            'status': self.status,
+            'next_due_date': self.next_due_date.isoformat() if self.next_due_date else None,
+            'days_overdue': self.days_overdue,
+            'computed_on': self.computed_on.isoformat() if self.computed_on else None
+        }
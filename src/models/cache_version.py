@@ -0,0 +1,14 @@
+from src.models.user import db
+
+class CacheVersion(db.Model):
+    """
+    Contador de alterações por escopo (ex.: "teacher:<id>", "class:<id>").
+    Usado para invalidar o cache de respostas de forma consistente entre workers.
+    """
+    __tablename__ = 'cache_version'
+
+    scope = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<CacheVersion {self.scope}={self.version}>'
@@ -0,0 +1,92 @@
+from sqlalchemy import text
+from src.models.user import db
+from src.models import Attendance, Student, DanceClass, Payment, User
+
+# Índices e restrições declarados fora das classes de modelo para que possam
+# ser criados também em bancos já existentes (via migrations, ver src/migrations)
+
+# Um único registro de presença por aluno, turma e data.
+# Serve de alvo para o INSERT ... ON CONFLICT da chamada em lote.
+uq_attendance_student_class_date = db.Index(
+    'uq_attendance_student_class_date',
+    Attendance.student_id, Attendance.class_id, Attendance.date,
+    unique=True
+)
+
+# Lista de chamada e estatísticas semanais por turma
+ix_attendance_class_date = db.Index(
+    'ix_attendance_class_date',
+    Attendance.class_id, Attendance.date
+)
+
+# Estatísticas de presença por aluno
+ix_attendance_student_present = db.Index(
+    'ix_attendance_student_present',
+    Attendance.student_id, Attendance.is_present
+)
+
+# Vencidos/próximos do vencimento (admin filtra só pela data)
+ix_student_payment_due_date = db.Index(
+    'ix_student_payment_due_date',
+    Student.payment_due_date
+)
+
+# Alunos e turmas por professor (alunos já ordenados pelo vencimento)
+ix_student_teacher_id_due_date = db.Index(
+    'ix_student_teacher_id_due_date',
+    Student.teacher_id, Student.payment_due_date
+)
+ix_dance_class_teacher_id = db.Index('ix_dance_class_teacher_id', DanceClass.teacher_id)
+
+# Pagamentos por aluno, por data e receita do professor por período
+ix_payment_student = db.Index('ix_payment_student', Payment.student_id)
+ix_payment_date = db.Index('ix_payment_date', Payment.payment_date)
+ix_payment_teacher_date = db.Index(
+    'ix_payment_teacher_date',
+    Payment.teacher_id, Payment.payment_date
+)
+
+# Contagem e listagem de usuários por papel
+ix_user_role = db.Index('ix_user_role', User.role)
+
+HOT_INDEXES = [
+    ix_attendance_class_date,
+    ix_attendance_student_present,
+    ix_student_payment_due_date,
+    ix_student_teacher_id_due_date,
+    ix_dance_class_teacher_id,
+    ix_payment_student,
+    ix_payment_date,
+    ix_payment_teacher_date,
+    ix_user_role,
+]
+
+ALL_INDEXES = [uq_attendance_student_class_date] + HOT_INDEXES
+
+def dedupe_attendance(connection):
+    """
+    Remove presenças duplicadas de (aluno, turma, data), mantendo a marcação
+    mais recente (updated_at, depois created_at). Necessário antes de criar
+    uq_attendance_student_class_date em bancos antigos.
+    """
+    connection.execute(text(
+        "DELETE FROM attendance WHERE id IN ("
+        "  SELECT id FROM ("
+        "    SELECT id, ROW_NUMBER() OVER ("
+        "      PARTITION BY student_id, class_id, date"
+        "      ORDER BY COALESCE(updated_at, created_at) DESC, created_at DESC, id DESC"
+        "    ) AS position FROM attendance"
+        "  ) ranked WHERE position > 1"
+        ")"
+    ))
+
+def ensure_indexes(indexes=None):
+    """
+    Cria os índices que ainda não existem no banco. Antes do índice único de
+    presença, remove as duplicatas que impediriam sua criação.
+    """
+    with db.engine.begin() as connection:
+        for index in indexes or ALL_INDEXES:
+            if index is uq_attendance_student_class_date:
+                dedupe_attendance(connection)
+            index.create(bind=connection, checkfirst=True)
@@ -0,0 +1,32 @@
+from src.models.user import db
+
+class RevenueRollup(db.Model):
+    """
+    Receita pré-agregada por professor, mês (AAAA-MM) e tipo de pagamento.
+    Mantida incrementalmente a partir de Payment por src/utils/revenue.py;
+    é a fonte dos relatórios e das receitas dos dashboards. Cada pagamento é
+    atribuído a Payment.teacher_id e ao mês de payment_date.
+    """
+    __tablename__ = 'revenue_rollup'
+
+    teacher_id = db.Column(db.String(36), db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)
+    payment_type = db.Column(db.String(50), primary_key=True)
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    payment_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_revenue_rollup_month', 'month'),
+    )
+
+    def __repr__(self):
+        return f'<RevenueRollup {self.teacher_id} {self.month} {self.payment_type}>'
+
+    def to_dict(self):
+        return {
+            'teacher_id': self.teacher_id,
+            'month': self.month,
+            'payment_type': self.payment_type,
+            'revenue': float(self.revenue) if self.revenue else 0.0,
+            'payment_count': self.payment_count
+        }
@@ -0,0 +1,20 @@
+from src.models.user import db
+from datetime import datetime
+
+class RevokedToken(db.Model):
+    """
+    Revogação de tokens de acesso. Cada linha revoga um token específico (jti)
+    ou todos os tokens de um usuário emitidos até revoked_at (user_id).
+    Os workers sincronizam esta tabela em memória (src/utils/tokens.py).
+    """
+    __tablename__ = 'revoked_token'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    jti = db.Column(db.String(32), nullable=True)
+    user_id = db.Column(db.String(36), nullable=True)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Depois desta data todos os tokens afetados já expiraram e a linha pode ser removida
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<RevokedToken {self.jti or self.user_id}>'
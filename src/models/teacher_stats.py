@@ -0,0 +1,27 @@
+from src.models.user import db
+from datetime import datetime
+
+class TeacherStats(db.Model):
+    """
+    Totais materializados por professor, mantidos incrementalmente
+    pelos eventos de sessão em src/utils/teacher_stats.py.
+    """
+    __tablename__ = 'teacher_stats'
+
+    teacher_id = db.Column(db.String(36), db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    student_count = db.Column(db.Integer, nullable=False, default=0)
+    class_count = db.Column(db.Integer, nullable=False, default=0)
+    combo_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<TeacherStats {self.teacher_id}>'
+
+    def to_dict(self):
+        return {
+            'teacher_id': self.teacher_id,
+            'student_count': self.student_count,
+            'class_count': self.class_count,
+            'combo_count': self.combo_count,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
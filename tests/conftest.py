@@ -0,0 +1,95 @@
+import os
+import sys
+import tempfile
+import uuid
+from datetime import time
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Banco SQLite descartável e artefatos em diretório temporário, antes de importar a aplicação
+_TMP_DIR = tempfile.mkdtemp(prefix='abaa-tests-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}")
+os.environ.setdefault('JOB_ARTIFACT_DIR', os.path.join(_TMP_DIR, 'artifacts'))
+os.environ.setdefault('GOOGLE_CERTS_CACHE', os.path.join(_TMP_DIR, 'google_certs.json'))
+os.environ.setdefault('AUTH_TOKEN_SECRET', 'test-secret')
+
+from src.main import app as flask_app
+from src.models import db, User, Student, DanceClass
+from src.utils.tokens import issue_token
+
+def reset_process_caches():
+    """Limpa os caches locais ao processo entre os testes."""
+    from src.utils import auth, billing, response_cache, schedule
+    auth._principal_cache.clear()
+    response_cache._response_cache.clear()
+    schedule._cached.update(version=None, index=None)
+    billing._fresh_on = None
+
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        yield flask_app
+        db.session.rollback()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+        reset_process_caches()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_user(app):
+    def factory(role='teacher', **kwargs):
+        suffix = uuid.uuid4().hex[:8]
+        user = User(
+            google_id=kwargs.pop('google_id', f'google-{suffix}'),
+            email=kwargs.pop('email', f'{suffix}@example.com'),
+            name=kwargs.pop('name', f'Usuário {suffix}'),
+            role=role,
+            **kwargs
+        )
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return factory
+
+@pytest.fixture
+def make_student(app):
+    def factory(teacher, **kwargs):
+        kwargs.setdefault('name', f'Aluno {uuid.uuid4().hex[:6]}')
+        kwargs.setdefault('phone_number', f'119{uuid.uuid4().int % 10**8:08d}')
+        kwargs.setdefault('scholarship_percentage', 0)
+        kwargs['teacher_id'] = teacher.id
+        student = Student(**kwargs)
+        db.session.add(student)
+        db.session.commit()
+        return student
+    return factory
+
+@pytest.fixture
+def make_class(app):
+    def factory(teacher, **kwargs):
+        kwargs.setdefault('name', f'Turma {uuid.uuid4().hex[:6]}')
+        kwargs.setdefault('day_of_week', 'segunda')
+        kwargs.setdefault('start_time', time(18, 0))
+        kwargs.setdefault('end_time', time(19, 0))
+        kwargs.setdefault('location', f'Sala {uuid.uuid4().hex[:4]}')
+        kwargs.setdefault('monthly_fee', 120)
+        kwargs['teacher_id'] = teacher.id
+        dance_class = DanceClass(**kwargs)
+        db.session.add(dance_class)
+        db.session.commit()
+        return dance_class
+    return factory
+
+@pytest.fixture
+def auth_headers(app):
+    def factory(user):
+        token, _ = issue_token(user)
+        return {'Authorization': f'Bearer {token}'}
+    return factory
@@ -0,0 +1,136 @@
+import threading
+import time as clock
+import uuid
+from datetime import date, datetime, timedelta
+import pytest
+from src.models import db, Attendance
+from src.models.attendance_bitmap import AttendanceBitmap
+from src.utils.attendance_bitmap import apply_marks, rebuild_bitmaps, student_history, _to_int, _day_index
+
+def _bits(student, dance_class, year):
+    bitmap = db.session.get(AttendanceBitmap, (student.id, dance_class.id, year))
+    db.session.refresh(bitmap)
+    return _to_int(bitmap.recorded_bits), _to_int(bitmap.present_bits)
+
+def test_orm_writes_keep_bitmaps_in_sync(make_user, make_student, make_class):
+    teacher = make_user()
+    student, dance_class = make_student(teacher), make_class(teacher)
+    day = date(2026, 3, 2)
+
+    record = Attendance(student_id=student.id, class_id=dance_class.id, date=day, is_present=True)
+    db.session.add(record)
+    db.session.commit()
+    assert _bits(student, dance_class, 2026) == (1 << _day_index(day), 1 << _day_index(day))
+
+    record.is_present = False
+    db.session.commit()
+    assert _bits(student, dance_class, 2026) == (1 << _day_index(day), 0)
+
+    db.session.delete(record)
+    db.session.commit()
+    assert _bits(student, dance_class, 2026) == (0, 0)
+
+def test_concurrent_marks_on_the_same_bitmap_are_not_lost(app, make_user, make_student, make_class):
+    teacher = make_user()
+    student, dance_class = make_student(teacher), make_class(teacher)
+    engine = db.engine
+    days = [date(2026, 1, 1) + timedelta(days=offset) for offset in range(40)]
+    errors = []
+
+    def mark(day):
+        try:
+            with engine.begin() as connection:
+                apply_marks([(student.id, dance_class.id, day, True)], bind=connection)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=mark, args=(day,)) for day in days]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    expected = sum(1 << _day_index(day) for day in days)
+    assert _bits(student, dance_class, 2026) == (expected, expected)
+
+def test_deleting_student_or_class_removes_bitmaps(make_user, make_student, make_class):
+    teacher = make_user()
+    student, dance_class, other_class = make_student(teacher), make_class(teacher), make_class(teacher)
+    apply_marks([
+        (student.id, dance_class.id, date(2026, 3, 2), True),
+        (student.id, other_class.id, date(2026, 3, 2), True),
+    ])
+    db.session.commit()
+
+    db.session.delete(other_class)
+    db.session.commit()
+    assert db.session.get(AttendanceBitmap, (student.id, other_class.id, 2026)) is None
+
+    db.session.delete(student)
+    db.session.commit()
+    assert db.session.query(AttendanceBitmap).filter_by(student_id=student.id).count() == 0
+
+def _row_scan_history(student_id, start, end):
+    """Abordagem por varredura: lê os registros do período e monta totais e mapa de calor."""
+    rows = db.session.query(Attendance.date, Attendance.is_present).filter(
+        Attendance.student_id == student_id,
+        Attendance.date >= start,
+        Attendance.date <= end
+    ).all()
+    heatmap = {}
+    for day, is_present in rows:
+        heatmap[day] = heatmap.get(day, True) and bool(is_present)
+    present = sum(1 for _, is_present in rows if is_present)
+    return len(rows), present, heatmap
+
+def _seed_history(student_id, class_ids, other_students, start, days):
+    """Um registro por dia e turma para o aluno medido, mais registros de outros alunos."""
+    now = datetime.utcnow()
+    rows = []
+    for class_id in class_ids:
+        for offset in range(days):
+            rows.append({
+                'id': str(uuid.uuid4()), 'student_id': student_id, 'class_id': class_id,
+                'date': start + timedelta(days=offset), 'is_present': offset % 4 != 0,
+                'created_at': now, 'updated_at': now
+            })
+    for other_id in other_students:
+        for offset in range(days):
+            rows.append({
+                'id': str(uuid.uuid4()), 'student_id': other_id, 'class_id': class_ids[0],
+                'date': start + timedelta(days=offset), 'is_present': True,
+                'created_at': now, 'updated_at': now
+            })
+    for index in range(0, len(rows), 5000):
+        db.session.execute(Attendance.__table__.insert(), rows[index:index + 5000])
+    db.session.commit()
+    return len(rows)
+
+@pytest.mark.benchmark
+def test_benchmark_history_bitmaps_against_row_scan(make_user, make_student, make_class):
+    teacher = make_user()
+    student = make_student(teacher)
+    class_ids = [make_class(teacher).id for _ in range(10)]
+    start = date(2023, 1, 1)
+    days = 3 * 365
+    other_students = [make_student(teacher).id for _ in range(85)]
+    total_rows = _seed_history(student.id, class_ids, other_students, start, days)
+    rebuild_bitmaps()
+    db.session.commit()
+    assert total_rows >= 100_000
+    end = start + timedelta(days=days - 1)
+
+    started = clock.perf_counter()
+    scan_total, scan_present, scan_heatmap = _row_scan_history(student.id, start, end)
+    scan_seconds = clock.perf_counter() - started
+
+    started = clock.perf_counter()
+    history = student_history(student.id, start, end)
+    bitmap_seconds = clock.perf_counter() - started
+
+    print(f'\n{total_rows} registros: varredura {scan_seconds * 1000:.1f} ms, '
+          f'bitsets {bitmap_seconds * 1000:.1f} ms')
+    assert (history['total_classes'], history['present_count']) == (scan_total, scan_present)
+    assert len(history['heatmap']) == len(scan_heatmap)
+    assert bitmap_seconds < scan_seconds
@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+import pytest
+from src.models import db, Attendance
+from src.utils.attendance_stats import students_attendance_stats
+from src.utils.query_counter import count_queries
+
+FIRST_DAY = date(2026, 1, 5)
+
+def _mark(student, dance_class, marks):
+    """Registra as presenças em semanas consecutivas, da mais antiga para a mais recente."""
+    for week, is_present in enumerate(marks):
+        db.session.add(Attendance(
+            student_id=student.id, class_id=dance_class.id,
+            date=FIRST_DAY + timedelta(weeks=week), is_present=is_present
+        ))
+    db.session.commit()
+
+@pytest.mark.parametrize('last_sessions', [0, 2, 10])
+def test_streak_does_not_depend_on_last_sessions_window(make_user, make_student, make_class, last_sessions):
+    teacher = make_user()
+    student = make_student(teacher)
+    _mark(student, make_class(teacher), [True, False] + [True] * 5)
+
+    stats = students_attendance_stats([student.id], last_sessions=last_sessions)[student.id]
+
+    assert stats['current_streak'] == 5
+    assert len(stats['last_sessions']) == min(last_sessions, 7)
+
+def test_streak_counts_every_session_without_absences(make_user, make_student, make_class):
+    teacher = make_user()
+    student = make_student(teacher)
+    _mark(student, make_class(teacher), [True] * 4)
+
+    assert students_attendance_stats([student.id], last_sessions=1)[student.id]['current_streak'] == 4
+
+def test_totals_per_class_and_single_statement(make_user, make_student, make_class):
+    teacher = make_user()
+    students = [make_student(teacher), make_student(teacher)]
+    first_class, second_class = make_class(teacher), make_class(teacher)
+    _mark(students[0], first_class, [True, True, False])
+    _mark(students[0], second_class, [False, True])
+    _mark(students[1], first_class, [True])
+
+    with count_queries() as counter:
+        stats = students_attendance_stats([student.id for student in students] + ['sem-registros'])
+
+    assert counter.count == 1
+    first = stats[students[0].id]
+    assert (first['total_classes'], first['present_count'], first['absent_count']) == (5, 3, 2)
+    assert {item['class_id']: item['present_count'] for item in first['classes']} == {
+        first_class.id: 2, second_class.id: 1
+    }
+    assert stats[students[1].id]['current_streak'] == 1
+    assert stats['sem-registros']['total_classes'] == 0
+    assert stats['sem-registros']['current_streak'] == 0
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+from src.models import db, User
+from src.models.revoked_token import RevokedToken
+from src.routes import user as user_routes
+from src.utils import auth, tokens
+
+def test_token_authenticates(client, make_user, auth_headers):
+    teacher = make_user()
+
+    response = client.get('/api/me', headers=auth_headers(teacher))
+
+    assert response.status_code == 200
+    assert response.get_json()['id'] == teacher.id
+
+def test_legacy_identification_is_off_by_default(client, make_user):
+    teacher = make_user()
+
+    assert client.get('/api/me', headers={'X-User-ID': teacher.id}).status_code == 401
+
+def test_legacy_header_and_session_behind_flag(client, make_user, monkeypatch):
+    monkeypatch.setattr(auth, 'ALLOW_LEGACY_USER_ID', True)
+    monkeypatch.setattr(user_routes, 'ALLOW_LEGACY_USER_ID', True)
+    teacher = make_user()
+
+    assert client.get('/api/me', headers={'X-User-ID': teacher.id}).status_code == 200
+
+    with client.session_transaction() as session:
+        session['user_id'] = teacher.id
+    assert client.get('/api/me').get_json()['id'] == teacher.id
+
+    client.post('/api/logout')
+    assert client.get('/api/me').status_code == 401
+
+def test_demoted_admin_loses_access_immediately(client, make_user, auth_headers):
+    admin = make_user(role='admin')
+    headers = auth_headers(admin)
+    assert client.get('/api/users', headers=headers).status_code == 200
+
+    # Alteração feita por outro worker: nem o token nem o cache deste processo sabem dela
+    User.query.filter_by(id=admin.id).update({'role': 'teacher'})
+    db.session.commit()
+
+    assert client.get('/api/users', headers=headers).status_code == 403
+
+def test_revocation_committed_out_of_id_order_is_seen(make_user):
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    db.session.add(RevokedToken(id=10, jti='posterior', expires_at=expires_at))
+    db.session.commit()
+    tokens._revocations.sync(force=True)
+
+    # Transação concorrente que obteve um id menor e confirmou depois
+    db.session.add(RevokedToken(id=5, jti='atrasado', expires_at=expires_at))
+    db.session.commit()
+    tokens._revocations.sync(force=True)
+
+    assert tokens._revocations.is_revoked({'jti': 'atrasado', 'sub': 'x', 'iat': 0})
+    assert tokens._revocations.is_revoked({'jti': 'posterior', 'sub': 'x', 'iat': 0})
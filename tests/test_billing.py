@@ -0,0 +1,48 @@
+from datetime import date, timedelta
+from src.models import db, Payment, Student
+from src.models.billing_status import BillingStatus
+from src.utils import billing
+from src.utils.billing import ensure_fresh, refresh_all
+
+def test_refresh_all_upserts_and_drops_removed_students(make_user, make_student):
+    teacher = make_user()
+    today = date.today()
+    overdue = make_student(teacher, payment_due_date=today - timedelta(days=2))
+    removed = make_student(teacher, payment_due_date=today + timedelta(days=1))
+    # Remoção fora do ORM: a FK com ON DELETE CASCADE remove a linha de billing_status
+    db.session.execute(Student.__table__.delete().where(Student.__table__.c.id == removed.id))
+    db.session.commit()
+    assert db.session.get(BillingStatus, removed.id) is None
+
+    assert refresh_all(today=today) == 1
+    assert refresh_all(today=today) == 1
+    db.session.commit()
+
+    statuses = {row.student_id: row.status for row in BillingStatus.query.all()}
+    assert statuses == {overdue.id: 'overdue'}
+
+def test_payments_do_not_touch_billing_status(make_user, make_student):
+    teacher = make_user()
+    student = make_student(teacher, payment_due_date=date.today() + timedelta(days=3))
+    computed = db.session.get(BillingStatus, student.id).updated_at
+
+    db.session.add(Payment(
+        student_id=student.id, teacher_id=teacher.id, amount=120,
+        payment_date=date.today(), payment_type='Mensalidade'
+    ))
+    db.session.commit()
+
+    db.session.expire_all()
+    assert db.session.get(BillingStatus, student.id).updated_at == computed
+
+def test_empty_table_is_refreshed_on_first_read(make_user, make_student):
+    teacher = make_user()
+    student = make_student(teacher, payment_due_date=date.today() - timedelta(days=1))
+    # Banco recém-implantado: tabela vazia e nenhum recálculo neste processo
+    db.session.execute(BillingStatus.__table__.delete())
+    db.session.commit()
+    billing._fresh_on = None
+
+    ensure_fresh()
+
+    assert db.session.get(BillingStatus, student.id).status == 'overdue'
@@ -0,0 +1,77 @@
+import time as clock
+from datetime import date, datetime
+import pytest
+from src.models import db, Attendance
+from src.utils.query_counter import count_queries
+
+ROLL_CALL_DATE = '2026-03-02'
+
+def _payload(students, is_present=True):
+    return {
+        'date': ROLL_CALL_DATE,
+        'attendance': [{'student_id': student.id, 'is_present': is_present} for student in students]
+    }
+
+def _roster(make_user, make_student, make_class, size):
+    teacher = make_user()
+    dance_class = make_class(teacher)
+    return dance_class, [make_student(teacher) for _ in range(size)]
+
+def test_bulk_creates_then_updates_one_row_per_student(client, make_user, make_student, make_class):
+    dance_class, students = _roster(make_user, make_student, make_class, 5)
+    url = f'/api/attendance/class/{dance_class.id}/bulk'
+
+    assert client.post(url, json=_payload(students, True)).status_code == 201
+    response = client.post(url, json=_payload(students, False))
+    assert response.status_code == 201
+
+    rows = Attendance.query.filter_by(class_id=dance_class.id).all()
+    assert len(rows) == len(students)
+    assert not any(row.is_present for row in rows)
+
+def test_bulk_query_count_does_not_grow_with_class_size(client, make_user, make_student, make_class):
+    counts = []
+    for size in (5, 40):
+        dance_class, students = _roster(make_user, make_student, make_class, size)
+        with count_queries() as counter:
+            response = client.post(f'/api/attendance/class/{dance_class.id}/bulk', json=_payload(students))
+        assert response.status_code == 201
+        counts.append(counter.count)
+    assert counts[0] == counts[1]
+
+def _legacy_loop(class_id, students, attendance_date):
+    """Implementação anterior: um SELECT por aluno antes do commit."""
+    for student in students:
+        existing = Attendance.query.filter_by(
+            student_id=student.id, class_id=class_id, date=attendance_date
+        ).first()
+        if existing:
+            existing.is_present = True
+            existing.updated_at = datetime.utcnow()
+        else:
+            db.session.add(Attendance(student_id=student.id, class_id=class_id, date=attendance_date, is_present=True))
+    db.session.commit()
+
+@pytest.mark.benchmark
+def test_benchmark_bulk_upsert_against_per_student_loop(client, make_user, make_student, make_class):
+    attendance_date = date.fromisoformat(ROLL_CALL_DATE)
+    print()
+    for size in (10, 40, 200):
+        dance_class, students = _roster(make_user, make_student, make_class, size)
+
+        started = clock.perf_counter()
+        with count_queries() as legacy:
+            _legacy_loop(dance_class.id, students, attendance_date)
+        legacy_seconds = clock.perf_counter() - started
+        db.session.query(Attendance).filter_by(class_id=dance_class.id).delete()
+        db.session.commit()
+
+        started = clock.perf_counter()
+        with count_queries() as bulk:
+            response = client.post(f'/api/attendance/class/{dance_class.id}/bulk', json=_payload(students))
+        bulk_seconds = clock.perf_counter() - started
+        assert response.status_code == 201
+
+        print(f'{size:>4} alunos: laço {legacy.count} consultas/{legacy_seconds * 1000:.1f} ms, '
+              f'lote {bulk.count} consultas/{bulk_seconds * 1000:.1f} ms')
+        assert bulk.count < legacy.count
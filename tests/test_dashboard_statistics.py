@@ -0,0 +1,169 @@
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import func
+from src.models import db, Student, DanceClass, Payment, User
+from src.models.revenue_rollup import RevenueRollup
+from src.models.teacher_stats import TeacherStats
+from src.utils.statistics import get_admin_statistics, get_teacher_statistics, get_billing_notifications
+
+def _seed(make_user, make_student, make_class):
+    """
+    Dois professores com alunos em todas as situações de cobrança, turmas e pagamentos.
+    """
+    today = date.today()
+    make_user(role='admin')
+    teachers = [make_user(), make_user()]
+    for index, teacher in enumerate(teachers):
+        students = [
+            make_student(teacher, payment_due_date=today - timedelta(days=3 + index)),
+            make_student(teacher, payment_due_date=today + timedelta(days=2)),
+            make_student(teacher, payment_due_date=today + timedelta(days=7)),
+            make_student(teacher, payment_due_date=today + timedelta(days=30)),
+            make_student(teacher, payment_due_date=today - timedelta(days=10), scholarship_percentage=100),
+            make_student(teacher, payment_due_date=None),
+        ]
+        for _ in range(index + 1):
+            make_class(teacher)
+        for amount, student in zip((120, 95.5, 80), students):
+            db.session.add(Payment(
+                student_id=student.id, teacher_id=teacher.id, amount=amount,
+                payment_date=today.replace(day=1), payment_type='Mensalidade'
+            ))
+    db.session.commit()
+    return teachers
+
+def _baseline_admin(today):
+    """Consultas da implementação anterior do dashboard administrativo (uma por contador)."""
+    next_week = today + timedelta(days=7)
+    return {
+        "total_students": Student.query.count(),
+        "total_classes": DanceClass.query.count(),
+        "total_teachers": User.query.filter_by(role='teacher').count(),
+        "total_admins": User.query.filter_by(role='admin').count(),
+        "total_revenue": float(db.session.query(func.sum(Payment.amount)).scalar() or 0),
+        "overdue_students_count": Student.query.filter(
+            Student.payment_due_date < today,
+            Student.scholarship_percentage < 100
+        ).count(),
+        "due_soon_students_count": Student.query.filter(
+            Student.payment_due_date >= today,
+            Student.payment_due_date <= next_week,
+            Student.scholarship_percentage < 100
+        ).count()
+    }
+
+def _baseline_teacher(teacher_id, today):
+    """Consultas da implementação anterior do dashboard do professor."""
+    owner = Student.teacher_id
+    next_week = today + timedelta(days=7)
+    overdue = Student.query.filter(
+        owner == teacher_id,
+        Student.payment_due_date < today,
+        Student.scholarship_percentage < 100
+    ).all()
+    due_soon = Student.query.filter(
+        owner == teacher_id,
+        Student.payment_due_date >= today,
+        Student.payment_due_date <= next_week,
+        Student.scholarship_percentage < 100
+    ).all()
+    monthly_revenue = db.session.query(func.sum(Payment.amount)).join(Student).filter(
+        owner == teacher_id,
+        Payment.payment_date >= today.replace(day=1),
+        Payment.payment_date <= today
+    ).scalar() or 0
+    statistics = {
+        "total_students": Student.query.filter(owner == teacher_id).count(),
+        "total_classes": DanceClass.query.filter(DanceClass.teacher_id == teacher_id).count(),
+        "monthly_revenue": float(monthly_revenue)
+    }
+    return overdue, due_soon, statistics
+
+def test_admin_statistics_match_per_count_queries(make_user, make_student, make_class):
+    _seed(make_user, make_student, make_class)
+    today = date.today()
+
+    assert get_admin_statistics() == _baseline_admin(today)
+
+def test_admin_dashboard_endpoint_matches_baseline(client, make_user, make_student, make_class):
+    _seed(make_user, make_student, make_class)
+
+    response = client.get('/api/admin/dashboard')
+
+    assert response.status_code == 200
+    assert response.get_json()['statistics'] == _baseline_admin(date.today())
+
+def test_teacher_statistics_and_notifications_match_baseline(make_user, make_student, make_class):
+    teachers = _seed(make_user, make_student, make_class)
+    today = date.today()
+
+    for teacher in teachers:
+        overdue, due_soon, statistics = _baseline_teacher(teacher.id, today)
+        current_overdue, current_due_soon = get_billing_notifications(teacher.id)
+
+        assert {student.id for student in current_overdue} == {student.id for student in overdue}
+        assert {student.id for student in current_due_soon} == {student.id for student in due_soon}
+        assert get_teacher_statistics(teacher.id, today) == statistics
+
+def test_statistics_follow_writes(make_user, make_student, make_class):
+    teacher, _ = _seed(make_user, make_student, make_class)
+    today = date.today()
+    get_admin_statistics()
+
+    # Gravações pelo ORM atualizam as tabelas pré-calculadas no mesmo flush
+    make_student(teacher, payment_due_date=today - timedelta(days=1))
+    for student in Student.query.filter(Student.payment_due_date > today + timedelta(days=7)).all():
+        student.payment_due_date = today + timedelta(days=1)
+    db.session.commit()
+
+    assert get_admin_statistics() == _baseline_admin(today)
+
+def test_teacher_monthly_revenue_ignores_payments_dated_after_today(make_user, make_student, make_class):
+    today = date.today()
+    next_month = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+    if today + timedelta(days=1) >= next_month:
+        pytest.skip('último dia do mês: não há data futura no mês corrente')
+    teacher, _ = _seed(make_user, make_student, make_class)
+    student = make_student(teacher)
+    db.session.add(Payment(
+        student_id=student.id, teacher_id=teacher.id, amount=50,
+        payment_date=today + timedelta(days=1), payment_type='Mensalidade'
+    ))
+    db.session.commit()
+
+    _, _, statistics = _baseline_teacher(teacher.id, today)
+    assert get_teacher_statistics(teacher.id, today) == statistics
+
+def test_deleted_payments_leave_admin_revenue(make_user, make_student, make_class):
+    _seed(make_user, make_student, make_class)
+    today = date.today()
+    for payment in Payment.query.filter(Payment.amount == 120).all():
+        db.session.delete(payment)
+    db.session.commit()
+
+    assert get_admin_statistics() == _baseline_admin(today)
+
+def test_deleting_teacher_removes_materialized_rows(make_user):
+    teacher = make_user()
+    db.session.add(TeacherStats(teacher_id=teacher.id, student_count=0, class_count=0, combo_count=0))
+    db.session.add(RevenueRollup(teacher_id=teacher.id, month='2026-03', payment_type='Mensalidade',
+                                 revenue=0, payment_count=0))
+    db.session.commit()
+
+    db.session.delete(teacher)
+    db.session.commit()
+
+    # ON DELETE CASCADE (foreign_keys ligado também no SQLite)
+    assert db.session.query(TeacherStats).filter_by(teacher_id=teacher.id).count() == 0
+    assert db.session.query(RevenueRollup).filter_by(teacher_id=teacher.id).count() == 0
+
+def test_teacher_statistics_without_materialized_row_use_live_counts(make_user, make_student, make_class):
+    teachers = _seed(make_user, make_student, make_class)
+    today = date.today()
+    # Como em um banco migrado antes de teacher_stats ser preenchida
+    db.session.execute(TeacherStats.__table__.delete())
+    db.session.commit()
+
+    for teacher in teachers:
+        _, _, statistics = _baseline_teacher(teacher.id, today)
+        assert get_teacher_statistics(teacher.id, today) == statistics
@@ -0,0 +1,84 @@
+import threading
+import time as clock
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, func, select
+from sqlalchemy.exc import OperationalError
+from src.utils import database
+from src.utils.database import engine_options
+
+# Perfil anterior ao ajuste: journal em DELETE e sem espera pelo lock
+LEGACY_PROFILE = {'journal_mode': 'DELETE', 'busy_timeout': 0, 'synchronous': 'FULL'}
+
+_metadata = MetaData()
+load_items = Table(
+    'load_items', _metadata,
+    Column('id', Integer, primary_key=True),
+    Column('worker', Integer, nullable=False),
+    Column('payload', String(100), nullable=False)
+)
+
+def _engine(path, monkeypatch, profile=None):
+    for key, value in (profile or {}).items():
+        monkeypatch.setitem(database.SQLITE_PRAGMAS, key, value)
+    url = f'sqlite:///{path}'
+    return create_engine(url, **engine_options(url))
+
+def test_sqlite_connections_use_configured_profile(tmp_path, monkeypatch):
+    engine = _engine(tmp_path / 'profile.db', monkeypatch)
+    with engine.connect() as connection:
+        journal_mode = connection.exec_driver_sql('PRAGMA journal_mode').scalar()
+        busy_timeout = connection.exec_driver_sql('PRAGMA busy_timeout').scalar()
+        foreign_keys = connection.exec_driver_sql('PRAGMA foreign_keys').scalar()
+    engine.dispose()
+
+    assert journal_mode.lower() == database.SQLITE_PRAGMAS['journal_mode'].lower()
+    assert busy_timeout == database.SQLITE_PRAGMAS['busy_timeout']
+    assert foreign_keys == 1
+
+def _run_load(engine, workers=8, operations=150):
+    """
+    Cada worker alterna uma escrita curta e uma leitura agregada, como os
+    workers do gunicorn atendendo chamadas e dashboards ao mesmo tempo.
+    Retorna (segundos, operações concluídas, erros de lock).
+    """
+    _metadata.create_all(engine)
+    done = [0]
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(number):
+        for index in range(operations):
+            try:
+                with engine.begin() as connection:
+                    connection.execute(load_items.insert().values(worker=number, payload=f'{number}-{index}'))
+                with engine.connect() as connection:
+                    connection.execute(select(func.count()).select_from(load_items)).scalar()
+                with lock:
+                    done[0] += 1
+            except OperationalError:
+                with lock:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=worker, args=(number,)) for number in range(workers)]
+    started = clock.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = clock.perf_counter() - started
+    engine.dispose()
+    return elapsed, done[0], errors[0]
+
+@pytest.mark.benchmark
+def test_load_default_profile_against_legacy(tmp_path, monkeypatch):
+    legacy = _run_load(_engine(tmp_path / 'legacy.db', monkeypatch, LEGACY_PROFILE))
+    monkeypatch.undo()
+    current = _run_load(_engine(tmp_path / 'current.db', monkeypatch))
+
+    print()
+    for name, (elapsed, done, errors) in (('anterior', legacy), ('atual', current)):
+        print(f'{name:>8}: {done} operações em {elapsed:.2f} s ({done / elapsed:.0f}/s), {errors} erro(s) de lock')
+
+    # Com WAL e busy_timeout, nenhuma requisição falha por "database is locked"
+    assert current[2] == 0
+    assert current[2] <= legacy[2]
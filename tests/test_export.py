@@ -0,0 +1,59 @@
+import os
+import tracemalloc
+import pytest
+from src.utils.export import write_xlsx, stream_file, XLSX_MIMETYPE
+
+HEADERS = ["ID", "Nome", "Telefone", "Data", "Valor"]
+
+def _rows(count):
+    for index in range(count):
+        yield [f"id-{index:08d}", f"Aluno {index}", f"119{index:08d}", "01/03/2026", f"R$ {index % 500:.2f}"]
+
+def _peak_bytes(count, tmp_path):
+    tracemalloc.start()
+    try:
+        write_xlsx("Alunos", HEADERS, _rows(count), path=str(tmp_path / f"{count}.xlsx"))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_write_xlsx_peak_memory_does_not_grow_with_row_count(tmp_path):
+    small = _peak_bytes(2_000, tmp_path)
+    large = _peak_bytes(20_000, tmp_path)
+
+    # Dez vezes mais linhas: em modo write-only o pico fica praticamente estável
+    assert large < small * 2
+
+def test_write_xlsx_removes_partial_file_on_error(tmp_path):
+    path = tmp_path / "partial.xlsx"
+
+    def failing_rows():
+        yield ["1", "Aluno", "", "", ""]
+        raise RuntimeError("falha no cursor")
+
+    with pytest.raises(RuntimeError):
+        write_xlsx("Alunos", HEADERS, failing_rows(), path=str(path))
+    assert not path.exists()
+
+def test_stream_file_removes_file_when_response_closes(app, tmp_path):
+    path = write_xlsx("Alunos", HEADERS, _rows(10), path=str(tmp_path / "export.xlsx"))
+
+    with app.test_request_context():
+        response = stream_file(path, XLSX_MIMETYPE, "alunos.xlsx")
+        # Cliente desconectou sem consumir o corpo
+        response.close()
+
+    assert not os.path.exists(path)
+
+def test_stream_file_sends_whole_file(app, tmp_path):
+    path = write_xlsx("Alunos", HEADERS, _rows(100), path=str(tmp_path / "export.xlsx"))
+    with open(path, "rb") as f:
+        expected = f.read()
+
+    with app.test_request_context():
+        response = stream_file(path, XLSX_MIMETYPE, "alunos.xlsx")
+        body = b"".join(response.response)
+        response.close()
+
+    assert body == expected
+    assert not os.path.exists(path)
@@ -0,0 +1,88 @@
+import json
+import time
+import pytest
+from google.auth import crypt, jwt as google_jwt
+from src.utils.google_tokens import GoogleCertStore, verify_google_id_token
+
+serialization = pytest.importorskip('cryptography.hazmat.primitives.serialization')
+rsa = pytest.importorskip('cryptography.hazmat.primitives.asymmetric.rsa')
+
+AUDIENCE = 'client-id.apps.googleusercontent.com'
+
+def _key_pair():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public_pem = key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_pem, public_pem.decode()
+
+@pytest.fixture(scope='module')
+def keys():
+    """Conjunto de chaves de teste: kid -> (chave privada, chave pública PEM)."""
+    return {kid: _key_pair() for kid in ('chave-antiga', 'chave-nova')}
+
+def _token(keys, kid, **claims):
+    now = int(time.time())
+    payload = {
+        'iss': 'https://accounts.google.com', 'aud': AUDIENCE, 'sub': '1234567890',
+        'email': 'professor@example.com', 'iat': now, 'exp': now + 3600
+    }
+    payload.update(claims)
+    signer = crypt.RSASigner.from_string(keys[kid][0], key_id=kid)
+    return google_jwt.encode(signer, payload).decode()
+
+def _fake_network(store, monkeypatch, *responses):
+    """Substitui o download por respostas fixas e conta as buscas."""
+    calls = []
+
+    def download():
+        calls.append(time.time())
+        return responses[min(len(calls), len(responses)) - 1], time.time() + 3600
+
+    monkeypatch.setattr(store, '_download', download)
+    return calls
+
+def test_valid_token_is_verified_offline(keys, tmp_path):
+    fixture = tmp_path / 'certs.json'
+    fixture.write_text(json.dumps({kid: pair[1] for kid, pair in keys.items()}))
+    store = GoogleCertStore.from_file(str(fixture))
+
+    idinfo = verify_google_id_token(_token(keys, 'chave-antiga'), AUDIENCE, store=store)
+
+    assert idinfo['email'] == 'professor@example.com'
+
+@pytest.mark.parametrize('claims', [{'aud': 'outro-cliente'}, {'iss': 'https://evil.example.com'}])
+def test_wrong_audience_or_issuer_is_rejected(keys, claims):
+    store = GoogleCertStore(certs={kid: pair[1] for kid, pair in keys.items()})
+
+    with pytest.raises(ValueError):
+        verify_google_id_token(_token(keys, 'chave-antiga', **claims), AUDIENCE, store=store)
+
+def test_unknown_kid_triggers_single_refresh(keys, tmp_path, monkeypatch):
+    store = GoogleCertStore(cache_path=str(tmp_path / 'cache.json'))
+    old_set = {'chave-antiga': keys['chave-antiga'][1]}
+    rotated_set = {kid: pair[1] for kid, pair in keys.items()}
+    calls = _fake_network(store, monkeypatch, old_set, rotated_set)
+
+    verify_google_id_token(_token(keys, 'chave-antiga'), AUDIENCE, store=store)
+    idinfo = verify_google_id_token(_token(keys, 'chave-nova'), AUDIENCE, store=store)
+    verify_google_id_token(_token(keys, 'chave-nova'), AUDIENCE, store=store)
+
+    assert idinfo['sub'] == '1234567890'
+    # Uma busca pelo cache vazio e uma pela rotação; a chave nova fica em cache
+    assert len(calls) == 2
+
+def test_forced_refresh_is_rate_limited(keys, tmp_path, monkeypatch):
+    store = GoogleCertStore(cache_path=str(tmp_path / 'cache.json'), min_refresh_interval=60)
+    calls = _fake_network(store, monkeypatch, {'chave-antiga': keys['chave-antiga'][1]})
+    forged = _token(keys, 'chave-nova')
+
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            verify_google_id_token(forged, AUDIENCE, store=store)
+
+    # Tokens com kid desconhecido não viram uma busca na rede por requisição
+    assert len(calls) == 2
@@ -0,0 +1,58 @@
+import io
+from datetime import time
+import pytest
+from src.models import db
+from src.utils.importer import import_file, _decimal
+
+def _csv(text):
+    return io.BytesIO(text.encode('utf-8'))
+
+def test_imported_classes_are_checked_for_conflicts(make_user, make_class):
+    teacher, other = make_user(), make_user()
+    make_class(other, name='Forró', location='Sala 1', start_time=time(18, 0), end_time=time(19, 0))
+
+    report = import_file(_csv(
+        'nome,dia da semana,início,fim,local,mensalidade\n'
+        'Samba,segunda,18:30,19:30,Sala 1,100\n'    # mesmo local de uma turma gravada
+        'Salsa,terça,10:00,11:00,Sala 2,100\n'
+        'Zouk,terça,10:30,11:30,Sala 3,100\n'       # mesmo professor, linha anterior do arquivo
+        'Tango,terça,11:00,12:00,Sala 2,100\n'
+    ), 'turmas.csv', teacher.id, kind='classes')
+
+    assert report['created']['classes'] == 2
+    assert [error['row'] for error in report['errors']] == [2, 4]
+    # A mensagem não expõe o nome nem o dono da turma conflitante
+    assert 'Forró' not in report['errors'][0]['error']
+    assert 'Sala 1' in report['errors'][0]['error']
+
+def test_enrollment_count_skips_existing_rows(make_user, make_student, make_class):
+    teacher = make_user()
+    dance_class = make_class(teacher, name='Bolero')
+    student = make_student(teacher, phone_number='11988887777')
+    student.classes.append(dance_class)
+    db.session.commit()
+    other = make_student(teacher, phone_number='11988886666')
+    rows = f'aluno,turma\n{student.phone_number},Bolero\n{other.phone_number},Bolero\n'
+
+    dry_run = import_file(_csv(rows), 'matriculas.csv', teacher.id, kind='enrollments', dry_run=True)
+    report = import_file(_csv(rows), 'matriculas.csv', teacher.id, kind='enrollments')
+
+    assert dry_run['created']['enrollments'] == 1
+    assert report['created']['enrollments'] == 1
+
+@pytest.mark.parametrize('value', ['NaN', 'nan', 'Infinity', '-inf', 'abc'])
+def test_decimal_rejects_non_finite_values(value):
+    with pytest.raises(ValueError):
+        _decimal({'monthly_fee': value}, 'monthly_fee')
+
+def test_admin_import_requires_existing_teacher(client, make_user, auth_headers):
+    admin = make_user(role='admin')
+
+    response = client.post('/api/import', headers=auth_headers(admin), data={
+        'file': (_csv('nome,telefone\nAluno,11999990000\n'), 'alunos.csv'),
+        'kind': 'students',
+        'teacher_id': admin.id
+    })
+
+    assert response.status_code == 400
+    assert 'não encontrado' in response.get_json()['error']
@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import text
+from src.models import db
+
+# Consultas mais frequentes das rotas e o índice esperado para cada uma
+HOT_QUERIES = [
+    ("SELECT * FROM attendance WHERE class_id = 'c' AND date = '2026-03-02'",
+     'ix_attendance_class_date'),
+    ("SELECT * FROM attendance WHERE class_id = 'c' AND date BETWEEN '2026-01-01' AND '2026-03-31'",
+     'ix_attendance_class_date'),
+    ("SELECT * FROM attendance WHERE student_id = 's' AND class_id = 'c' AND date = '2026-03-02'",
+     'uq_attendance_student_class_date'),
+    ("SELECT count(*) FROM attendance WHERE student_id = 's' AND is_present = 1",
+     'ix_attendance_student_present'),
+    ("SELECT * FROM student WHERE payment_due_date < '2026-03-02'",
+     'ix_student_payment_due_date'),
+    ("SELECT * FROM student WHERE teacher_id = 't' AND payment_due_date < '2026-03-02'",
+     'ix_student_teacher_id_due_date'),
+    ("SELECT * FROM dance_class WHERE teacher_id = 't'",
+     'ix_dance_class_teacher_id'),
+    ("SELECT * FROM payment WHERE student_id = 's'",
+     'ix_payment_student'),
+    ("SELECT sum(amount) FROM payment WHERE teacher_id = 't' AND payment_date BETWEEN '2026-03-01' AND '2026-03-31'",
+     'ix_payment_teacher_date'),
+    ("SELECT count(*) FROM \"user\" WHERE role = 'teacher'",
+     'ix_user_role'),
+]
+
+def _plan(sql):
+    return [row[-1] for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).all()]
+
+@pytest.mark.parametrize('sql, index_name', HOT_QUERIES)
+def test_hot_query_uses_index(app, sql, index_name):
+    if db.engine.dialect.name != 'sqlite':
+        pytest.skip('plano verificado com EXPLAIN QUERY PLAN do SQLite')
+    plan = _plan(sql)
+
+    assert any(index_name in detail for detail in plan), plan
+    # Nenhuma varredura completa de tabela
+    assert not any(detail.startswith('SCAN') and 'INDEX' not in detail for detail in plan), plan
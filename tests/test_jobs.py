@@ -0,0 +1,86 @@
+from datetime import date, datetime, timedelta
+from openpyxl import load_workbook
+from src.models import db, Payment
+from src.models.job import Job
+from src.utils.jobs import ARTIFACT_TTL, JOB_LEASE, claim_next_job, cleanup_expired_jobs, requeue_stale_jobs, run_job
+
+def _pay(student, teacher, amount, payment_type='Mensalidade'):
+    db.session.add(Payment(
+        student_id=student.id, teacher_id=teacher.id, amount=amount,
+        payment_date=date(2026, 3, 10), payment_type=payment_type
+    ))
+    db.session.commit()
+
+def test_revenue_report_job_writes_spreadsheet(app, client, make_user, make_student, auth_headers):
+    teacher = make_user()
+    student = make_student(teacher)
+    _pay(student, teacher, 120)
+    _pay(student, teacher, 80, 'Aula Particular')
+
+    response = client.get(
+        '/api/reports/revenue?async=1&start_month=2026-01&end_month=2026-12&group_by=month,payment_type',
+        headers=auth_headers(teacher)
+    )
+    assert response.status_code == 202
+    job_id = response.get_json()['id']
+
+    assert claim_next_job() == job_id
+    run_job(app, job_id)
+
+    job = db.session.get(Job, job_id)
+    assert job.status == 'done', job.error
+    rows = list(load_workbook(job.result_path, read_only=True).active.iter_rows(values_only=True))
+    assert rows[0] == ('Mês', 'Tipo', 'Receita', 'Pagamentos')
+    assert sorted(rows[1:]) == [('2026-03', 'Aula Particular', 80, 1), ('2026-03', 'Mensalidade', 120, 1)]
+
+def test_revenue_report_job_rejects_invalid_params(client, make_user, auth_headers):
+    teacher = make_user()
+
+    response = client.post('/api/jobs', json={'kind': 'revenue_report', 'params': {'group_by': 'aluno'}},
+                           headers=auth_headers(teacher))
+
+    assert response.status_code == 400
+    assert Job.query.count() == 0
+
+def test_stale_running_job_is_requeued(make_user):
+    owner = make_user()
+    now = datetime.utcnow()
+    stale = Job(kind='export', params='{}', owner_id=owner.id, status='running',
+                started_at=now - JOB_LEASE - timedelta(minutes=1))
+    active = Job(kind='export', params='{}', owner_id=owner.id, status='running', started_at=now)
+    db.session.add_all([stale, active])
+    db.session.commit()
+
+    assert requeue_stale_jobs() == 1
+    db.session.expire_all()
+    assert (stale.status, stale.started_at) == ('queued', None)
+    assert active.status == 'running'
+    assert claim_next_job() == stale.id
+
+def test_failed_jobs_expire_and_are_cleaned_up(app, make_user):
+    owner = make_user()
+    job = Job(kind='export', params='{"export": "inexistente"}', owner_id=owner.id, status='running')
+    legacy = Job(kind='export', params='{}', owner_id=owner.id, status='failed',
+                 finished_at=datetime.utcnow() - ARTIFACT_TTL - timedelta(hours=1))
+    db.session.add_all([job, legacy])
+    db.session.commit()
+    job_id, legacy_id = job.id, legacy.id
+
+    run_job(app, job_id)
+    job = db.session.get(Job, job_id)
+    assert job.status == 'failed'
+    assert job.expires_at is not None
+
+    assert cleanup_expired_jobs() == 1
+    assert db.session.get(Job, legacy_id) is None
+    assert db.session.get(Job, job_id) is not None
+
+def test_deleting_owner_removes_jobs(make_user):
+    owner = make_user()
+    db.session.add(Job(kind='export', params='{}', owner_id=owner.id, status='queued'))
+    db.session.commit()
+
+    db.session.delete(owner)
+    db.session.commit()
+
+    assert Job.query.filter_by(owner_id=owner.id).count() == 0
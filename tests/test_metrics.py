@@ -0,0 +1,28 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from src.models import db
+from src.routes import metrics as metrics_routes
+
+def test_metrics_require_admin_by_default(client, make_user, auth_headers):
+    teacher, admin = make_user(), make_user(role='admin')
+
+    assert client.get('/api/metrics').status_code == 401
+    assert client.get('/api/metrics', headers=auth_headers(teacher)).status_code == 403
+    response = client.get('/api/metrics', headers=auth_headers(admin))
+    assert response.status_code == 200
+    assert 'http_requests_total' in response.get_data(as_text=True)
+
+def test_metrics_accept_collector_token(client, monkeypatch):
+    monkeypatch.setattr(metrics_routes, 'METRICS_TOKEN', 'coletor')
+
+    assert client.get('/api/metrics', headers={'Authorization': 'Bearer errado'}).status_code == 401
+    assert client.get('/api/metrics', headers={'Authorization': 'Bearer coletor'}).status_code == 200
+
+def test_failed_query_does_not_leave_start_time_behind(app):
+    with db.engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text('SELECT * FROM tabela_inexistente'))
+        assert connection.info.get('query_start', []) == []
+        connection.execute(text('SELECT 1'))
+        assert connection.info.get('query_start', []) == []
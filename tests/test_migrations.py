@@ -0,0 +1,11 @@
+from sqlalchemy import select
+from src.migrations import run_migrations, schema_migrations
+from src.migrations.versions import MIGRATIONS
+from src.models import db
+
+def test_run_migrations_is_idempotent(app):
+    assert run_migrations() == []
+
+    with db.engine.begin() as connection:
+        versions = {row[0] for row in connection.execute(select(schema_migrations.c.version))}
+    assert versions == {version for version, _ in MIGRATIONS}
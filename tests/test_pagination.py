@@ -0,0 +1,45 @@
+import base64
+import json
+import pytest
+from src.utils import pagination
+from src.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor
+
+def _cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+def test_unpaged_listing_is_capped_and_resumable(client, make_user, make_student, auth_headers, monkeypatch):
+    monkeypatch.setattr(pagination, 'MAX_UNPAGED', 3)
+    admin = make_user(role='admin')
+    teacher = make_user()
+    created = {make_student(teacher).id for _ in range(5)}
+
+    first = client.get('/api/admin/students', headers=auth_headers(admin))
+    assert first.status_code == 200
+    assert len(first.get_json()) == 3
+    cursor = first.headers[NEXT_CURSOR_HEADER]
+
+    rest = client.get(f'/api/admin/students?cursor={cursor}', headers=auth_headers(admin))
+    assert rest.status_code == 200
+    assert rest.get_json()['next_cursor'] is None
+    ids = {item['id'] for item in first.get_json()} | {item['id'] for item in rest.get_json()['items']}
+    assert ids == created
+
+def test_short_listing_has_no_cursor_header(client, make_user, make_student, auth_headers):
+    admin = make_user(role='admin')
+    make_student(make_user())
+
+    response = client.get('/api/admin/students', headers=auth_headers(admin))
+
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+@pytest.mark.parametrize('payload', [[None, 'abc'], ['2026-03-01T10:00:00', None], ['2026-03-01T10:00:00']])
+def test_incomplete_cursor_is_rejected(payload):
+    with pytest.raises(ValueError):
+        decode_cursor(_cursor(payload))
+
+def test_listing_with_incomplete_cursor_returns_400(client, make_user, auth_headers):
+    admin = make_user(role='admin')
+
+    response = client.get(f"/api/admin/students?cursor={_cursor([None, 'abc'])}", headers=auth_headers(admin))
+
+    assert response.status_code == 400
@@ -0,0 +1,75 @@
+from sqlalchemy.exc import OperationalError
+from src.models import db, Student
+from src.utils import response_cache
+from src.utils.response_cache import get_versions
+
+def test_global_scopes_are_bumped_only_after_commit(make_user):
+    teacher = make_user()
+    before = get_versions(['students', f'teacher:{teacher.id}'])
+
+    db.session.add(Student(**{
+        'teacher_id': teacher.id, 'name': 'Aluno', 'phone_number': '11999999999',
+        'scholarship_percentage': 0
+    }))
+    db.session.flush()
+    during = get_versions(['students', f'teacher:{teacher.id}'])
+    db.session.commit()
+    after = get_versions(['students', f'teacher:{teacher.id}'])
+
+    # O escopo do professor muda na própria transação; o global, só depois do commit
+    assert during == (before[0], before[1] + 1)
+    assert after == (before[0] + 1, before[1] + 1)
+
+def test_rollback_discards_pending_global_scopes(make_user):
+    teacher = make_user()
+    before = get_versions(['students'])
+
+    db.session.add(Student(**{
+        'teacher_id': teacher.id, 'name': 'Aluno', 'phone_number': '11999999998',
+        'scholarship_percentage': 0
+    }))
+    db.session.flush()
+    db.session.rollback()
+    db.session.commit()
+
+    assert get_versions(['students']) == before
+
+def test_cached_list_is_invalidated_after_write(client, make_user, make_student):
+    make_user(role='admin')
+    teacher = make_user()
+    make_student(teacher)
+
+    first = client.get('/api/admin/students')
+    make_student(teacher)
+    second = client.get('/api/admin/students')
+
+    assert first.status_code == second.status_code == 200
+    assert first.headers['ETag'] != second.headers['ETag']
+
+def test_failed_global_bump_does_not_fail_the_commit(make_user, monkeypatch):
+    teacher = make_user()
+    before = get_versions(['students'])
+    write_versions = response_cache._write_versions
+    failures = []
+
+    def flaky_write(scopes, bind=None):
+        if 'students' in scopes and not failures:
+            failures.append(scopes)
+            raise OperationalError('UPDATE cache_version', {}, Exception('database is locked'))
+        return write_versions(scopes, bind=bind)
+
+    monkeypatch.setattr(response_cache, '_write_versions', flaky_write)
+    student = Student(**{
+        'teacher_id': teacher.id, 'name': 'Aluno', 'phone_number': '11999999997',
+        'scholarship_percentage': 0
+    })
+    db.session.add(student)
+    db.session.commit()
+
+    assert failures
+    assert db.session.get(Student, student.id) is not None
+    assert get_versions(['students']) == before
+
+    # O escopo que falhou é reenviado no próximo commit do processo
+    make_user()
+    assert get_versions(['students']) == (before[0] + 1,)
@@ -0,0 +1,48 @@
+from datetime import date
+import pytest
+from src.models import db, Attendance, student_classes
+from src.utils.query_counter import assert_max_queries, count_queries
+from src.utils.roster import load_roster
+
+ROLL_CALL_DATE = date(2026, 3, 2)
+
+def _enrolled_class(make_user, make_student, make_class, size):
+    teacher = make_user()
+    dance_class = make_class(teacher)
+    students = [make_student(teacher) for _ in range(size)]
+    db.session.execute(student_classes.insert(), [
+        {'student_id': student.id, 'class_id': dance_class.id} for student in students
+    ])
+    db.session.add(Attendance(student_id=students[0].id, class_id=dance_class.id, date=ROLL_CALL_DATE, is_present=True))
+    db.session.commit()
+    db.session.expunge_all()
+    return dance_class, students
+
+def test_load_roster_returns_presence_of_the_date(make_user, make_student, make_class):
+    dance_class, students = _enrolled_class(make_user, make_student, make_class, 3)
+
+    roster = load_roster(dance_class.id, ROLL_CALL_DATE)
+
+    presence = {student.id: is_present for student, is_present in roster}
+    assert presence == {students[0].id: True, students[1].id: None, students[2].id: None}
+
+@pytest.mark.parametrize('size', [5, 50])
+def test_roll_call_endpoint_runs_constant_number_of_queries(client, make_user, make_student, make_class, size):
+    dance_class, _ = _enrolled_class(make_user, make_student, make_class, size)
+
+    # Versões do cache, turma, alunos com presença e turmas dos alunos (selectinload)
+    with assert_max_queries(4):
+        response = client.get(f'/api/attendance/class/{dance_class.id}/date/{ROLL_CALL_DATE.isoformat()}')
+
+    assert response.status_code == 200
+    assert len(response.get_json()['attendance']) == size
+
+def test_roster_query_count_does_not_grow_with_class_size(make_user, make_student, make_class):
+    counts = []
+    for size in (5, 50):
+        dance_class, _ = _enrolled_class(make_user, make_student, make_class, size)
+        with count_queries() as counter:
+            for student, _ in load_roster(dance_class.id, ROLL_CALL_DATE):
+                student.to_dict()
+        counts.append(counter.count)
+    assert counts[0] == counts[1]
@@ -0,0 +1,60 @@
+import threading
+from datetime import time
+
+def _payload(**overrides):
+    payload = {
+        'name': 'Samba', 'day_of_week': 'quarta', 'start_time': ',18:00', 'end_time': ',19:00',
+        'location': 'Sala Azul', 'monthly_fee': 120
+    }
+    payload.update(overrides)
+    return payload
+
+def test_create_class_rejects_end_before_start(client, make_user, auth_headers):
+    teacher = make_user()
+
+    response = client.post('/api/classes', json=_payload(start_time=',19:00', end_time=',19:00'),
+                           headers=auth_headers(teacher))
+
+    assert response.status_code == 400
+
+def test_conflict_response_hides_other_teachers_classes(client, make_user, make_class, auth_headers):
+    teacher, other = make_user(), make_user()
+    make_class(other, name='Forró Particular', day_of_week='quarta', location='Sala Azul',
+               start_time=time(18, 30), end_time=time(19, 30))
+
+    response = client.post('/api/classes', json=_payload(), headers=auth_headers(teacher))
+
+    assert response.status_code == 409
+    conflict, = response.get_json()['conflicts']
+    assert conflict == {
+        'reason': 'location', 'day_of_week': 'quarta', 'location': 'Sala Azul',
+        'start_time': '18:30', 'end_time': '19:30'
+    }
+
+def test_concurrent_creations_in_the_same_slot_admit_one(app, make_user, auth_headers):
+    teachers = [make_user() for _ in range(8)]
+    headers = [auth_headers(teacher) for teacher in teachers]
+    statuses = []
+
+    def create(index):
+        with app.test_client() as client:
+            response = client.post('/api/classes', json=_payload(name=f'Turma {index}'), headers=headers[index])
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=create, args=(index,)) for index in range(len(teachers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [201] + [409] * (len(teachers) - 1)
+
+def test_location_conflict_ignores_non_ascii_case(client, make_user, make_class, auth_headers):
+    teacher, other = make_user(), make_user()
+    make_class(other, day_of_week='quarta', location='SALA ÁGUA',
+               start_time=time(18, 30), end_time=time(19, 30))
+
+    response = client.post('/api/classes', json=_payload(location=' sala água'), headers=auth_headers(teacher))
+
+    assert response.status_code == 409
+    assert response.get_json()['conflicts'][0]['reason'] == 'location'
@@ -0,0 +1,44 @@
+import time as clock
+import uuid
+from datetime import date, datetime, timedelta
+import pytest
+from src.models import db, Payment
+from src.utils.serialization import PAYMENT_SCHEMA, dumps
+
+def _seed_payments(make_user, make_student, count):
+    teacher = make_user()
+    student = make_student(teacher)
+    now = datetime.utcnow()
+    rows = [{
+        'id': str(uuid.uuid4()), 'student_id': student.id, 'teacher_id': teacher.id,
+        'amount': 100 + index % 50, 'payment_date': date(2026, 1, 1) + timedelta(days=index % 365),
+        'proof_url': None, 'payment_type': 'Mensalidade', 'notes': f'Pagamento {index}',
+        'created_at': now, 'updated_at': now
+    } for index in range(count)]
+    for index in range(0, count, 5000):
+        db.session.execute(Payment.__table__.insert(), rows[index:index + 5000])
+    db.session.commit()
+
+def test_payment_schema_matches_to_dict(make_user, make_student):
+    _seed_payments(make_user, make_student, 20)
+    query = Payment.query.order_by(Payment.id)
+
+    assert PAYMENT_SCHEMA.rows(query) == [payment.to_dict() for payment in query.all()]
+
+@pytest.mark.benchmark
+def test_benchmark_payment_schema_against_to_dict(make_user, make_student):
+    _seed_payments(make_user, make_student, 20_000)
+    query = Payment.query.order_by(Payment.id)
+
+    started = clock.perf_counter()
+    legacy = dumps([payment.to_dict() for payment in query.all()])
+    legacy_seconds = clock.perf_counter() - started
+    db.session.expunge_all()
+
+    started = clock.perf_counter()
+    compiled = dumps(PAYMENT_SCHEMA.rows(query))
+    compiled_seconds = clock.perf_counter() - started
+
+    print(f'\n20000 pagamentos: to_dict {legacy_seconds * 1000:.0f} ms, schema {compiled_seconds * 1000:.0f} ms')
+    assert compiled == legacy
+    assert compiled_seconds < legacy_seconds
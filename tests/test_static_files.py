@@ -0,0 +1,22 @@
+import pytest
+from src.utils.static_files import is_fingerprinted
+
+@pytest.mark.parametrize('path', [
+    'assets/index-3f2a9c1b.js',
+    'assets/vendor.0a1b2c3d4e5f.css',
+    'photos/0123456789abcdef0123456789abcdef.jpg',
+    'photos/0123456789abcdef0123456789abcdef_thumb.jpg',
+])
+def test_content_hashed_names_are_fingerprinted(path):
+    assert is_fingerprinted(path)
+
+@pytest.mark.parametrize('path', [
+    'index.html',
+    'favicon.ico',
+    'assets/background-image.png',
+    'assets/dashboard-overview.js',
+    'assets/logo_horizontal.svg',
+    'photos/foto-do-aluno.jpg',
+])
+def test_regular_names_are_not_fingerprinted(path):
+    assert not is_fingerprinted(path)
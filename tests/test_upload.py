@@ -0,0 +1,79 @@
+import io
+import os
+import pytest
+from PIL import Image
+from src.routes import upload as upload_module
+from src.utils import photos
+
+@pytest.fixture
+def photo_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_module, 'UPLOAD_FOLDER', str(tmp_path))
+    return tmp_path
+
+def _png_bytes():
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 24), (200, 40, 90)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+def _upload(client, content):
+    return client.post('/api/upload/photo', data={'file': (io.BytesIO(content), 'foto.png')},
+                       content_type='multipart/form-data')
+
+def test_variants_are_pending_until_generated(client, photo_folder, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(upload_module, 'schedule_variants', lambda *args: scheduled.append(args))
+
+    first = _upload(client, _png_bytes())
+    assert first.status_code == 200
+    body = first.get_json()
+    assert set(body) == {'photo_url', 'pending_variants'}
+    assert set(body['pending_variants']) == set(photos.VARIANTS)
+    assert (photo_folder / os.path.basename(body['photo_url'])).exists()
+
+    photos.generate_variants(*scheduled[0])
+    second = _upload(client, _png_bytes()).get_json()
+    assert second['pending_variants'] == {}
+    assert second['thumb_url'] == body['pending_variants']['thumb']
+    assert (photo_folder / os.path.basename(second['web_url'])).exists()
+
+def test_raw_upload_is_written_outside_the_public_folder(client, photo_folder, tmp_path_factory, monkeypatch):
+    upload_tmp = tmp_path_factory.mktemp('uploads')
+    monkeypatch.setattr(photos, 'UPLOAD_TEMP_DIR', str(upload_tmp))
+    monkeypatch.setattr(upload_module, 'schedule_variants', lambda *args: None)
+    seen = []
+    verify = photos.verify_image
+
+    def spy(path):
+        seen.append(os.path.dirname(path))
+        return verify(path)
+    monkeypatch.setattr(photos, 'verify_image', spy)
+
+    assert _upload(client, _png_bytes()).status_code == 200
+    assert seen == [str(upload_tmp)]
+    assert list(upload_tmp.iterdir()) == []
+
+def test_invalid_image_is_rejected_without_leaving_files(client, photo_folder):
+    response = client.post('/api/upload/photo', data={'file': (io.BytesIO(b'nao sou uma imagem'), 'foto.png')},
+                           content_type='multipart/form-data')
+
+    assert response.status_code == 400
+    assert list(photo_folder.iterdir()) == []
+
+def test_request_above_max_content_length_is_rejected(app, client, photo_folder, monkeypatch):
+    monkeypatch.setitem(app.config, 'MAX_CONTENT_LENGTH', 1024)
+
+    response = client.post('/api/upload/photo', data={'file': (io.BytesIO(b'0' * 4096), 'foto.png')},
+                           content_type='multipart/form-data')
+
+    assert response.status_code == 413
+
+def test_variant_temp_file_is_removed_when_save_fails(tmp_path, monkeypatch):
+    content_hash, filename = photos.save_upload(io.BytesIO(_png_bytes()), str(tmp_path), 'png')
+
+    def failing_save(self, *args, **kwargs):
+        raise OSError('disco cheio')
+    monkeypatch.setattr(Image.Image, 'save', failing_save)
+
+    with pytest.raises(OSError):
+        photos.generate_variants(str(tmp_path), filename, content_hash)
+    assert sorted(path.name for path in tmp_path.iterdir()) == [filename]
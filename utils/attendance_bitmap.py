@@ -0,0 +1,213 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+import click
+from sqlalchemy import event, select, tuple_
+from sqlalchemy.orm import Session
+from src.models import db, Attendance
+from src.models.attendance_bitmap import AttendanceBitmap, BITMAP_BYTES
+from src.utils.bulk import insert_ignore, upsert_rows
+from src.utils.teacher_stats import previous_value
+
+_EMPTY = bytes(BITMAP_BYTES)
+
+def _day_index(value):
+    return value.timetuple().tm_yday - 1
+
+def _to_int(bits):
+    return int.from_bytes(bits or _EMPTY, 'little')
+
+def _to_bytes(value):
+    return value.to_bytes(BITMAP_BYTES, 'little')
+
+def _popcount(value):
+    return bin(value).count('1')
+
+class _Bitmaps:
+    """
+    Bitsets carregados em memória, por (student_id, class_id, year).
+    """
+    def __init__(self):
+        self.items = {}
+
+    def get(self, key):
+        return self.items.setdefault(key, [0, 0])
+
+    def mark(self, student_id, class_id, day, is_present):
+        """Registra (is_present True/False) ou remove (None) a marcação de um dia."""
+        bits = self.get((student_id, class_id, day.year))
+        mask = 1 << _day_index(day)
+        if is_present is None:
+            bits[0] &= ~mask
+            bits[1] &= ~mask
+        else:
+            bits[0] |= mask
+            bits[1] = (bits[1] | mask) if is_present else (bits[1] & ~mask)
+
+    def rows(self):
+        now = datetime.utcnow()
+        return [{
+            'student_id': student_id,
+            'class_id': class_id,
+            'year': year,
+            'recorded_bits': _to_bytes(recorded),
+            'present_bits': _to_bytes(present),
+            'updated_at': now
+        } for (student_id, class_id, year), (recorded, present) in self.items.items()]
+
+def apply_marks(marks, bind=None):
+    """
+    Aplica marcações (student_id, class_id, date, is_present) aos bitsets.
+    is_present None remove a marcação do dia.
+
+    Para não perder marcações de transações concorrentes, os bitsets afetados
+    são criados vazios se ainda não existirem (INSERT ... ON CONFLICT DO NOTHING)
+    e lidos com SELECT ... FOR UPDATE, sempre na mesma ordem de chave, antes da
+    gravação em um único upsert. No SQLite o INSERT inicial já obtém o lock de
+    escrita do banco, então a leitura vê a última versão confirmada.
+    """
+    marks = [mark for mark in marks if mark[0] and mark[1] and mark[2]]
+    if not marks:
+        return
+    executor = bind or db.session
+    table = AttendanceBitmap.__table__
+
+    keys = sorted({(student_id, class_id, day.year) for student_id, class_id, day, _ in marks})
+    now = datetime.utcnow()
+    insert_ignore(AttendanceBitmap, [{
+        'student_id': student_id, 'class_id': class_id, 'year': year,
+        'recorded_bits': _EMPTY, 'present_bits': _EMPTY, 'updated_at': now
+    } for student_id, class_id, year in keys], index_elements=['student_id', 'class_id', 'year'], bind=bind)
+
+    existing = executor.execute(select(table).where(
+        tuple_(table.c.student_id, table.c.class_id, table.c.year).in_(keys)
+    ).order_by(table.c.student_id, table.c.class_id, table.c.year).with_for_update()).all()
+
+    bitmaps = _Bitmaps()
+    for row in existing:
+        bitmaps.items[(row.student_id, row.class_id, row.year)] = [
+            _to_int(row.recorded_bits), _to_int(row.present_bits)
+        ]
+    for student_id, class_id, day, is_present in marks:
+        bitmaps.mark(student_id, class_id, day, is_present)
+
+    upsert_rows(
+        AttendanceBitmap, bitmaps.rows(),
+        index_elements=['student_id', 'class_id', 'year'],
+        update_columns=['recorded_bits', 'present_bits', 'updated_at'],
+        bind=bind
+    )
+
+def _after_flush(session, flush_context):
+    marks = []
+    for obj in session.new:
+        if isinstance(obj, Attendance):
+            marks.append((obj.student_id, obj.class_id, obj.date, bool(obj.is_present)))
+    for obj in session.deleted:
+        if isinstance(obj, Attendance):
+            marks.append((
+                previous_value(obj, 'student_id'), previous_value(obj, 'class_id'), previous_value(obj, 'date'), None
+            ))
+    for obj in session.dirty:
+        if isinstance(obj, Attendance) and session.is_modified(obj):
+            marks.append((
+                previous_value(obj, 'student_id'), previous_value(obj, 'class_id'), previous_value(obj, 'date'), None
+            ))
+            marks.append((obj.student_id, obj.class_id, obj.date, bool(obj.is_present)))
+    if marks:
+        apply_marks(marks, bind=session.connection())
+
+def rebuild_bitmaps(bind=None):
+    """
+    Reconstrói todos os bitsets a partir da tabela Attendance.
+    Retorna a quantidade de bitsets gravados.
+    """
+    executor = bind or db.session
+    table = Attendance.__table__
+    bitmaps = _Bitmaps()
+    result = executor.execute(select(
+        table.c.student_id, table.c.class_id, table.c.date, table.c.is_present
+    ).execution_options(yield_per=5000))
+    for student_id, class_id, day, is_present in result:
+        bitmaps.mark(student_id, class_id, day, bool(is_present))
+
+    executor.execute(AttendanceBitmap.__table__.delete())
+    rows = bitmaps.rows()
+    if rows:
+        executor.execute(AttendanceBitmap.__table__.insert(), rows)
+    return len(rows)
+
+def _range_mask(year, start, end):
+    """Máscara dos dias do ano `year` entre start e end (inclusive)."""
+    first = max(start, date(year, 1, 1))
+    last = min(end, date(year, 12, 31))
+    if first > last:
+        return 0
+    return ((1 << (_day_index(last) + 1)) - 1) & ~((1 << _day_index(first)) - 1)
+
+def student_history(student_id, start, end, class_id=None):
+    """
+    Resumo do histórico de um aluno lido apenas dos bitsets:
+    totais e taxa de presença (popcount), sequência atual de presenças e o
+    mapa de calor dia a dia (True presente, False ausente).
+    """
+    query = AttendanceBitmap.query.filter(
+        AttendanceBitmap.student_id == student_id,
+        AttendanceBitmap.year >= start.year,
+        AttendanceBitmap.year <= end.year
+    )
+    if class_id:
+        query = query.filter(AttendanceBitmap.class_id == class_id)
+
+    # Totais somados por bitset (cada turma conta uma aula por dia);
+    # o mapa de calor combina as turmas: o dia é presente se não houve falta
+    total = present_count = 0
+    by_year = defaultdict(lambda: [0, 0])  # dias registrados, dias com falta
+    for bitmap in query.all():
+        mask = _range_mask(bitmap.year, start, end)
+        recorded = _to_int(bitmap.recorded_bits) & mask
+        present = _to_int(bitmap.present_bits) & mask
+        total += _popcount(recorded)
+        present_count += _popcount(present)
+        by_year[bitmap.year][0] |= recorded
+        by_year[bitmap.year][1] |= recorded & ~present
+
+    heatmap = {}
+    for year, (recorded, absent) in by_year.items():
+        day_bits = recorded
+        while day_bits:
+            low = day_bits & -day_bits
+            heatmap[date(year, 1, 1) + timedelta(days=low.bit_length() - 1)] = not (absent & low)
+            day_bits ^= low
+
+    streak = 0
+    for day in sorted(heatmap, reverse=True):
+        if not heatmap[day]:
+            break
+        streak += 1
+
+    return {
+        'student_id': student_id,
+        'start_date': start.isoformat(),
+        'end_date': end.isoformat(),
+        'total_classes': total,
+        'present_count': present_count,
+        'absent_count': total - present_count,
+        'attendance_rate': round((present_count / total * 100) if total > 0 else 0, 2),
+        'current_streak': streak,
+        'heatmap': [{'date': day.isoformat(), 'is_present': heatmap[day]} for day in sorted(heatmap)]
+    }
+
+@click.command('rebuild-attendance-bitmaps')
+def rebuild_attendance_bitmaps_command():
+    """Reconstrói os bitsets de presença a partir da tabela attendance."""
+    count = rebuild_bitmaps()
+    db.session.commit()
+    click.echo(f'{count} bitset(s) reconstruído(s).')
+
+def init_attendance_bitmaps(app):
+    """
+    Registra a sincronização com Attendance e o comando de reconstrução.
+    """
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+    app.cli.add_command(rebuild_attendance_bitmaps_command)
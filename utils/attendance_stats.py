@@ -0,0 +1,115 @@
+from collections import defaultdict
+from sqlalchemy import func, case, not_, or_
+from src.models import db, Attendance
+
+# Quantidade padrão (e máxima) de aulas recentes listadas nas estatísticas
+DEFAULT_LAST_SESSIONS = 10
+MAX_LAST_SESSIONS = 100
+
+def _rate(present, total):
+    return round((present / total * 100) if total > 0 else 0, 2)
+
+def _summary(total, present):
+    return {
+        'total_classes': total,
+        'present_count': present,
+        'absent_count': total - present,
+        'attendance_rate': _rate(present, total)
+    }
+
+def _date_filters(start=None, end=None):
+    filters = []
+    if start:
+        filters.append(Attendance.date >= start)
+    if end:
+        filters.append(Attendance.date <= end)
+    return filters
+
+def _ranked_attendance(student_ids, filters):
+    """
+    Registros dos alunos com as colunas de janela usadas nas estatísticas:
+    - position: ordem do registro entre as aulas do aluno, da mais recente;
+    - class_position, class_total, class_present: o mesmo por (aluno, turma),
+      com os totais da turma repetidos em cada linha;
+    - first_absence: posição da falta mais recente do aluno (None se não houver);
+    - student_total: quantidade de registros do aluno.
+    """
+    recency = (Attendance.date.desc(), Attendance.created_at.desc())
+    present = case((Attendance.is_present, 1), else_=0)
+    per_class = (Attendance.student_id, Attendance.class_id)
+
+    ranked = db.session.query(
+        Attendance.student_id,
+        Attendance.class_id,
+        Attendance.date,
+        Attendance.is_present,
+        func.row_number().over(partition_by=Attendance.student_id, order_by=recency).label('position'),
+        func.row_number().over(partition_by=per_class, order_by=recency).label('class_position'),
+        func.count(Attendance.id).over(partition_by=per_class).label('class_total'),
+        func.sum(present).over(partition_by=per_class).label('class_present')
+    ).filter(Attendance.student_id.in_(student_ids), *filters).subquery()
+
+    return db.session.query(
+        ranked,
+        func.min(case((not_(ranked.c.is_present), ranked.c.position))).over(
+            partition_by=ranked.c.student_id
+        ).label('first_absence'),
+        func.count().over(partition_by=ranked.c.student_id).label('student_total')
+    ).subquery()
+
+def students_attendance_stats(student_ids, start=None, end=None, last_sessions=DEFAULT_LAST_SESSIONS):
+    """
+    Estatísticas de presença de vários alunos em uma única consulta com
+    funções de janela (ver _ranked_attendance). Voltam apenas a primeira linha
+    de cada (aluno, turma), com os totais da turma, e as últimas
+    `last_sessions` aulas de cada aluno. A sequência atual de presenças é
+    calculada sobre todo o período, independentemente de `last_sessions`.
+    Retorna um dicionário student_id -> estatísticas.
+    """
+    student_ids = list(dict.fromkeys(student_ids))
+    ranked = _ranked_attendance(student_ids, _date_filters(start, end))
+
+    rows = db.session.query(ranked).filter(or_(
+        ranked.c.class_position == 1,
+        ranked.c.position <= last_sessions
+    )).order_by(ranked.c.student_id, ranked.c.position).all()
+
+    per_class = defaultdict(list)
+    recent = defaultdict(list)
+    streaks = {}
+    for row in rows:
+        if row.class_position == 1:
+            per_class[row.student_id].append((row.class_id, row.class_total, row.class_present or 0))
+        if row.position <= last_sessions:
+            recent[row.student_id].append({
+                'class_id': row.class_id,
+                'date': row.date.isoformat() if row.date else None,
+                'is_present': bool(row.is_present)
+            })
+        # Presenças seguidas até a falta mais recente (ou todas, se não houver falta)
+        streaks[row.student_id] = row.first_absence - 1 if row.first_absence is not None else row.student_total
+
+    result = {}
+    for student_id in student_ids:
+        classes = per_class.get(student_id, [])
+        total = sum(item[1] for item in classes)
+        present = sum(item[2] for item in classes)
+
+        stats = {'student_id': student_id}
+        stats.update(_summary(total, present))
+        stats['classes'] = [
+            dict(class_id=class_id, **_summary(class_total, class_present))
+            for class_id, class_total, class_present in classes
+        ]
+        stats['current_streak'] = streaks.get(student_id, 0)
+        stats['last_sessions'] = recent.get(student_id, [])
+        result[student_id] = stats
+    return result
+
+def parse_last_sessions(value):
+    if value is None:
+        return DEFAULT_LAST_SESSIONS
+    last_sessions = int(value)
+    if last_sessions < 0:
+        raise ValueError('last_sessions não pode ser negativo')
+    return min(last_sessions, MAX_LAST_SESSIONS)
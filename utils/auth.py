@@ -1,17 +1,110 @@
+from collections import namedtuple
 from functools import wraps
-from flask import request, jsonify, g
+from flask import request, jsonify, g, session
 from src.models.user import User
+from src.utils.cache import TTLCache
+from src.utils.tokens import decode_token
+import os
 
-def get_current_user():
+# Identificação antiga (sessão do Flask, header X-User-ID e ?user_id=), sem
+# verificação de assinatura. Desativada por padrão; defina
+# AUTH_ALLOW_LEGACY_USER_ID=1 apenas durante a migração do front-end para o token
+ALLOW_LEGACY_USER_ID = os.environ.get('AUTH_ALLOW_LEGACY_USER_ID', '0') == '1'
+
+# Dados mínimos do usuário necessários para autorização
+UserPrincipal = namedtuple('UserPrincipal', ['id', 'role', 'name'])
+
+# Cache local ao processo dos principals, por id de usuário. Serve à
+# identificação e aos jobs; require_admin confere o papel no banco, então um
+# admin rebaixado ou excluído não depende do TTL para perder o acesso.
+_principal_cache = TTLCache(maxsize=2048, ttl=60)
+
+def get_user_principal(user_id):
     """
-    Obtém o usuário atual baseado no user_id fornecido no header da requisição.
-    Em um ambiente de produção, isso seria baseado em um token JWT ou sessão.
+    Obtém o principal (id, role, name) de um usuário, consultando o banco
+    apenas quando ele não está no cache.
     """
-    user_id = request.headers.get('X-User-ID')
     if not user_id:
         return None
-    
+
+    principal = _principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
     user = User.query.get(user_id)
+    if not user:
+        return None
+
+    principal = UserPrincipal(id=user.id, role=user.role, name=user.name)
+    _principal_cache.set(user_id, principal)
+    return principal
+
+def invalidate_user(user_id):
+    """
+    Remove um usuário do cache. Deve ser chamada sempre que id, papel ou nome
+    de um usuário forem alterados ou quando ele for excluído.
+    """
+    _principal_cache.pop(user_id)
+
+def _stored_role(user_id):
+    """
+    Papel atual do usuário no banco (None se ele não existir mais), sem cache.
+    """
+    return User.query.with_entities(User.role).filter(User.id == user_id).scalar()
+
+def _bearer_token():
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return header[len('Bearer '):].strip()
+    return None
+
+def get_current_user():
+    """
+    Obtém o usuário atual a partir do token assinado enviado em
+    "Authorization: Bearer <token>". O token é verificado sem acesso ao banco.
+    O resultado é reutilizado em g.current_user durante toda a requisição.
+    """
+    if 'current_user' in g:
+        return g.current_user
+
+    user = None
+    token = _bearer_token()
+    if token:
+        try:
+            claims = decode_token(token)
+            user = UserPrincipal(id=claims['sub'], role=claims['role'], name=claims.get('name'))
+            g.token_claims = claims
+        except ValueError:
+            user = None
+    elif ALLOW_LEGACY_USER_ID:
+        user = get_user_principal(request.headers.get('X-User-ID') or session.get('user_id'))
+
+    g.current_user = user
+    return user
+
+def get_current_user_id():
+    """
+    Id do usuário autenticado. Enquanto a identificação antiga estiver
+    habilitada, recorre ao parâmetro ?user_id= das rotas que ainda o usam.
+    """
+    user = get_current_user()
+    if user:
+        return user.id
+    if ALLOW_LEGACY_USER_ID:
+        return request.args.get('user_id')
+    return None
+
+def load_current_user():
+    """
+    Carrega o modelo User completo do usuário atual, para rotas que precisam
+    ler ou alterar campos além do principal. Carregado no máximo uma vez por requisição.
+    """
+    if 'current_user_model' in g:
+        return g.current_user_model
+
+    principal = get_current_user()
+    user = User.query.get(principal.id) if principal else None
+    g.current_user_model = user
     return user
 
 def require_auth(f):
@@ -31,6 +124,8 @@ def require_auth(f):
 def require_admin(f):
     """
     Decorator que requer papel de administrador para acessar uma rota.
+    O papel do token é confirmado no banco (uma consulta por chave primária):
+    o token e os caches de outros workers podem estar defasados.
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -38,7 +133,7 @@ def require_admin(f):
         if not user:
             return jsonify({'error': 'Autenticação necessária'}), 401
         
-        if user.role != 'admin':
+        if user.role != 'admin' or _stored_role(user.id) != 'admin':
             return jsonify({'error': 'Acesso negado. Apenas administradores podem acessar esta funcionalidade.'}), 403
         
         g.current_user = user
@@ -0,0 +1,172 @@
+from datetime import date, datetime, timedelta
+import click
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+from src.models import db, Student
+from src.models.billing_status import BillingStatus
+from src.utils.bulk import upsert_rows
+
+# Janela (em dias) para considerar um pagamento "próximo do vencimento"
+DUE_SOON_DAYS = 7
+
+ALERT_STATUSES = ('overdue', 'due_soon')
+
+# Linhas por INSERT ... ON CONFLICT no recálculo completo
+REFRESH_BATCH_SIZE = 500
+
+# Último dia em que este processo confirmou que a tabela está atualizada
+_fresh_on = None
+
+def compute_status(payment_due_date, scholarship_percentage, today):
+    """
+    Situação de cobrança de um aluno em `today`: (status, dias em atraso).
+    Bolsistas integrais nunca entram em cobrança.
+    """
+    if scholarship_percentage is not None and scholarship_percentage >= 100:
+        return 'scholarship', 0
+    if payment_due_date is None:
+        return 'no_due_date', 0
+    if payment_due_date < today:
+        return 'overdue', (today - payment_due_date).days
+    if payment_due_date <= today + timedelta(days=DUE_SOON_DAYS):
+        return 'due_soon', 0
+    return 'ok', 0
+
+def _status_row(student_id, teacher_id, payment_due_date, scholarship_percentage, today, now):
+    status, days_overdue = compute_status(payment_due_date, scholarship_percentage, today)
+    return {
+        'student_id': student_id,
+        'teacher_id': teacher_id,
+        'status': status,
+        'next_due_date': payment_due_date,
+        'days_overdue': days_overdue,
+        'computed_on': today,
+        'updated_at': now
+    }
+
+def refresh_students(student_ids, bind=None, today=None):
+    """
+    Recalcula a situação dos alunos informados (uma leitura e um upsert).
+    Alunos que não existem mais têm a linha removida.
+    """
+    student_ids = [student_id for student_id in set(student_ids) if student_id]
+    if not student_ids:
+        return
+    executor = bind or db.session
+    today = today or date.today()
+    now = datetime.utcnow()
+    table = Student.__table__
+    teacher_column = table.c.teacher_id
+
+    rows = executor.execute(select(
+        table.c.id, teacher_column, table.c.payment_due_date, table.c.scholarship_percentage
+    ).where(table.c.id.in_(student_ids))).all()
+
+    upsert_rows(
+        BillingStatus,
+        [_status_row(*row, today, now) for row in rows],
+        index_elements=['student_id'],
+        update_columns=['teacher_id', 'status', 'next_due_date', 'days_overdue', 'computed_on', 'updated_at'],
+        bind=bind
+    )
+
+    missing = set(student_ids) - {row[0] for row in rows}
+    if missing:
+        executor.execute(BillingStatus.__table__.delete().where(
+            BillingStatus.__table__.c.student_id.in_(missing)
+        ))
+
+def refresh_all(bind=None, today=None):
+    """
+    Recalcula a situação de todos os alunos (execução diária).
+    Grava por upsert em lotes e remove só as linhas de alunos que não existem
+    mais, então workers que recalculam ao mesmo tempo não disputam a chave
+    primária. Retorna a quantidade de alunos processados.
+    """
+    global _fresh_on
+    executor = bind or db.session
+    today = today or date.today()
+    now = datetime.utcnow()
+    table = Student.__table__
+    teacher_column = table.c.teacher_id
+
+    rows = [
+        _status_row(*row, today, now)
+        for row in executor.execute(select(
+            table.c.id, teacher_column, table.c.payment_due_date, table.c.scholarship_percentage
+        ))
+    ]
+    for index in range(0, len(rows), REFRESH_BATCH_SIZE):
+        upsert_rows(
+            BillingStatus,
+            rows[index:index + REFRESH_BATCH_SIZE],
+            index_elements=['student_id'],
+            update_columns=['teacher_id', 'status', 'next_due_date', 'days_overdue', 'computed_on', 'updated_at'],
+            bind=bind
+        )
+    status_table = BillingStatus.__table__
+    executor.execute(status_table.delete().where(
+        status_table.c.student_id.not_in(select(table.c.id))
+    ))
+    _fresh_on = today
+    return len(rows)
+
+def ensure_fresh():
+    """
+    Garante que a tabela foi recalculada hoje. A verificação no banco é feita
+    no máximo uma vez por dia por processo; se o job diário não tiver rodado,
+    ou se a tabela estiver vazia (implantação nova), o recálculo acontece aqui.
+    """
+    global _fresh_on
+    today = date.today()
+    if _fresh_on == today:
+        return
+    computed_on = db.session.query(func.min(BillingStatus.computed_on)).scalar()
+    if computed_on is None or computed_on < today:
+        refresh_all(today=today)
+        db.session.commit()
+    _fresh_on = today
+
+def _after_flush(session, flush_context):
+    # A situação depende só de campos de Student (vencimento e bolsa)
+    student_ids = set()
+    for obj in session.new:
+        if isinstance(obj, Student):
+            student_ids.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Student) and session.is_modified(obj):
+            student_ids.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Student):
+            student_ids.add(obj.id)
+    if student_ids:
+        refresh_students(student_ids, bind=session.connection())
+
+def billing_alerts(teacher_id=None, statuses=ALERT_STATUSES):
+    """
+    Alunos em cobrança (vencidos e próximos do vencimento), lidos da tabela
+    pré-calculada com uma única consulta indexada em (teacher_id, status).
+    Retorna uma lista de (BillingStatus, Student).
+    """
+    ensure_fresh()
+    query = db.session.query(BillingStatus, Student).join(
+        Student, Student.id == BillingStatus.student_id
+    ).filter(BillingStatus.status.in_(statuses))
+    if teacher_id:
+        query = query.filter(BillingStatus.teacher_id == teacher_id)
+    return query.order_by(BillingStatus.next_due_date).all()
+
+@click.command('refresh-billing-status')
+def refresh_billing_status_command():
+    """Recalcula a situação de cobrança de todos os alunos (agendar diariamente)."""
+    count = refresh_all()
+    db.session.commit()
+    click.echo(f'Situação de cobrança recalculada para {count} aluno(s).')
+
+def init_billing(app):
+    """
+    Registra a atualização imediata nas gravações e o comando diário.
+    """
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+    app.cli.add_command(refresh_billing_status_command)
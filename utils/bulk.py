@@ -0,0 +1,64 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from src.models.user import db
+
+# Dialetos com suporte a INSERT ... ON CONFLICT
+_INSERT_BY_DIALECT = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+def _dialect_insert(table, bind):
+    """
+    Retorna o construtor de INSERT específico do dialeto em uso.
+    """
+    dialect = bind.dialect.name
+    insert = _INSERT_BY_DIALECT.get(dialect)
+    if insert is None:
+        raise NotImplementedError(f'INSERT ... ON CONFLICT não suportado para o dialeto {dialect}')
+    return insert(table)
+
+def _table_of(model_or_table):
+    return getattr(model_or_table, '__table__', model_or_table)
+
+def upsert_rows(model_or_table, rows, index_elements, update_columns, bind=None):
+    """
+    Insere ou atualiza várias linhas em um único INSERT ... ON CONFLICT DO UPDATE.
+    `index_elements` deve corresponder a uma restrição única da tabela.
+    `bind` permite executar em uma conexão específica (por exemplo, dentro de um flush).
+    """
+    if not rows:
+        return
+    table = _table_of(model_or_table)
+    stmt = _dialect_insert(table, bind or db.session.get_bind()).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: stmt.excluded[column] for column in update_columns}
+    )
+    (bind or db.session).execute(stmt)
+
+def upsert_increment(model_or_table, rows, index_elements, increment_columns, bind=None):
+    """
+    Insere linhas de contadores ou soma os valores às linhas já existentes,
+    em um único INSERT ... ON CONFLICT DO UPDATE.
+    """
+    if not rows:
+        return
+    table = _table_of(model_or_table)
+    stmt = _dialect_insert(table, bind or db.session.get_bind()).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: table.c[column] + stmt.excluded[column] for column in increment_columns}
+    )
+    (bind or db.session).execute(stmt)
+
+def insert_ignore(model_or_table, rows, index_elements=None, bind=None):
+    """
+    Insere várias linhas em um único INSERT, ignorando as que já existem.
+    Retorna a quantidade de linhas efetivamente inseridas.
+    """
+    if not rows:
+        return 0
+    table = _table_of(model_or_table)
+    stmt = _dialect_insert(table, bind or db.session.get_bind()).values(rows)
+    stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+    return (bind or db.session).execute(stmt).rowcount
@@ -0,0 +1,80 @@
+import os
+import sqlite3
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Perfil padrão do SQLite: WAL permite leituras concorrentes com uma escrita,
+# busy_timeout faz os workers esperarem o lock em vez de falhar na hora
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+}
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+def database_url(default_sqlite_path):
+    """
+    URL do banco a partir de DATABASE_URL, com SQLite local como padrão.
+    Aceita o prefixo postgres:// usado por alguns provedores.
+    """
+    url = os.environ.get('DATABASE_URL')
+    if not url:
+        os.makedirs(os.path.dirname(default_sqlite_path), exist_ok=True)
+        return f"sqlite:///{default_sqlite_path}"
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+def engine_options(url):
+    """
+    Opções do engine do SQLAlchemy conforme o banco em uso.
+
+    Variáveis de ambiente (PostgreSQL e demais bancos servidor):
+    - DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE (segundos), DB_POOL_PRE_PING
+    - DB_STATEMENT_TIMEOUT_MS: tempo máximo de cada instrução (apenas PostgreSQL)
+    """
+    if url.startswith('sqlite'):
+        # O SQLite usa o pool padrão do SQLAlchemy; o ajuste é feito via PRAGMA
+        return {'connect_args': {'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000}}
+
+    options = {
+        'pool_size': _env_int('DB_POOL_SIZE', 5),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+    }
+    statement_timeout = _env_int('DB_STATEMENT_TIMEOUT_MS', 0)
+    if statement_timeout and url.startswith('postgresql'):
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
+
+@event.listens_for(Engine, 'connect')
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """Aplica o perfil de PRAGMAs em cada nova conexão SQLite."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_PRAGMAS['journal_mode']}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_PRAGMAS['busy_timeout']}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_PRAGMAS['synchronous']}")
+    # Sem isso o SQLite ignora as FKs, inclusive os ON DELETE CASCADE das tabelas derivadas
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+def configure_database(app, default_sqlite_path):
+    """
+    Preenche a configuração do Flask-SQLAlchemy a partir do ambiente.
+    Deve ser chamada antes de db.init_app(app).
+    """
+    url = database_url(default_sqlite_path)
+    app.config['SQLALCHEMY_DATABASE_URI'] = url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(url)
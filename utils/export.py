@@ -0,0 +1,175 @@
+import os
+import tempfile
+from collections import namedtuple
+from datetime import datetime
+from flask import Response, stream_with_context
+from openpyxl import Workbook
+from src.models import Student, Payment, Attendance, DanceClass
+from src.utils.auth import filter_by_user_access
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Quantidade de registros carregados por vez do cursor do banco
+YIELD_PER = 500
+
+# Tamanho dos blocos enviados na resposta
+CHUNK_SIZE = 64 * 1024
+
+def write_xlsx(title, headers, rows, path=None):
+    """
+    Grava uma planilha em modo write-only, linha a linha, sem manter o
+    workbook inteiro em memória. Retorna o caminho do arquivo gerado
+    (um arquivo temporário quando `path` não é informado).
+    Se a geração falhar, o arquivo parcial é removido antes de propagar o erro.
+    """
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+
+    try:
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(title=title)
+        ws.append(headers)
+        for row in rows:
+            ws.append(row)
+        wb.save(path)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return path
+
+def stream_file(path, mimetype, download_name, remove=True):
+    """
+    Envia um arquivo em blocos e, por padrão, remove-o quando a resposta é
+    fechada (inclusive se o cliente desconectar antes do fim do envio).
+    """
+    def generate():
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f'attachment; filename="{download_name}"',
+            "Content-Length": str(os.path.getsize(path))
+        }
+    )
+    if remove:
+        @response.call_on_close
+        def cleanup():
+            if os.path.exists(path):
+                os.remove(path)
+    return response
+
+def xlsx_response(title, headers, rows, download_name):
+    """
+    Gera a planilha em arquivo temporário e devolve a resposta em streaming.
+    """
+    path = write_xlsx(title, headers, rows)
+    return stream_file(path, XLSX_MIMETYPE, download_name)
+
+# Definições das exportações: título da aba, cabeçalhos e conversão de cada registro
+
+STUDENT_HEADERS = [
+    "ID", "Nome", "Telefone", "Data de Vencimento",
+    "Percentual de Bolsa", "Status da Bolsa", "Valor a Pagar (Mensalidade)"
+]
+
+def student_rows(query):
+    for student in query.yield_per(YIELD_PER):
+        base_monthly_fee = 120.00  # TODO: Este valor deve ser configurável por turma/professor
+        discounted_amount = student.calculate_discounted_amount(base_monthly_fee)
+
+        yield [
+            student.id,
+            student.name,
+            student.phone_number,
+            student.payment_due_date.strftime("%d/%m/%Y") if student.payment_due_date else "",
+            f"{student.scholarship_percentage}%",
+            student.get_scholarship_status(),
+            f"R$ {discounted_amount:.2f}"
+        ]
+
+PAYMENT_HEADERS = [
+    "ID", "Aluno", "Professor", "Valor", "Data do Pagamento", "Tipo", "Observações"
+]
+
+def payment_rows(query):
+    for payment in query.yield_per(YIELD_PER):
+        yield [
+            payment.id,
+            payment.student_id,
+            payment.teacher_id,
+            f"R$ {float(payment.amount):.2f}" if payment.amount is not None else "",
+            payment.payment_date.strftime("%d/%m/%Y") if payment.payment_date else "",
+            payment.payment_type,
+            payment.notes or ""
+        ]
+
+ATTENDANCE_HEADERS = [
+    "ID", "Aluno", "Turma", "Data", "Presente"
+]
+
+def attendance_rows(query):
+    for record in query.yield_per(YIELD_PER):
+        yield [
+            record.id,
+            record.student_id,
+            record.class_id,
+            record.date.strftime("%d/%m/%Y") if record.date else "",
+            "Sim" if record.is_present else "Não"
+        ]
+
+# Consultas de cada exportação, já filtradas pelo acesso do usuário
+
+def students_query(user, params):
+    return filter_by_user_access(Student.query, Student, user)
+
+def payments_query(user, params):
+    query = filter_by_user_access(Payment.query, Payment, user)
+    return query.order_by(Payment.payment_date)
+
+def attendance_query(user, params):
+    # Presença não tem professor próprio: o acesso é dado pela turma
+    query = Attendance.query.join(DanceClass, Attendance.class_id == DanceClass.id)
+    query = filter_by_user_access(query, DanceClass, user)
+
+    class_id = params.get("class_id")
+    if class_id:
+        query = query.filter(Attendance.class_id == class_id)
+    start_str = params.get("start_date")
+    if start_str:
+        query = query.filter(Attendance.date >= datetime.strptime(start_str, "%Y-%m-%d").date())
+    end_str = params.get("end_date")
+    if end_str:
+        query = query.filter(Attendance.date <= datetime.strptime(end_str, "%Y-%m-%d").date())
+
+    return query.order_by(Attendance.date, Attendance.class_id)
+
+ExportDefinition = namedtuple("ExportDefinition", ["title", "headers", "rows", "query", "download_name"])
+
+EXPORTS = {
+    "students": ExportDefinition("Alunos ABAA", STUDENT_HEADERS, student_rows, students_query, "alunos_abaa.xlsx"),
+    "payments": ExportDefinition("Pagamentos ABAA", PAYMENT_HEADERS, payment_rows, payments_query, "pagamentos_abaa.xlsx"),
+    "attendance": ExportDefinition("Presenças ABAA", ATTENDANCE_HEADERS, attendance_rows, attendance_query, "presencas_abaa.xlsx"),
+}
+
+def export_response(kind, user, params):
+    """
+    Gera a exportação `kind` e devolve a resposta em streaming.
+    """
+    export = EXPORTS[kind]
+    return xlsx_response(export.title, export.headers, export.rows(export.query(user, params)), export.download_name)
+
+def export_to_file(kind, user, params, path):
+    """
+    Gera a exportação `kind` diretamente no arquivo `path` (usado pelos jobs).
+    """
+    export = EXPORTS[kind]
+    return write_xlsx(export.title, export.headers, export.rows(export.query(user, params)), path=path)
@@ -0,0 +1,170 @@
+import json
+import os
+import re
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from google.auth import jwt as google_jwt
+
+# Certificados públicos (PEM) usados pelo Google para assinar os ID tokens
+GOOGLE_CERTS_URL = 'https://www.googleapis.com/oauth2/v1/certs'
+
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+
+# Cópia em disco dos certificados, compartilhada entre workers e reinícios
+CERTS_CACHE_PATH = os.environ.get(
+    'GOOGLE_CERTS_CACHE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database', 'google_certs.json')
+)
+
+# Validade usada quando a resposta não traz Cache-Control max-age (segundos)
+DEFAULT_MAX_AGE = 3600
+
+# Tolerância de relógio na validação de iat/exp (segundos)
+CLOCK_SKEW = 10
+
+# Intervalo mínimo entre buscas forçadas por kid desconhecido (segundos)
+MIN_REFRESH_INTERVAL = int(os.environ.get('GOOGLE_CERTS_MIN_REFRESH', '60'))
+
+MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+_session = None
+_session_lock = threading.Lock()
+
+def http_session():
+    """
+    Sessão HTTP compartilhada, com pool de conexões reaproveitadas entre chamadas.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=2))
+        return _session
+
+def _max_age(cache_control):
+    match = MAX_AGE_RE.search(cache_control or '')
+    return int(match.group(1)) if match else DEFAULT_MAX_AGE
+
+class GoogleCertStore:
+    """
+    Cache dos certificados do Google em memória e em disco, respeitando o
+    Cache-Control max-age da resposta. A rede só é acessada quando as duas
+    cópias expiram ou quando aparece um kid desconhecido (rotação de chaves).
+
+    Para testes sem rede, passe `certs` (dicionário kid -> PEM) ou defina
+    GOOGLE_CERTS_FILE com um arquivo JSON no mesmo formato.
+    """
+    def __init__(self, url=GOOGLE_CERTS_URL, cache_path=CERTS_CACHE_PATH, certs=None,
+                 min_refresh_interval=MIN_REFRESH_INTERVAL):
+        self.url = url
+        self.cache_path = cache_path
+        self.min_refresh_interval = min_refresh_interval
+        self._lock = threading.Lock()
+        self._certs = certs
+        # Certificados fornecidos diretamente nunca expiram nem são buscados
+        self._static = certs is not None
+        self._expires_at = float('inf') if self._static else 0.0
+        self._last_forced_refresh = None
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as f:
+            return cls(certs=json.load(f))
+
+    def _load_from_disk(self):
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if cached.get('expires_at', 0) <= time.time():
+            return False
+        self._certs = cached['certs']
+        self._expires_at = cached['expires_at']
+        return True
+
+    def _save_to_disk(self):
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'expires_at': self._expires_at, 'certs': self._certs}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _download(self):
+        """
+        Busca os certificados na rede. Retorna (certs, expires_at).
+        """
+        response = http_session().get(self.url, timeout=5)
+        response.raise_for_status()
+        return response.json(), time.time() + _max_age(response.headers.get('Cache-Control'))
+
+    def _update(self, certs, expires_at):
+        self._certs = certs
+        self._expires_at = expires_at
+        try:
+            self._save_to_disk()
+        except OSError:
+            # O cache em disco é opcional; a cópia em memória continua valendo
+            pass
+
+    def get_certs(self):
+        """
+        Certificados válidos (kid -> PEM), buscados só quando o cache expira.
+        """
+        if self._static:
+            return self._certs
+        with self._lock:
+            if self._expires_at <= time.time() and not self._load_from_disk():
+                self._update(*self._download())
+            return self._certs
+
+    def refresh_for_kid(self, kid):
+        """
+        Busca os certificados de novo quando aparece um kid desconhecido
+        (rotação antes do max-age expirar). No máximo uma busca forçada a cada
+        `min_refresh_interval` segundos; a rede é acessada fora do lock, então
+        as demais requisições seguem usando a cópia atual enquanto isso.
+        """
+        if self._static:
+            return self._certs
+        with self._lock:
+            now = time.monotonic()
+            recent = (self._last_forced_refresh is not None
+                      and now - self._last_forced_refresh < self.min_refresh_interval)
+            if kid in (self._certs or {}) or recent:
+                return self._certs
+            self._last_forced_refresh = now
+        certs, expires_at = self._download()
+        with self._lock:
+            self._update(certs, expires_at)
+            return self._certs
+
+_default_store = None
+
+def default_store():
+    global _default_store
+    if _default_store is None:
+        fixture = os.environ.get('GOOGLE_CERTS_FILE')
+        _default_store = GoogleCertStore.from_file(fixture) if fixture else GoogleCertStore()
+    return _default_store
+
+def verify_google_id_token(token, audience, store=None):
+    """
+    Verifica localmente um ID token do Google (assinatura, audiência, validade
+    e emissor) e devolve as claims. Lança ValueError se o token for inválido.
+    """
+    store = store or default_store()
+    kid = google_jwt.decode_header(token).get('kid')
+    certs = store.get_certs()
+    if kid not in certs:
+        # kid desconhecido: o Google trocou as chaves antes do max-age expirar
+        certs = store.refresh_for_kid(kid)
+    idinfo = google_jwt.decode(token, certs=certs, audience=audience, clock_skew_in_seconds=CLOCK_SKEW)
+
+    if idinfo.get('iss') not in GOOGLE_ISSUERS:
+        raise ValueError('Wrong issuer.')
+    return idinfo
@@ -0,0 +1,452 @@
+import csv
+import io
+import os
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, time
+from decimal import Decimal, InvalidOperation
+import click
+from openpyxl import load_workbook
+from src.models import db, Student, DanceClass, User, student_classes
+from src.models.teacher_stats import TeacherStats
+from src.utils.billing import refresh_students
+from src.utils.bulk import insert_ignore, upsert_increment
+from src.utils.response_cache import bump_scopes
+from src.utils.schedule import Slot, get_schedule_index, to_minutes, format_minutes, day_key, location_key
+
+# Tipos importáveis, na ordem em que são processados (turmas antes das matrículas)
+IMPORT_KINDS = ('classes', 'students', 'enrollments')
+
+# Nomes de aba aceitos em planilhas com vários tipos
+SHEET_NAMES = {
+    'classes': ('classes', 'turmas'),
+    'students': ('students', 'alunos'),
+    'enrollments': ('enrollments', 'matriculas', 'matrículas'),
+}
+
+# Cabeçalhos em português (inclusive os das exportações) para o nome do campo
+HEADER_ALIASES = {
+    'nome': 'name',
+    'telefone': 'phone_number',
+    'vencimento': 'payment_due_date',
+    'data de vencimento': 'payment_due_date',
+    'bolsa': 'scholarship_percentage',
+    'percentual de bolsa': 'scholarship_percentage',
+    'foto': 'photo_url',
+    'turmas': 'classes',
+    'dia da semana': 'day_of_week',
+    'início': 'start_time',
+    'inicio': 'start_time',
+    'fim': 'end_time',
+    'local': 'location',
+    'mensalidade': 'monthly_fee',
+    'aluno': 'student',
+    'turma': 'class',
+}
+
+# Linhas validadas e gravadas por transação
+CHUNK_SIZE = 1000
+
+# Quantidade máxima de erros listados no relatório (o total é sempre informado)
+MAX_REPORTED_ERRORS = 1000
+
+class ImportReport:
+    """
+    Resultado de uma importação: registros criados por tipo e erros por linha.
+    """
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.created = {kind: 0 for kind in IMPORT_KINDS}
+        self.errors = []
+        self.error_count = 0
+
+    def error(self, kind, row, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'sheet': kind, 'row': row, 'error': message})
+
+    def to_dict(self):
+        return {
+            'dry_run': self.dry_run,
+            'created': self.created,
+            'error_count': self.error_count,
+            'errors': self.errors
+        }
+
+# Leitura dos arquivos
+
+def _normalize_header(value):
+    key = str(value or '').strip().lower()
+    return HEADER_ALIASES.get(key, key.replace(' ', '_'))
+
+def _rows_with_header(rows, first_row=1):
+    """
+    Converte as linhas (a primeira é o cabeçalho) em (número da linha, dicionário),
+    ignorando linhas vazias.
+    """
+    header = None
+    for number, values in enumerate(rows, start=first_row):
+        if header is None:
+            header = [_normalize_header(value) for value in values]
+            continue
+        if not any(value not in (None, '') for value in values):
+            continue
+        yield number, dict(zip(header, values))
+
+def _sheet_kind(title):
+    title = title.strip().lower()
+    for kind, names in SHEET_NAMES.items():
+        if title in names:
+            return kind
+    return None
+
+def read_xlsx(file, kind=None):
+    """
+    Lê uma planilha em modo read-only. Cada aba com nome conhecido (alunos,
+    turmas, matriculas) é um tipo; sem abas conhecidas, a primeira aba é lida
+    como `kind`. Retorna {tipo: iterador de (linha, dicionário)}.
+    """
+    wb = load_workbook(file, read_only=True, data_only=True)
+    tables = {}
+    for ws in wb.worksheets:
+        sheet_kind = _sheet_kind(ws.title)
+        if sheet_kind:
+            tables[sheet_kind] = _rows_with_header(ws.iter_rows(values_only=True))
+    if not tables:
+        if not kind:
+            raise ValueError('Informe kind ou nomeie as abas como alunos, turmas e matriculas')
+        tables[kind] = _rows_with_header(wb.worksheets[0].iter_rows(values_only=True))
+    return tables
+
+def read_csv(file, kind):
+    """
+    Lê um CSV (separador vírgula ou ponto e vírgula) de um único tipo.
+    """
+    if not kind:
+        raise ValueError('kind é obrigatório para arquivos CSV')
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;')
+    except csv.Error:
+        dialect = csv.excel
+    return {kind: _rows_with_header(csv.reader(text, dialect))}
+
+def read_tables(file, filename, kind=None):
+    if kind and kind not in IMPORT_KINDS:
+        raise ValueError(f"kind deve ser um de: {', '.join(IMPORT_KINDS)}")
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.xlsx':
+        return read_xlsx(file, kind)
+    if extension == '.csv':
+        return read_csv(file, kind)
+    raise ValueError('Formato não suportado. Envie um arquivo .xlsx ou .csv')
+
+# Conversão dos valores das células
+
+def _text(row, field, required=False):
+    value = row.get(field)
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value = str(value).strip() if value is not None else ''
+    if required and not value:
+        raise ValueError(f'{field} é obrigatório')
+    return value or None
+
+def _date(row, field):
+    value = row.get(field)
+    if value in (None, ''):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    for fmt in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            pass
+    raise ValueError(f'{field} inválido: use AAAA-MM-DD ou DD/MM/AAAA')
+
+def _time(row, field):
+    value = row.get(field)
+    if isinstance(value, datetime):
+        return value.time()
+    if isinstance(value, time):
+        return value
+    try:
+        return datetime.strptime(str(value).strip(), '%H:%M').time()
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} inválido: use HH:MM')
+
+def _decimal(row, field, required=False):
+    value = row.get(field)
+    if value in (None, ''):
+        if required:
+            raise ValueError(f'{field} é obrigatório')
+        return None
+    text = str(value).replace('R$', '').replace('%', '').strip()
+    if ',' in text:
+        text = text.replace('.', '').replace(',', '.')
+    try:
+        number = Decimal(text)
+    except (InvalidOperation, ValueError):
+        raise ValueError(f'{field} deve ser numérico')
+    # Decimal aceita NaN e Infinity sem erro
+    if not number.is_finite():
+        raise ValueError(f'{field} deve ser numérico')
+    return number
+
+def _chunks(rows, size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def ensure_teacher(teacher_id):
+    """
+    Lança ValueError se teacher_id não for um professor cadastrado.
+    """
+    exists = db.session.query(User.id).filter(User.id == teacher_id, User.role == 'teacher').first()
+    if exists is None:
+        raise ValueError(f'Professor {teacher_id} não encontrado')
+
+def _conflict_message(slot):
+    return (f'Conflito de horário: {slot.day_of_week} {format_minutes(slot.start)}-'
+            f'{format_minutes(slot.end)} em {slot.location} já está ocupado')
+
+class Importer:
+    """
+    Importa turmas, alunos e matrículas de um professor em lotes: cada bloco de
+    CHUNK_SIZE linhas é validado, gravado com bulk_insert_mappings e confirmado
+    em uma transação. As linhas inválidas são apenas reportadas.
+
+    Como as gravações em lote não passam pelo flush do ORM, teacher_stats,
+    billing_status e as versões do cache são atualizados aqui explicitamente.
+    """
+    def __init__(self, teacher_id, dry_run=False):
+        ensure_teacher(teacher_id)
+        self.teacher_id = teacher_id
+        self.report = ImportReport(dry_run)
+        self.now = datetime.utcnow()
+
+        # Turmas por nome e alunos por telefone, para deduplicar e resolver matrículas
+        class_owner = DanceClass.teacher_id
+        self.class_ids = {
+            name.strip().lower(): class_id
+            for class_id, name in db.session.query(DanceClass.id, DanceClass.name).filter(class_owner == teacher_id)
+        }
+        student_owner = Student.teacher_id
+        self.student_ids = {
+            phone: student_id
+            for student_id, phone in db.session.query(Student.id, Student.phone_number).filter(student_owner == teacher_id)
+        }
+        self.known_class_ids = set(self.class_ids.values())
+        self.known_student_ids = set(self.student_ids.values())
+        self.enrollments = set()
+        # Horários das turmas aceitas neste arquivo, por (local, dia) e por dia do professor
+        self.new_slots = defaultdict(list)
+
+    def run(self, tables):
+        for kind in IMPORT_KINDS:
+            if kind in tables:
+                getattr(self, f'import_{kind}')(tables[kind])
+        self.save_enrollments()
+        return self.report
+
+    def _save(self, model, mappings, kind, stats_column, scope):
+        if not mappings:
+            return
+        self.report.created[kind] += len(mappings)
+        if self.report.dry_run:
+            return
+        try:
+            db.session.bulk_insert_mappings(model, mappings)
+            counts = {'student_count': 0, 'class_count': 0, 'combo_count': 0}
+            counts[stats_column] = len(mappings)
+            upsert_increment(
+                TeacherStats, [dict(teacher_id=self.teacher_id, **counts)],
+                index_elements=['teacher_id'], increment_columns=list(counts)
+            )
+            if model is Student:
+                refresh_students([mapping['id'] for mapping in mappings])
+            bump_scopes(scope, f'teacher:{self.teacher_id}')
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _check_schedule(self, index, mapping):
+        """
+        Lança ValueError se a turma ocupar um local ou o professor em um horário
+        já usado por turmas gravadas ou por linhas anteriores do arquivo.
+        """
+        day, location = mapping['day_of_week'], mapping['location']
+        start, end = to_minutes(mapping['start_time']), to_minutes(mapping['end_time'])
+        for _, slot in index.conflicts_for(day, start, end, location=location, teacher_id=self.teacher_id):
+            raise ValueError(_conflict_message(slot))
+        keys = [('location', location_key(location), day_key(day)), ('teacher', day_key(day))]
+        for key in keys:
+            for slot in self.new_slots[key]:
+                if slot.start < end and start < slot.end:
+                    raise ValueError(_conflict_message(slot))
+        slot = Slot(mapping['id'], self.teacher_id, mapping['name'], day, location, start, end)
+        for key in keys:
+            self.new_slots[key].append(slot)
+
+    def import_classes(self, rows):
+        for chunk in _chunks(rows):
+            # Turmas já gravadas, inclusive as dos blocos anteriores desta importação
+            index = get_schedule_index()
+            mappings = []
+            for number, row in chunk:
+                try:
+                    name = _text(row, 'name', required=True)
+                    if name.lower() in self.class_ids:
+                        raise ValueError(f'Turma "{name}" já existe')
+                    mapping = {
+                        'id': str(uuid.uuid4()),
+                        'teacher_id': self.teacher_id,
+                        'name': name,
+                        'day_of_week': _text(row, 'day_of_week', required=True),
+                        'start_time': _time(row, 'start_time'),
+                        'end_time': _time(row, 'end_time'),
+                        'location': _text(row, 'location', required=True),
+                        'monthly_fee': float(_decimal(row, 'monthly_fee', required=True))
+                    }
+                    if mapping['end_time'] <= mapping['start_time']:
+                        raise ValueError('end_time deve ser posterior a start_time')
+                    self._check_schedule(index, mapping)
+                except ValueError as e:
+                    self.report.error('classes', number, str(e))
+                    continue
+                self.class_ids[name.lower()] = mapping['id']
+                self.known_class_ids.add(mapping['id'])
+                mappings.append(mapping)
+            self._save(DanceClass, mappings, 'classes', 'class_count', 'classes')
+
+    def import_students(self, rows):
+        for chunk in _chunks(rows):
+            mappings = []
+            for number, row in chunk:
+                try:
+                    phone = _text(row, 'phone_number', required=True)
+                    if phone in self.student_ids:
+                        raise ValueError(f'Telefone {phone} já cadastrado')
+                    scholarship = _decimal(row, 'scholarship_percentage') or 0
+                    if not 0 <= scholarship <= 100:
+                        raise ValueError('scholarship_percentage deve estar entre 0 e 100')
+                    class_ids = [self._class_id(name) for name in (_text(row, 'classes') or '').split(';') if name.strip()]
+                    mapping = {
+                        'id': str(uuid.uuid4()),
+                        'teacher_id': self.teacher_id,
+                        'name': _text(row, 'name', required=True),
+                        'phone_number': phone,
+                        'payment_due_date': _date(row, 'payment_due_date'),
+                        'scholarship_percentage': int(scholarship),
+                        'photo_url': _text(row, 'photo_url')
+                    }
+                except ValueError as e:
+                    self.report.error('students', number, str(e))
+                    continue
+                self.student_ids[phone] = mapping['id']
+                self.known_student_ids.add(mapping['id'])
+                self.enrollments.update((mapping['id'], class_id) for class_id in class_ids)
+                mappings.append(mapping)
+            self._save(Student, mappings, 'students', 'student_count', 'students')
+
+    def _class_id(self, value):
+        value = value.strip()
+        if value in self.known_class_ids:
+            return value
+        class_id = self.class_ids.get(value.lower())
+        if class_id is None:
+            raise ValueError(f'Turma "{value}" não encontrada')
+        return class_id
+
+    def _student_id(self, value):
+        if value in self.known_student_ids:
+            return value
+        student_id = self.student_ids.get(value)
+        if student_id is None:
+            raise ValueError(f'Aluno "{value}" não encontrado (informe o id ou o telefone)')
+        return student_id
+
+    def import_enrollments(self, rows):
+        for number, row in rows:
+            try:
+                pair = (self._student_id(_text(row, 'student', required=True)), self._class_id(_text(row, 'class', required=True)))
+            except ValueError as e:
+                self.report.error('enrollments', number, str(e))
+                continue
+            self.enrollments.add(pair)
+
+    def save_enrollments(self):
+        """
+        Grava todas as matrículas resolvidas, ignorando as que já existem.
+        """
+        pairs = sorted(self.enrollments)
+        if not pairs:
+            return
+        if self.report.dry_run:
+            self.report.created['enrollments'] = len(pairs) - self._existing_enrollments(pairs)
+            return
+        try:
+            for chunk in _chunks(pairs):
+                self.report.created['enrollments'] += insert_ignore(student_classes, [
+                    {'student_id': student_id, 'class_id': class_id, 'created_at': self.now}
+                    for student_id, class_id in chunk
+                ])
+            bump_scopes('students', 'classes', f'teacher:{self.teacher_id}',
+                        *{f'class:{class_id}' for _, class_id in pairs})
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _existing_enrollments(self, pairs):
+        """
+        Quantas das matrículas informadas já existem (usado na validação sem gravar).
+        """
+        existing = 0
+        for chunk in _chunks(pairs):
+            wanted = set(chunk)
+            rows = db.session.query(student_classes.c.student_id, student_classes.c.class_id).filter(
+                student_classes.c.student_id.in_({student_id for student_id, _ in chunk}),
+                student_classes.c.class_id.in_({class_id for _, class_id in chunk})
+            )
+            existing += sum(1 for row in rows if tuple(row) in wanted)
+        return existing
+
+def import_file(file, filename, teacher_id, kind=None, dry_run=False):
+    """
+    Importa um arquivo .xlsx ou .csv para o professor informado e devolve o
+    relatório (dicionário). Lança ValueError se o arquivo não puder ser lido.
+    """
+    tables = read_tables(file, filename, kind)
+    return Importer(teacher_id, dry_run=dry_run).run(tables).to_dict()
+
+@click.command('import-data')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--teacher-id', required=True, help='Professor dono dos registros importados.')
+@click.option('--kind', type=click.Choice(IMPORT_KINDS), help='Tipo do arquivo (obrigatório para CSV).')
+@click.option('--dry-run', is_flag=True, help='Apenas valida, sem gravar.')
+def import_data_command(path, teacher_id, kind, dry_run):
+    """Importa turmas, alunos e matrículas de um arquivo .xlsx ou .csv."""
+    with open(path, 'rb') as f:
+        report = import_file(f, path, teacher_id, kind=kind, dry_run=dry_run)
+    created = ', '.join(f'{count} {kind_name}' for kind_name, count in report['created'].items())
+    click.echo(f"{'Validado' if dry_run else 'Importado'}: {created}. {report['error_count']} erro(s).")
+    for error in report['errors']:
+        click.echo(f"  {error['sheet']} linha {error['row']}: {error['error']}")
+
+def init_importer(app):
+    """
+    Registra o comando de importação.
+    """
+    app.cli.add_command(import_data_command)
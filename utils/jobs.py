@@ -0,0 +1,225 @@
+import json
+import os
+import re
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from sqlalchemy import and_, or_
+from src.models import db
+from src.models.job import Job
+from src.utils.auth import get_user_principal
+from src.utils.billing import ensure_fresh
+from src.utils.tokens import cleanup_revocations
+from src.utils.export import EXPORTS, export_to_file, write_xlsx
+from src.utils.importer import import_file, ensure_teacher
+from src.utils.revenue import revenue_report, parse_report_params
+
+# Diretório dos arquivos gerados pelos jobs e tempo de vida dos resultados
+ARTIFACT_DIR = os.environ.get(
+    'JOB_ARTIFACT_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database', 'artifacts')
+)
+ARTIFACT_TTL = timedelta(hours=int(os.environ.get('JOB_ARTIFACT_TTL_HOURS', '24')))
+
+# Um job em running há mais que isso é de um worker que caiu e volta para a fila
+JOB_LEASE = timedelta(minutes=int(os.environ.get('JOB_LEASE_MINUTES', '30')))
+
+# Intervalo entre verificações da fila pelo worker (segundos)
+POLL_INTERVAL = 2
+
+def _run_export(job, owner):
+    params = job.get_params()
+    export = EXPORTS[params['export']]
+    path = os.path.join(ARTIFACT_DIR, f'{job.id}.xlsx')
+    export_to_file(params['export'], owner, params.get('filters', {}), path)
+    return path, export.download_name
+
+# Arquivos de importação enviados por POST /import (ver routes/imports.py)
+UPLOAD_RE = re.compile(r'^import-[0-9a-f]{32}\.(xlsx|csv)$')
+
+def _run_import(job, owner):
+    params = job.get_params()
+    upload_path = os.path.join(ARTIFACT_DIR, params['upload'])
+    # Professores só importam para si mesmos
+    teacher_id = params.get('teacher_id') if owner.role == 'admin' else owner.id
+    try:
+        with open(upload_path, 'rb') as f:
+            report = import_file(f, params['upload'], teacher_id, kind=params.get('kind'), dry_run=params.get('dry_run', False))
+    finally:
+        if os.path.exists(upload_path):
+            os.remove(upload_path)
+    path = os.path.join(ARTIFACT_DIR, f'{job.id}.json')
+    with open(path, 'w') as f:
+        json.dump(report, f, ensure_ascii=False)
+    return path, 'relatorio_importacao.json'
+
+# Títulos das dimensões na planilha do relatório de receita
+REPORT_HEADERS = {'month': 'Mês', 'teacher_id': 'Professor', 'payment_type': 'Tipo'}
+
+def _run_revenue_report(job, owner):
+    params = job.get_params()
+    report = parse_report_params(params)
+    # Professores só geram o relatório da própria receita
+    teacher_id = params.get('teacher_id') if owner.role == 'admin' else owner.id
+    group_by = report['group_by']
+    rows = revenue_report(
+        report['start_month'], report['end_month'], group_by,
+        teacher_id=teacher_id, payment_type=report['payment_type']
+    )
+    path = os.path.join(ARTIFACT_DIR, f'{job.id}.xlsx')
+    write_xlsx(
+        'Receita ABAA',
+        [REPORT_HEADERS[field] for field in group_by] + ['Receita', 'Pagamentos'],
+        ([row[field] for field in group_by] + [row['revenue'], row['payment_count']] for row in rows),
+        path=path
+    )
+    return path, 'relatorio_receita.xlsx'
+
+# Tipos de job conhecidos: cada handler recebe (job, principal do dono)
+# e devolve (caminho do arquivo gerado, nome para download)
+JOB_HANDLERS = {
+    'export': _run_export,
+    'import': _run_import,
+    'revenue_report': _run_revenue_report,
+}
+
+def validate_job(kind, params):
+    """
+    Valida tipo e parâmetros antes de enfileirar. Lança ValueError.
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Tipo de job inválido: {kind}")
+    if kind == 'export' and params.get('export') not in EXPORTS:
+        raise ValueError(f"export deve ser um de: {', '.join(EXPORTS)}")
+    if kind == 'import' and not UPLOAD_RE.match(params.get('upload') or ''):
+        raise ValueError('upload inválido: envie o arquivo por POST /import?async=1')
+    if kind == 'import' and params.get('teacher_id'):
+        ensure_teacher(params['teacher_id'])
+    if kind == 'revenue_report':
+        parse_report_params(params)
+
+def enqueue_job(kind, params, owner_id):
+    """
+    Registra um novo job na fila e devolve o objeto criado (já confirmado).
+    """
+    validate_job(kind, params)
+    job = Job(kind=kind, params=json.dumps(params), owner_id=owner_id, status='queued')
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+def claim_next_job():
+    """
+    Reserva o próximo job da fila. A troca de status é condicional
+    (UPDATE ... WHERE status = 'queued') para que dois workers não peguem o mesmo job.
+    """
+    candidates = db.session.query(Job.id).filter(Job.status == 'queued').order_by(Job.created_at).limit(5).all()
+    for (job_id,) in candidates:
+        claimed = Job.query.filter(Job.id == job_id, Job.status == 'queued').update(
+            {'status': 'running', 'started_at': datetime.utcnow()}, synchronize_session=False
+        )
+        db.session.commit()
+        if claimed:
+            return job_id
+    return None
+
+def requeue_stale_jobs():
+    """
+    Devolve para a fila os jobs em running cujo started_at passou de JOB_LEASE
+    (o worker que os reservou parou sem registrar o resultado).
+    Retorna a quantidade de jobs devolvidos.
+    """
+    requeued = Job.query.filter(
+        Job.status == 'running',
+        Job.started_at < datetime.utcnow() - JOB_LEASE
+    ).update({'status': 'queued', 'started_at': None}, synchronize_session=False)
+    db.session.commit()
+    return requeued
+
+def run_job(app, job_id):
+    """
+    Executa um job reservado, registrando o resultado ou o erro.
+    """
+    with app.app_context():
+        job = db.session.get(Job, job_id)
+        try:
+            owner = get_user_principal(job.owner_id)
+            if owner is None:
+                raise ValueError('Usuário dono do job não encontrado')
+            os.makedirs(ARTIFACT_DIR, exist_ok=True)
+            path, name = JOB_HANDLERS[job.kind](job, owner)
+            job.status = 'done'
+            job.result_path = path
+            job.result_name = name
+            job.expires_at = datetime.utcnow() + ARTIFACT_TTL
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(Job, job_id)
+            job.status = 'failed'
+            job.error = str(e)
+            job.expires_at = datetime.utcnow() + ARTIFACT_TTL
+            current_app.logger.error(traceback.format_exc())
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        db.session.remove()
+
+def cleanup_expired_jobs():
+    """
+    Remove arquivos e registros de jobs cujo resultado expirou, inclusive os
+    que falharam (os gravados sem expires_at expiram ARTIFACT_TTL após o fim).
+    Retorna a quantidade de jobs removidos.
+    """
+    now = datetime.utcnow()
+    expired = Job.query.filter(or_(
+        Job.expires_at < now,
+        and_(Job.status == 'failed', Job.expires_at.is_(None), Job.finished_at < now - ARTIFACT_TTL)
+    )).all()
+    for job in expired:
+        if job.result_path and os.path.exists(job.result_path):
+            os.remove(job.result_path)
+        db.session.delete(job)
+    db.session.commit()
+    return len(expired)
+
+@click.command('jobs-worker')
+@click.option('--threads', default=2, show_default=True, help='Quantidade de jobs executados em paralelo.')
+@click.option('--once', is_flag=True, help='Processa a fila atual e termina.')
+def jobs_worker_command(threads, once):
+    """Executa o worker local de jobs em segundo plano."""
+    app = current_app._get_current_object()
+    click.echo(f'Worker de jobs iniciado ({threads} thread(s)). Artefatos em {ARTIFACT_DIR}')
+    last_cleanup = 0
+    running = set()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        while True:
+            if time.monotonic() - last_cleanup > 300:
+                removed = cleanup_expired_jobs()
+                if removed:
+                    click.echo(f'{removed} job(s) expirado(s) removido(s)')
+                requeued = requeue_stale_jobs()
+                if requeued:
+                    click.echo(f'{requeued} job(s) interrompido(s) devolvido(s) à fila')
+                cleanup_revocations()
+                # Recálculo diário da situação de cobrança (uma vez por dia)
+                ensure_fresh()
+                last_cleanup = time.monotonic()
+
+            running = {future for future in running if not future.done()}
+            job_id = claim_next_job() if len(running) < threads else None
+            if job_id:
+                click.echo(f'Executando job {job_id}')
+                running.add(pool.submit(run_job, app, job_id))
+                continue
+
+            if once and not running:
+                break
+            time.sleep(POLL_INTERVAL)
+
+def init_jobs(app):
+    """
+    Registra o comando do worker de jobs.
+    """
+    app.cli.add_command(jobs_worker_command)
@@ -0,0 +1,189 @@
+import logging
+import os
+import threading
+import time
+import traceback
+from collections import defaultdict
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Limites (em segundos) dos buckets do histograma de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Limites dos buckets de consultas por requisição (valores altos indicam N+1)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+# Consultas mais lentas que este valor (ms) são registradas no log; 0 desativa
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '0'))
+
+# Raiz do projeto, usada para encontrar o ponto de chamada das consultas lentas
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Histogram:
+    """
+    Histograma cumulativo no formato do Prometheus.
+    """
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, limit in enumerate(self.buckets):
+            if value <= limit:
+                self.counts[i] += 1
+
+class _RequestMetrics:
+    """
+    Tempo e consultas acumulados durante uma requisição (guardado em g).
+    """
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+
+# Métricas locais ao processo: com vários workers do gunicorn cada um expõe as suas
+_lock = threading.Lock()
+_latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+_queries = defaultdict(lambda: Histogram(QUERY_BUCKETS))
+_db_seconds = defaultdict(float)
+_responses = defaultdict(int)
+
+def _call_site():
+    """
+    Primeiro quadro da pilha pertencente ao código da aplicação
+    (fora de bibliotecas e deste módulo), no formato arquivo:linha em função.
+    """
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if filename == os.path.abspath(__file__) or not filename.startswith(APP_ROOT):
+            continue
+        if 'site-packages' in filename:
+            continue
+        return f'{os.path.relpath(filename, APP_ROOT)}:{frame.lineno} em {frame.name}'
+    return 'desconhecido'
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    if has_request_context():
+        metrics = g.get('request_metrics')
+        if metrics is not None:
+            metrics.queries += 1
+            metrics.db_time += elapsed
+
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        endpoint = request.endpoint if has_request_context() else None
+        logger.warning(
+            'Consulta lenta (%.1f ms) em %s [endpoint %s]: %s',
+            elapsed * 1000, _call_site(), endpoint or '-', statement
+        )
+
+def _handle_error(context):
+    # Consulta que falhou não passa por after_cursor_execute: descartar o início
+    # para não desalinhar a pilha das próximas consultas da conexão
+    if context.connection is None:
+        return
+    starts = context.connection.info.get('query_start')
+    if starts:
+        starts.pop()
+
+def _before_request():
+    g.request_metrics = _RequestMetrics()
+
+def _after_request(response):
+    metrics = g.pop('request_metrics', None)
+    if metrics is None:
+        return response
+
+    duration = time.perf_counter() - metrics.start
+    # Rotas inexistentes ficam agrupadas para não criar uma série por URL
+    key = (request.endpoint or 'unmatched', request.method)
+    with _lock:
+        _latency[key].observe(duration)
+        _queries[key].observe(metrics.queries)
+        _db_seconds[key] += metrics.db_time
+        _responses[key + (str(response.status_code),)] += 1
+
+    response.headers.add(
+        'Server-Timing',
+        f'app;dur={duration * 1000:.1f}, db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"'
+    )
+    return response
+
+def _labels(endpoint, method, status=None, le=None):
+    labels = [f'endpoint="{_escape(endpoint)}"', f'method="{method}"']
+    if status is not None:
+        labels.append(f'status="{status}"')
+    if le is not None:
+        labels.append(f'le="{le}"')
+    return '{' + ','.join(labels) + '}'
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _render_histogram(lines, name, histograms):
+    for (endpoint, method), histogram in sorted(histograms.items()):
+        for limit, count in zip(histogram.buckets, histogram.counts):
+            lines.append(f'{name}_bucket{_labels(endpoint, method, le=limit)} {count}')
+        lines.append(f'{name}_bucket{_labels(endpoint, method, le="+Inf")} {histogram.count}')
+        lines.append(f'{name}_sum{_labels(endpoint, method)} {histogram.sum}')
+        lines.append(f'{name}_count{_labels(endpoint, method)} {histogram.count}')
+
+def render_metrics():
+    """
+    Métricas acumuladas no formato texto do Prometheus.
+    """
+    lines = []
+    with _lock:
+        lines.append('# HELP http_requests_total Requisições atendidas por endpoint, método e status.')
+        lines.append('# TYPE http_requests_total counter')
+        for (endpoint, method, status), count in sorted(_responses.items()):
+            lines.append(f'http_requests_total{_labels(endpoint, method, status=status)} {count}')
+
+        lines.append('# HELP http_request_duration_seconds Latência das requisições por endpoint.')
+        lines.append('# TYPE http_request_duration_seconds histogram')
+        _render_histogram(lines, 'http_request_duration_seconds', _latency)
+
+        lines.append('# HELP http_request_db_queries Consultas SQL executadas por requisição.')
+        lines.append('# TYPE http_request_db_queries histogram')
+        _render_histogram(lines, 'http_request_db_queries', _queries)
+
+        lines.append('# HELP http_request_db_seconds_total Tempo total gasto no banco por endpoint.')
+        lines.append('# TYPE http_request_db_seconds_total counter')
+        for (endpoint, method), seconds in sorted(_db_seconds.items()):
+            lines.append(f'http_request_db_seconds_total{_labels(endpoint, method)} {seconds}')
+    return '\n'.join(lines) + '\n'
+
+def reset_metrics():
+    with _lock:
+        _latency.clear()
+        _queries.clear()
+        _db_seconds.clear()
+        _responses.clear()
+
+def init_metrics(app):
+    """
+    Registra os hooks de tempo por requisição e os eventos de consulta SQL.
+    Desative com METRICS_ENABLED=0.
+    """
+    if os.environ.get('METRICS_ENABLED', '1') == '0':
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
@@ -0,0 +1,139 @@
+import base64
+import json
+import os
+from datetime import datetime
+from sqlalchemy import and_, inspect, or_
+from src.utils.serialization import schema_for
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+# Parâmetros de query string que ativam a resposta paginada
+PAGINATION_ARGS = ('limit', 'cursor', 'fields')
+
+# Teto das listagens pedidas sem parâmetros de paginação
+MAX_UNPAGED = int(os.environ.get('LIST_MAX_ROWS', '1000'))
+
+# Cabeçalho com o cursor para continuar uma listagem sem paginação que foi truncada
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+def wants_pagination(args):
+    """
+    Indica se a requisição pediu a resposta paginada.
+    Sem esses parâmetros as rotas mantêm o formato de lista por compatibilidade,
+    limitada a MAX_UNPAGED registros (ver capped_list).
+    """
+    return any(arg in args for arg in PAGINATION_ARGS)
+
+def encode_cursor(created_at, record_id):
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    payload = json.dumps([created_at, record_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        created_at = datetime.fromisoformat(created_at)
+    except (ValueError, TypeError):
+        raise ValueError('cursor inválido')
+    # Sem as duas partes o filtro viraria created_at > NULL e encerraria a listagem
+    if not record_id:
+        raise ValueError('cursor inválido')
+    return created_at, record_id
+
+def _parse_limit(value):
+    if value is None:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError('limit deve ser um número inteiro')
+    if limit < 1:
+        raise ValueError('limit deve ser maior que zero')
+    return min(limit, MAX_LIMIT)
+
+def _parse_fields(model, value):
+    """
+    Converte `fields=a,b,c` na lista de colunas do modelo.
+    `id` e `created_at` são sempre carregados porque compõem o cursor.
+    """
+    if not value:
+        return None
+    columns = {attr.key for attr in inspect(model).column_attrs}
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in columns]
+    if unknown:
+        raise ValueError(f"Campos inválidos: {', '.join(unknown)}")
+    return fields
+
+def paginate(query, model, args):
+    """
+    Aplica paginação por cursor (keyset) em (created_at, id) sobre a query.
+    Retorna {"items": [...], "next_cursor": ...}.
+
+    Parâmetros aceitos em `args`:
+    - limit: quantidade de registros por página (máximo MAX_LIMIT)
+    - cursor: valor de next_cursor devolvido pela página anterior
+    - fields: lista de colunas separadas por vírgula (só essas colunas são lidas)
+    """
+    limit = _parse_limit(args.get('limit'))
+    fields = _parse_fields(model, args.get('fields'))
+
+    cursor = args.get('cursor')
+    if cursor:
+        created_at, record_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            model.created_at > created_at,
+            and_(model.created_at == created_at, model.id > record_id)
+        ))
+
+    query = query.order_by(model.created_at, model.id).limit(limit + 1)
+
+    # Busca um registro a mais para saber se existe próxima página
+    if fields:
+        # Projeção: apenas as colunas pedidas (e as do cursor), lidas como tuplas
+        loaded = list(dict.fromkeys(fields + ['id', 'created_at']))
+        rows = schema_for(model, loaded).rows(query)
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        items = [{field: row[field] for field in fields} for row in rows]
+        last = (rows[-1]['created_at'], rows[-1]['id']) if rows else None
+    else:
+        records = query.all()
+        has_next = len(records) > limit
+        records = records[:limit]
+        items = [record.to_dict() for record in records]
+        last = (records[-1].created_at, records[-1].id) if records else None
+
+    next_cursor = encode_cursor(*last) if has_next else None
+    return {"items": items, "next_cursor": next_cursor}
+
+def _cursor_of(record):
+    if isinstance(record, dict):
+        return record['created_at'], record['id']
+    return record.created_at, record.id
+
+def capped_list(query, model, rows=None):
+    """
+    Listagem sem paginação explícita, limitada a MAX_UNPAGED registros na ordem
+    do cursor (created_at, id). `rows` converte a query (por exemplo,
+    Schema.rows); sem ele, os objetos são carregados.
+    Retorna (registros, next_cursor); next_cursor só vem preenchido quando a
+    lista foi truncada.
+    """
+    query = query.order_by(model.created_at, model.id).limit(MAX_UNPAGED + 1)
+    records = rows(query) if rows else query.all()
+    if len(records) <= MAX_UNPAGED:
+        return records, None
+    records = records[:MAX_UNPAGED]
+    return records, encode_cursor(*_cursor_of(records[-1]))
+
+def with_next_cursor(response, next_cursor):
+    """
+    Informa em NEXT_CURSOR_HEADER que a lista foi truncada e de onde continuar
+    (com ?cursor=...).
+    """
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
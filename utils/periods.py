@@ -0,0 +1,101 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, cast, Date
+from src.models.user import db
+
+GRANULARITIES = ('day', 'week', 'month')
+
+# Limite de períodos por consulta, para evitar respostas gigantes
+MAX_BUCKETS = 400
+
+def bucket_start(value, granularity):
+    """Início do período (dia, semana iniciada na segunda-feira ou mês) de uma data."""
+    if granularity == 'day':
+        return value
+    if granularity == 'week':
+        return value - timedelta(days=value.weekday())
+    return value.replace(day=1)
+
+def next_bucket(value, granularity):
+    if granularity == 'day':
+        return value + timedelta(days=1)
+    if granularity == 'week':
+        return value + timedelta(days=7)
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def bucket_end(value, granularity):
+    return next_bucket(value, granularity) - timedelta(days=1)
+
+def shift_buckets(value, granularity, count):
+    """Volta `count` períodos a partir do início de período `value`."""
+    if granularity == 'day':
+        return value - timedelta(days=count)
+    if granularity == 'week':
+        return value - timedelta(days=7 * count)
+    month_index = value.year * 12 + value.month - 1 - count
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+def bucket_expression(column, granularity):
+    """
+    Expressão SQL que leva uma coluna de data ao início do seu período,
+    para uso em GROUP BY. Suporta SQLite e PostgreSQL.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if granularity == 'day':
+        return column
+    if dialect == 'sqlite':
+        if granularity == 'week':
+            # 'weekday 0' avança até o domingo; -6 dias volta à segunda-feira
+            return func.date(column, 'weekday 0', '-6 days')
+        return func.date(column, 'start of month')
+    return cast(func.date_trunc(granularity, column), Date)
+
+def to_date(value):
+    """Normaliza o valor de bucket devolvido pelo banco (str no SQLite)."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.strptime(value[:10], '%Y-%m-%d').date()
+    return value
+
+def parse_period_args(args, default_count=4, default_granularity='week', count_arg='weeks'):
+    """
+    Lê granularity, start_date/end_date e a quantidade de períodos da query string.
+    Retorna (granularity, start, end) com start/end alinhados aos períodos.
+    Lança ValueError para parâmetros inválidos.
+    """
+    granularity = args.get('granularity', default_granularity)
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity deve ser um de: {', '.join(GRANULARITIES)}")
+
+    end_str = args.get('end_date')
+    end = datetime.strptime(end_str, '%Y-%m-%d').date() if end_str else date.today()
+    end = bucket_end(bucket_start(end, granularity), granularity)
+
+    start_str = args.get('start_date')
+    if start_str:
+        start = bucket_start(datetime.strptime(start_str, '%Y-%m-%d').date(), granularity)
+    else:
+        count = int(args.get(count_arg, default_count))
+        if count < 1:
+            raise ValueError(f'{count_arg} deve ser maior que zero')
+        start = shift_buckets(bucket_start(end, granularity), granularity, count - 1)
+
+    if start > end:
+        raise ValueError('start_date deve ser anterior a end_date')
+
+    buckets = 0
+    current = start
+    while current <= end:
+        buckets += 1
+        if buckets > MAX_BUCKETS:
+            raise ValueError(f'Intervalo muito grande: máximo de {MAX_BUCKETS} períodos')
+        current = next_bucket(current, granularity)
+
+    return granularity, start, end
+
+def iter_buckets(start, end, granularity):
+    """Percorre os inícios de período entre start e end (inclusive)."""
+    current = start
+    while current <= end:
+        yield current
+        current = next_bucket(current, granularity)
@@ -0,0 +1,152 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
+
+# Tamanho máximo aceito por foto enviada
+MAX_PHOTO_BYTES = int(os.environ.get('MAX_PHOTO_BYTES', str(10 * 1024 * 1024)))
+
+# Tamanho dos blocos lidos do upload
+CHUNK_SIZE = 64 * 1024
+
+# Pasta dos uploads ainda não validados; fica fora das pastas servidas em /static
+UPLOAD_TEMP_DIR = os.environ.get('PHOTO_UPLOAD_TMP') or tempfile.gettempdir()
+
+# Variantes geradas para cada foto: nome -> (lado máximo em pixels, qualidade JPEG)
+VARIANTS = {
+    'thumb': (160, 80),
+    'web': (1024, 82),
+}
+
+logger = logging.getLogger(__name__)
+
+# Geração das variantes fora da requisição
+_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('PHOTO_WORKERS', '2')))
+
+class PhotoTooLarge(Exception):
+    pass
+
+class InvalidPhoto(Exception):
+    pass
+
+def verify_image(path):
+    """
+    Confere com o Pillow se o arquivo é uma imagem íntegra. Lança InvalidPhoto.
+    """
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except Exception:
+        raise InvalidPhoto('Arquivo enviado não é uma imagem válida')
+
+def _move_into(source, target):
+    """
+    Move o arquivo validado para o destino. Entre sistemas de arquivos
+    diferentes, copia para um temporário oculto ao lado do destino e troca
+    atomicamente, para o destino nunca aparecer pela metade.
+    """
+    try:
+        os.replace(source, target)
+        return
+    except OSError:
+        pass
+    fd, staging = tempfile.mkstemp(dir=os.path.dirname(target), prefix='.', suffix='.part')
+    os.close(fd)
+    try:
+        shutil.copyfile(source, staging)
+        os.replace(staging, target)
+    finally:
+        if os.path.exists(staging):
+            os.remove(staging)
+    os.remove(source)
+
+def save_upload(stream, folder, extension):
+    """
+    Grava o upload em um arquivo temporário fora da pasta pública
+    (UPLOAD_TEMP_DIR), em blocos, calculando o SHA-256 do conteúdo. Só depois de
+    validada a imagem é movida para `folder`. Fotos idênticas resultam no mesmo
+    arquivo final (deduplicação).
+    Retorna (hash, nome do arquivo final). Lança PhotoTooLarge acima de
+    MAX_PHOTO_BYTES e InvalidPhoto se o conteúdo não for uma imagem válida;
+    nesses casos nada é gravado na pasta final.
+    """
+    os.makedirs(folder, exist_ok=True)
+    os.makedirs(UPLOAD_TEMP_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=UPLOAD_TEMP_DIR, suffix='.upload')
+    try:
+        with os.fdopen(fd, 'wb') as temp:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_PHOTO_BYTES:
+                    raise PhotoTooLarge(f'Arquivo maior que o limite de {MAX_PHOTO_BYTES // (1024 * 1024)} MB')
+                digest.update(chunk)
+                temp.write(chunk)
+
+        verify_image(temp_path)
+        content_hash = digest.hexdigest()[:32]
+        filename = f'{content_hash}.{extension}'
+        final_path = os.path.join(folder, filename)
+        if os.path.exists(final_path):
+            os.remove(temp_path)
+        else:
+            _move_into(temp_path, final_path)
+        return content_hash, filename
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def variant_filename(content_hash, variant):
+    return f'{content_hash}_{variant}.jpg'
+
+def missing_variants(folder, content_hash):
+    """
+    Nomes das variantes que ainda não existem na pasta.
+    """
+    return [
+        name for name in VARIANTS
+        if not os.path.exists(os.path.join(folder, variant_filename(content_hash, name)))
+    ]
+
+def generate_variants(folder, filename, content_hash):
+    """
+    Gera as variantes redimensionadas (JPEG otimizado) que ainda não existem.
+    """
+    missing = {name: VARIANTS[name] for name in missing_variants(folder, content_hash)}
+    if not missing:
+        return
+
+    with Image.open(os.path.join(folder, filename)) as original:
+        # Respeitar a orientação EXIF das fotos de celular
+        image = ImageOps.exif_transpose(original).convert('RGB')
+        for name, (max_side, quality) in missing.items():
+            variant = image.copy()
+            variant.thumbnail((max_side, max_side), Image.LANCZOS)
+            target = os.path.join(folder, variant_filename(content_hash, name))
+            fd, temp_path = tempfile.mkstemp(dir=folder, suffix='.jpg')
+            os.close(fd)
+            try:
+                variant.save(temp_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+                os.replace(temp_path, target)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+def schedule_variants(folder, filename, content_hash):
+    """
+    Agenda a geração das variantes no pool de threads.
+    """
+    def run():
+        try:
+            generate_variants(folder, filename, content_hash)
+        except Exception:
+            logger.exception('Falha ao gerar variantes da foto %s', filename)
+    return _executor.submit(run)
@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from src.models.user import db
+
+class QueryCounter:
+    """
+    Registra as instruções SQL executadas enquanto estiver ativo.
+    """
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+@contextmanager
+def count_queries(engine=None):
+    """
+    Conta as consultas SQL executadas no bloco:
+
+        with count_queries() as counter:
+            load_roster(class_id)
+        print(counter.count)
+    """
+    engine = engine or db.engine
+    counter = QueryCounter()
+    event.listen(engine, 'before_cursor_execute', counter._before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', counter._before_cursor_execute)
+
+@contextmanager
+def assert_max_queries(limit, engine=None):
+    """
+    Falha com AssertionError se o bloco executar mais de `limit` consultas.
+    Útil para garantir que um endpoint não voltou a ter N+1.
+    """
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        listed = '\n'.join(counter.statements)
+        raise AssertionError(f'{counter.count} consultas executadas (máximo {limit}):\n{listed}')
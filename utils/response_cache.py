@@ -0,0 +1,184 @@
+import hashlib
+import logging
+import threading
+from functools import wraps
+from flask import request, make_response, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from src.models import db, Student, DanceClass, Payment, Attendance, User
+from src.models.private_class_combo import PrivateClassCombo
+from src.models.cache_version import CacheVersion
+from src.utils.bulk import upsert_increment
+from src.utils.auth import get_current_user_id
+from src.utils.cache import TTLCache
+from src.utils.pagination import NEXT_CURSOR_HEADER
+from src.utils.teacher_stats import previous_value
+
+# Corpos serializados das respostas, por rota + parâmetros + usuário + versões
+_response_cache = TTLCache(maxsize=512, ttl=600)
+
+logger = logging.getLogger(__name__)
+
+# Escopos globais cujo incremento pós-commit falhou; reenviados no próximo commit
+_retry_scopes = set()
+_retry_lock = threading.Lock()
+
+# Respostas maiores que isso não são guardadas no cache
+MAX_CACHED_BODY = 1024 * 1024
+
+# Cabeçalhos da resposta original devolvidos também pelas respostas em cache
+CACHED_HEADERS = (NEXT_CURSOR_HEADER,)
+
+def _scopes_for(obj, previous=False):
+    """
+    Escopos afetados pela alteração de um objeto.
+    """
+    value = (lambda attr: previous_value(obj, attr)) if previous else (lambda attr: getattr(obj, attr))
+    model = type(obj)
+
+    if model is Student:
+        return ['students', f'teacher:{value("teacher_id")}']
+    if model is DanceClass:
+        return ['classes', f'teacher:{value("teacher_id")}', f'class:{obj.id}']
+    if model is Payment:
+        return ['payments', f'teacher:{value("teacher_id")}']
+    if model is PrivateClassCombo:
+        return [f'teacher:{value("user_id")}']
+    if model is Attendance:
+        return ['attendance', f'class:{value("class_id")}']
+    if model is User:
+        return ['users']
+    return []
+
+# Chave em Session.info com os escopos globais a incrementar após o commit
+_PENDING_KEY = 'pending_cache_scopes'
+
+def _is_global(scope):
+    """Escopos sem qualificador ("students", "classes"...) são compartilhados por todos."""
+    return ':' not in scope
+
+def _write_versions(scopes, bind=None):
+    rows = [{'scope': scope, 'version': 1} for scope in sorted(scopes)]
+    upsert_increment(CacheVersion, rows, index_elements=['scope'], increment_columns=['version'], bind=bind)
+
+def bump_scopes(*scopes, bind=None, session=None):
+    """
+    Incrementa a versão dos escopos informados.
+    Rotas que gravam via INSERT/UPDATE em lote (sem passar pelo ORM)
+    devem chamá-la explicitamente.
+
+    Escopos por professor/turma são incrementados na transação atual. Os globais
+    ficam pendentes na sessão e são incrementados logo após o commit, em uma
+    transação curta própria: assim a linha compartilhada não fica bloqueada
+    durante a escrita e não serializa gravações de professores diferentes.
+    """
+    scopes = set(scopes)
+    global_scopes = {scope for scope in scopes if _is_global(scope)}
+    if scopes - global_scopes:
+        _write_versions(scopes - global_scopes, bind=bind)
+    if global_scopes:
+        (session or db.session).info.setdefault(_PENDING_KEY, set()).update(global_scopes)
+
+def _after_flush(session, flush_context):
+    scopes = set()
+    for obj in session.new:
+        scopes.update(_scopes_for(obj))
+    for obj in session.deleted:
+        scopes.update(_scopes_for(obj, previous=True))
+    for obj in session.dirty:
+        if session.is_modified(obj):
+            scopes.update(_scopes_for(obj))
+            scopes.update(_scopes_for(obj, previous=True))
+    if scopes:
+        bump_scopes(*scopes, bind=session.connection(), session=session)
+
+def _after_commit(session):
+    """
+    Incrementa os escopos globais pendentes. Os dados já foram confirmados:
+    uma falha aqui (por exemplo, banco ocupado) não pode chegar à rota, que
+    responderia erro para uma gravação bem-sucedida. O erro é registrado e os
+    escopos são reenviados no próximo commit do processo; enquanto isso, o
+    cache local é descartado para este worker não servir a versão antiga.
+    """
+    pending = session.info.pop(_PENDING_KEY, None) or set()
+    with _retry_lock:
+        pending |= _retry_scopes
+        _retry_scopes.clear()
+    if not pending:
+        return
+    try:
+        with session.get_bind().begin() as connection:
+            _write_versions(pending, bind=connection)
+    except Exception:
+        logger.exception('Falha ao incrementar as versões de cache %s', sorted(pending))
+        with _retry_lock:
+            _retry_scopes.update(pending)
+        _response_cache.clear()
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+def get_versions(scopes):
+    """
+    Lê as versões atuais dos escopos em uma única consulta por chave primária.
+    """
+    rows = db.session.query(CacheVersion.scope, CacheVersion.version).filter(
+        CacheVersion.scope.in_(scopes)
+    ).all()
+    versions = dict(rows)
+    return tuple(versions.get(scope, 0) for scope in scopes)
+
+def cached_response(scopes):
+    """
+    Decorator de cache para rotas GET.
+
+    `scopes` recebe os argumentos da rota e devolve a lista de escopos dos quais
+    a resposta depende. A ETag é derivada das versões desses escopos: se o cliente
+    enviar a mesma ETag em If-None-Match, a resposta é 304; se o corpo já estiver
+    no cache, ele é devolvido sem executar a rota.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            scope_list = list(scopes(**kwargs))
+            versions = get_versions(scope_list)
+            key = (
+                request.endpoint,
+                request.full_path,
+                get_current_user_id(),
+                tuple(zip(scope_list, versions))
+            )
+            etag = hashlib.sha1(repr(key).encode()).hexdigest()
+
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+
+            cached = _response_cache.get(key)
+            if cached is not None:
+                body, mimetype, headers = cached
+                response = Response(body, status=200, mimetype=mimetype, headers=headers)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                body = response.get_data()
+                if len(body) <= MAX_CACHED_BODY:
+                    headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+                    _response_cache.set(key, (body, response.mimetype, headers))
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return decorated_function
+    return decorator
+
+def init_response_cache(app):
+    """
+    Registra os eventos que incrementam as versões a cada alteração via ORM.
+    """
+    for name, listener in (('after_flush', _after_flush), ('after_commit', _after_commit),
+                           ('after_rollback', _after_rollback)):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
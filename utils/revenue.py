@@ -0,0 +1,185 @@
+import re
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+import click
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+from src.models import db, Payment
+from src.models.revenue_rollup import RevenueRollup
+from src.utils.bulk import upsert_increment
+from src.utils.teacher_stats import previous_value
+
+# Dimensões aceitas no agrupamento dos relatórios
+GROUP_BY_FIELDS = ('month', 'teacher_id', 'payment_type')
+
+MONTH_RE = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+def _month_of(payment_date):
+    return payment_date.strftime('%Y-%m') if payment_date else None
+
+class _RevenueDeltas:
+    def __init__(self):
+        self.items = defaultdict(lambda: [Decimal('0'), 0])
+
+    def add(self, teacher_id, payment_date, payment_type, amount, sign):
+        month = _month_of(payment_date)
+        if not (teacher_id and month and payment_type) or amount is None:
+            return
+        item = self.items[(teacher_id, month, payment_type)]
+        item[0] += sign * Decimal(str(amount))
+        item[1] += sign
+
+    def rows(self):
+        return [{
+            'teacher_id': teacher_id, 'month': month, 'payment_type': payment_type,
+            'revenue': revenue, 'payment_count': count
+        } for (teacher_id, month, payment_type), (revenue, count) in self.items.items() if revenue or count]
+
+_TRACKED = ('teacher_id', 'payment_date', 'payment_type', 'amount')
+
+def _previous_payment(obj):
+    return [previous_value(obj, attr) for attr in _TRACKED]
+
+def _current_payment(obj):
+    return [getattr(obj, attr) for attr in _TRACKED]
+
+def _after_flush(session, flush_context):
+    deltas = _RevenueDeltas()
+    for obj in session.new:
+        if isinstance(obj, Payment):
+            deltas.add(*_current_payment(obj), 1)
+    for obj in session.deleted:
+        if isinstance(obj, Payment):
+            deltas.add(*_previous_payment(obj), -1)
+    for obj in session.dirty:
+        if isinstance(obj, Payment) and session.is_modified(obj):
+            deltas.add(*_previous_payment(obj), -1)
+            deltas.add(*_current_payment(obj), 1)
+
+    upsert_increment(
+        RevenueRollup, deltas.rows(),
+        index_elements=['teacher_id', 'month', 'payment_type'],
+        increment_columns=['revenue', 'payment_count'],
+        bind=session.connection()
+    )
+
+def rebuild_revenue_rollup(bind=None):
+    """
+    Recalcula a tabela de rollup a partir de todos os pagamentos.
+    Retorna a quantidade de linhas gravadas.
+    """
+    executor = bind or db.session
+    table = Payment.__table__
+    deltas = _RevenueDeltas()
+    result = executor.execute(select(
+        table.c.teacher_id, table.c.payment_date, table.c.payment_type, table.c.amount
+    ).execution_options(yield_per=5000))
+    for teacher_id, payment_date, payment_type, amount in result:
+        deltas.add(teacher_id, payment_date, payment_type, amount, 1)
+
+    executor.execute(RevenueRollup.__table__.delete())
+    rows = deltas.rows()
+    if rows:
+        executor.execute(RevenueRollup.__table__.insert(), rows)
+    return len(rows)
+
+def parse_report_params(source, today=None):
+    """
+    Lê e valida os parâmetros do relatório de receita (query string da rota ou
+    parâmetros de um job): start_month e end_month (AAAA-MM; padrão: ano
+    corrente), group_by (lista separada por vírgula) e payment_type.
+    Lança ValueError.
+    """
+    today = today or date.today()
+    start_month = source.get("start_month") or f"{today.year}-01"
+    end_month = source.get("end_month") or today.strftime("%Y-%m")
+    if not MONTH_RE.match(start_month) or not MONTH_RE.match(end_month):
+        raise ValueError("start_month e end_month devem estar no formato AAAA-MM")
+
+    group_by = source.get("group_by") or "month"
+    if isinstance(group_by, str):
+        group_by = group_by.split(",")
+    group_by = [field for field in group_by if field]
+    invalid = [field for field in group_by if field not in GROUP_BY_FIELDS]
+    if invalid:
+        raise ValueError(f"group_by inválido: {', '.join(invalid)}")
+
+    return {
+        "start_month": start_month,
+        "end_month": end_month,
+        "group_by": group_by,
+        "payment_type": source.get("payment_type")
+    }
+
+def revenue_report(start_month, end_month, group_by=('month',), teacher_id=None, payment_type=None):
+    """
+    Receita e quantidade de pagamentos entre start_month e end_month (AAAA-MM,
+    inclusive), agrupadas pelas dimensões de `group_by`. Lê apenas o rollup.
+    """
+    dimensions = [getattr(RevenueRollup, field) for field in group_by]
+    query = db.session.query(
+        *dimensions,
+        func.sum(RevenueRollup.revenue),
+        func.sum(RevenueRollup.payment_count)
+    ).filter(
+        RevenueRollup.month >= start_month,
+        RevenueRollup.month <= end_month
+    )
+    if teacher_id:
+        query = query.filter(RevenueRollup.teacher_id == teacher_id)
+    if payment_type:
+        query = query.filter(RevenueRollup.payment_type == payment_type)
+    if dimensions:
+        query = query.group_by(*dimensions).order_by(*dimensions)
+
+    result = []
+    for row in query.all():
+        item = dict(zip(group_by, row[:len(group_by)]))
+        item['revenue'] = float(row[-2] or 0)
+        item['payment_count'] = int(row[-1] or 0)
+        result.append(item)
+    return result
+
+def year_over_year(year, teacher_id=None):
+    """
+    Receita mês a mês de `year` comparada com o ano anterior.
+    """
+    rows = revenue_report(f'{year - 1}-01', f'{year}-12', ('month',), teacher_id=teacher_id)
+    by_month = {row['month']: row['revenue'] for row in rows}
+
+    months = []
+    for month in range(1, 13):
+        current = by_month.get(f'{year}-{month:02d}', 0.0)
+        previous = by_month.get(f'{year - 1}-{month:02d}', 0.0)
+        months.append({
+            'month': f'{year}-{month:02d}',
+            'revenue': current,
+            'previous_revenue': previous,
+            'growth_rate': round((current - previous) / previous * 100, 2) if previous else None
+        })
+
+    total = sum(item['revenue'] for item in months)
+    previous_total = sum(item['previous_revenue'] for item in months)
+    return {
+        'year': year,
+        'months': months,
+        'total_revenue': total,
+        'previous_total_revenue': previous_total,
+        'growth_rate': round((total - previous_total) / previous_total * 100, 2) if previous_total else None
+    }
+
+@click.command('rebuild-revenue-rollup')
+def rebuild_revenue_rollup_command():
+    """Recalcula o rollup mensal de receita a partir dos pagamentos."""
+    count = rebuild_revenue_rollup()
+    db.session.commit()
+    click.echo(f'{count} linha(s) de rollup gravada(s).')
+
+def init_revenue(app):
+    """
+    Registra a manutenção incremental do rollup e o comando de reconstrução.
+    """
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+    app.cli.add_command(rebuild_revenue_rollup_command)
@@ -0,0 +1,33 @@
+from sqlalchemy import and_, null
+from sqlalchemy.orm import selectinload
+from src.models import db, Student, Attendance, student_classes
+
+def _roster_options():
+    """
+    Relacionamentos de Student carregados antecipadamente (selectinload),
+    para que to_dict não dispare uma consulta lazy por aluno.
+    """
+    return [selectinload(Student.classes)]
+
+def load_roster(class_id, attendance_date=None):
+    """
+    Carrega os alunos matriculados em uma turma em uma única consulta.
+    Se `attendance_date` for informada, o status de presença da data vem na
+    mesma consulta por meio de um OUTER JOIN em (class_id, date).
+    Retorna uma lista de (student, is_present); is_present é None se não houver registro.
+    """
+    query = db.session.query(Student).join(
+        student_classes, student_classes.c.student_id == Student.id
+    ).filter(student_classes.c.class_id == class_id)
+
+    if attendance_date is not None:
+        query = query.outerjoin(Attendance, and_(
+            Attendance.student_id == Student.id,
+            Attendance.class_id == class_id,
+            Attendance.date == attendance_date
+        )).add_columns(Attendance.is_present)
+    else:
+        query = query.add_columns(null())
+
+    rows = query.options(*_roster_options()).order_by(Student.name).all()
+    return [(student, is_present) for student, is_present in rows]
@@ -0,0 +1,227 @@
+import threading
+import zlib
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from sqlalchemy import false, text
+from src.models import db, DanceClass
+from src.utils.response_cache import get_versions
+
+# Primeiro argumento de pg_advisory_xact_lock(int, int) para os locks de horário
+SCHEDULE_LOCK_NAMESPACE = 2517
+
+# Horário de uma turma; start e end em minutos desde 00:00
+Slot = namedtuple('Slot', ['class_id', 'teacher_id', 'name', 'day_of_week', 'location', 'start', 'end'])
+
+# Chaves normalizadas em Python; as comparações de local e dia são feitas sempre
+# sobre elas, nunca com lower() do banco (o do SQLite só converte ASCII)
+def day_key(day_of_week):
+    return str(day_of_week).strip().lower()
+
+def location_key(location):
+    return (location or '').strip().lower()
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+def format_minutes(minutes):
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+class IntervalList:
+    """
+    Intervalos ordenados pelo início, com o maior fim acumulado, para
+    encontrar sobreposições com busca binária: O(log n + k).
+    """
+    def __init__(self, slots):
+        self.slots = sorted(slots, key=lambda slot: (slot.start, slot.end))
+        self.starts = [slot.start for slot in self.slots]
+        self.max_ends = []
+        max_end = -1
+        for slot in self.slots:
+            max_end = max(max_end, slot.end)
+            self.max_ends.append(max_end)
+
+    def overlapping(self, start, end):
+        """
+        Intervalos que se sobrepõem a [start, end). Encostar (fim == início) não conta.
+        """
+        found = []
+        i = bisect_left(self.starts, end) - 1
+        while i >= 0 and self.max_ends[i] > start:
+            if self.slots[i].end > start:
+                found.append(self.slots[i])
+            i -= 1
+        found.reverse()
+        return found
+
+class ScheduleIndex:
+    """
+    Índice de horários das turmas por (local, dia da semana) e por (professor, dia).
+    """
+    def __init__(self, slots):
+        self.slots = slots
+        by_location = defaultdict(list)
+        by_teacher = defaultdict(list)
+        for slot in slots:
+            day = day_key(slot.day_of_week)
+            by_location[(location_key(slot.location), day)].append(slot)
+            by_teacher[(slot.teacher_id, day)].append(slot)
+        self.by_location = {key: IntervalList(items) for key, items in by_location.items()}
+        self.by_teacher = {key: IntervalList(items) for key, items in by_teacher.items()}
+        self._weeks = {}
+
+    def conflicts_for(self, day_of_week, start, end, location=None, teacher_id=None, exclude_id=None):
+        """
+        Turmas que ocupam o mesmo local ou o mesmo professor no intervalo.
+        Retorna uma lista de (motivo, Slot), com motivo 'location' ou 'teacher'.
+        """
+        day = day_key(day_of_week)
+        found = []
+        seen = set()
+        lookups = []
+        if location:
+            lookups.append(('location', self.by_location.get((location_key(location), day))))
+        if teacher_id:
+            lookups.append(('teacher', self.by_teacher.get((teacher_id, day))))
+        for reason, intervals in lookups:
+            if intervals is None:
+                continue
+            for slot in intervals.overlapping(start, end):
+                if slot.class_id != exclude_id and (reason, slot.class_id) not in seen:
+                    seen.add((reason, slot.class_id))
+                    found.append((reason, slot))
+        return found
+
+    def all_conflicts(self, teacher_id=None):
+        """
+        Todos os pares de turmas sobrepostas no mesmo local ou com o mesmo professor.
+        Com `teacher_id`, apenas os pares que envolvem turmas desse professor.
+        """
+        pairs = []
+        for reason, index in (('location', self.by_location), ('teacher', self.by_teacher)):
+            for intervals in index.values():
+                for i, slot in enumerate(intervals.slots):
+                    # Só os intervalos que começam depois, para listar cada par uma vez
+                    for other in intervals.slots[i + 1:]:
+                        if other.start >= slot.end:
+                            break
+                        if teacher_id and teacher_id not in (slot.teacher_id, other.teacher_id):
+                            continue
+                        pairs.append((reason, slot, other))
+        return pairs
+
+    def week(self, teacher_id=None):
+        """
+        Grade semanal (dia -> turmas ordenadas por horário), montada uma vez por
+        versão do índice e filtro de professor.
+        """
+        if teacher_id not in self._weeks:
+            grid = defaultdict(list)
+            for slot in sorted(self.slots, key=lambda slot: (slot.start, slot.end, slot.name or '')):
+                if teacher_id is None or slot.teacher_id == teacher_id:
+                    grid[str(slot.day_of_week)].append(slot_to_dict(slot))
+            self._weeks[teacher_id] = dict(grid)
+        return self._weeks[teacher_id]
+
+def slot_to_dict(slot):
+    return {
+        'class_id': slot.class_id,
+        'teacher_id': slot.teacher_id,
+        'name': slot.name,
+        'day_of_week': slot.day_of_week,
+        'location': slot.location,
+        'start_time': format_minutes(slot.start),
+        'end_time': format_minutes(slot.end)
+    }
+
+def public_slot_dict(slot):
+    """
+    Apenas horário e local, para turmas de outros professores.
+    """
+    return {
+        'day_of_week': slot.day_of_week,
+        'location': slot.location,
+        'start_time': format_minutes(slot.start),
+        'end_time': format_minutes(slot.end)
+    }
+
+def build_index(*criteria):
+    owner = DanceClass.teacher_id
+    rows = db.session.query(
+        DanceClass.id, owner, DanceClass.name, DanceClass.day_of_week,
+        DanceClass.location, DanceClass.start_time, DanceClass.end_time
+    ).filter(*criteria).all()
+    return ScheduleIndex([
+        Slot(class_id, teacher_id, name, day_of_week, location, to_minutes(start_time), to_minutes(end_time))
+        for class_id, teacher_id, name, day_of_week, location, start_time, end_time in rows
+        if start_time and end_time
+    ])
+
+_lock = threading.Lock()
+_cached = {'version': None, 'index': None}
+
+def get_schedule_index():
+    """
+    Índice de horários local ao processo. É reconstruído quando a versão do
+    escopo "classes" muda, o que acontece em toda criação, alteração ou
+    exclusão de turma (src/utils/response_cache.py), em qualquer worker.
+    """
+    # Sem autoflush: alterações pendentes da requisição não entram no índice
+    with db.session.no_autoflush:
+        version = get_versions(['classes'])[0]
+        with _lock:
+            if _cached['index'] is None or _cached['version'] != version:
+                _cached['index'] = build_index()
+                _cached['version'] = version
+            return _cached['index']
+
+def find_conflicts(day_of_week, start_time, end_time, location, teacher_id, exclude_id=None):
+    """
+    Conflitos de um horário candidato (usado na criação e alteração de turmas).
+    Retorna uma lista de dicionários com o motivo e a turma conflitante.
+    """
+    index = get_schedule_index()
+    return [
+        dict(reason=reason, **public_slot_dict(slot))
+        for reason, slot in index.conflicts_for(
+            day_of_week, to_minutes(start_time), to_minutes(end_time),
+            location=location, teacher_id=teacher_id, exclude_id=exclude_id
+        )
+    ]
+
+def lock_slot(day_of_week, location, teacher_id):
+    """
+    Serializa, até o fim da transação atual, as gravações de turmas no mesmo
+    (local, dia) e do mesmo (professor, dia). No PostgreSQL usa advisory locks
+    de transação, sempre na mesma ordem; no SQLite, que só tem um escritor,
+    antecipa o lock de escrita do banco.
+    """
+    if db.session.get_bind().dialect.name != 'postgresql':
+        db.session.execute(DanceClass.__table__.delete().where(false()))
+        return
+    day = day_key(day_of_week)
+    names = {f'location:{location_key(location)}:{day}', f'teacher:{teacher_id}:{day}'}
+    # crc32 cabe em 32 bits; deslocado para o intervalo de int com sinal
+    keys = sorted(zlib.crc32(name.encode('utf-8')) - 2**31 for name in names)
+    for key in keys:
+        db.session.execute(
+            text('SELECT pg_advisory_xact_lock(:namespace, :key)'),
+            {'namespace': SCHEDULE_LOCK_NAMESPACE, 'key': key}
+        )
+
+def check_slot(day_of_week, start_time, end_time, location, teacher_id, exclude_id=None):
+    """
+    Como find_conflicts, mas para gravar: trava o horário com lock_slot e lê as
+    turmas direto do banco, já que o índice em cache só muda depois do commit
+    de quem gravou antes. Os locais são comparados em Python (location_key).
+    Chame na mesma transação do INSERT/UPDATE da turma.
+    """
+    with db.session.no_autoflush:
+        lock_slot(day_of_week, location, teacher_id)
+        index = build_index()
+    return [
+        dict(reason=reason, **public_slot_dict(slot))
+        for reason, slot in index.conflicts_for(
+            day_of_week, to_minutes(start_time), to_minutes(end_time),
+            location=location, teacher_id=teacher_id, exclude_id=exclude_id
+        )
+    ]
@@ -0,0 +1,91 @@
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from flask import Response
+from sqlalchemy import inspect
+from sqlalchemy.types import Date, DateTime, Numeric, Time
+from src.models import Payment
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional; sem ele usamos o json da biblioteca padrão
+    orjson = None
+
+def _default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f'Tipo não serializável: {type(value).__name__}')
+
+def dumps(data):
+    """
+    Codifica em JSON (bytes), com orjson quando disponível.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def json_response(data, status=200):
+    """
+    Equivalente a jsonify usando o codificador rápido.
+    """
+    return Response(dumps(data), status=status, mimetype='application/json')
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+def _to_float(value):
+    return float(value) if value else None
+
+def _converter_for(column):
+    if isinstance(column.type, (Date, DateTime, Time)):
+        return _isoformat
+    if isinstance(column.type, Numeric):
+        return _to_float
+    return None
+
+class Schema:
+    """
+    Serializador compilado de um modelo: as colunas e as conversões de cada
+    campo são resolvidas uma única vez, e as linhas vêm como tuplas de
+    Query.with_entities, sem instanciar objetos ORM nem chamar to_dict.
+    """
+
+    def __init__(self, model, fields=None):
+        mapper = inspect(model)
+        columns = {attr.key: attr for attr in mapper.column_attrs}
+        self.model = model
+        self.fields = list(fields or columns)
+        self.entities = [getattr(model, field) for field in self.fields]
+        self.converters = [_converter_for(columns[field].columns[0]) for field in self.fields]
+
+    def row(self, values):
+        return {
+            field: convert(value) if convert and value is not None else value
+            for field, convert, value in zip(self.fields, self.converters, values)
+        }
+
+    def rows(self, query):
+        """
+        Serializa a query lendo apenas as colunas do schema.
+        """
+        return [self.row(values) for values in query.with_entities(*self.entities)]
+
+# Schema compilado na importação; os campos seguem Payment.to_dict
+PAYMENT_SCHEMA = Schema(Payment, [
+    'id', 'student_id', 'teacher_id', 'amount', 'payment_date', 'proof_url',
+    'payment_type', 'notes', 'created_at', 'updated_at'
+])
+
+_schema_cache = {}
+
+def schema_for(model, fields=None):
+    """
+    Schema de um modelo para um conjunto de campos, compilado uma vez e reutilizado.
+    """
+    key = (model, tuple(fields) if fields else None)
+    schema = _schema_cache.get(key)
+    if schema is None:
+        schema = _schema_cache[key] = Schema(model, fields)
+    return schema
@@ -0,0 +1,103 @@
+import mimetypes
+import os
+import re
+from flask import request, send_file, current_app, Response
+from werkzeug.security import safe_join
+from src.utils.cache import TTLCache
+
+# Arquivos com hash hexadecimal de conteúdo no nome (assets/index-3f2a9c1b.js,
+# fotos deduplicadas: 0123abcd...ef_thumb.jpg) nunca mudam de conteúdo.
+# Nomes comuns (favicon.ico, background-image.png) não casam e são revalidados.
+FINGERPRINT_RE = re.compile(r'(?:[-.][0-9a-f]{8,}|^[0-9a-f]{32}(?:_[a-z]+)?)\.[A-Za-z0-9]+$')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Sidecars pré-comprimidos, em ordem de preferência
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+# Resultado de os.stat por caminho; evita acessar o disco a cada requisição
+_stat_cache = TTLCache(maxsize=4096, ttl=int(os.environ.get('STATIC_STAT_TTL', '10')))
+
+def _stat(path):
+    """
+    os.stat com cache. Retorna None se o arquivo não existir.
+    """
+    cached = _stat_cache.get(path, False)
+    if cached is not False:
+        return cached
+    try:
+        result = os.stat(path)
+        result = result if os.path.isfile(path) else None
+    except OSError:
+        result = None
+    _stat_cache.set(path, result)
+    return result
+
+def is_fingerprinted(path):
+    return bool(FINGERPRINT_RE.search(os.path.basename(path)))
+
+def _pick_encoding(full_path):
+    """
+    Escolhe um sidecar .br/.gz existente aceito pelo cliente.
+    """
+    accepted = request.accept_encodings
+    for encoding, suffix in PRECOMPRESSED:
+        if accepted[encoding] and _stat(full_path + suffix):
+            return encoding, full_path + suffix
+    return None, full_path
+
+def _accel_response(path, mimetype):
+    """
+    Delega o envio ao nginx via X-Accel-Redirect, quando STATIC_ACCEL_PREFIX
+    estiver configurado (ex.: /_static/ apontando para a pasta estática).
+    """
+    prefix = current_app.config.get('STATIC_ACCEL_PREFIX')
+    if not prefix:
+        return None
+    response = Response(mimetype=mimetype)
+    response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + path
+    return response
+
+def send_static(root, path, cache_control=None):
+    """
+    Envia um arquivo estático com política de cache, ETag, requisições
+    condicionais e Range (tratados pelo send_file) e suporte a sidecars
+    pré-comprimidos. Retorna None se o arquivo não existir.
+    """
+    full_path = safe_join(root, path)
+    if full_path is None or _stat(full_path) is None:
+        return None
+
+    mimetype = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    encoding, send_path = _pick_encoding(full_path)
+
+    response = _accel_response(os.path.relpath(send_path, root), mimetype)
+    if response is None:
+        response = send_file(send_path, mimetype=mimetype, conditional=True, etag=True)
+
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+
+    if cache_control is None:
+        cache_control = IMMUTABLE_CACHE_CONTROL if is_fingerprinted(path) else REVALIDATE_CACHE_CONTROL
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def init_static(app):
+    """
+    Substitui a rota /static padrão do Flask pela versão com política de cache
+    e configura X-Sendfile quando USE_X_SENDFILE=1.
+    """
+    app.config['STATIC_ACCEL_PREFIX'] = os.environ.get('STATIC_ACCEL_PREFIX')
+    app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', '0') == '1'
+
+    def static(filename):
+        response = send_static(app.static_folder, filename)
+        if response is None:
+            return "Not found", 404
+        return response
+
+    if 'static' in app.view_functions:
+        app.view_functions['static'] = static
@@ -0,0 +1,123 @@
+from datetime import date, timedelta
+from sqlalchemy import func, select
+from src.models import db, Student, DanceClass, Payment, User
+from src.models.billing_status import BillingStatus
+from src.models.revenue_rollup import RevenueRollup
+from src.models.teacher_stats import TeacherStats
+from src.utils.billing import billing_alerts, ensure_fresh
+
+def get_role_counts():
+    """
+    Conta os usuários por papel em uma única consulta agrupada.
+    """
+    rows = db.session.query(User.role, func.count(User.id)).group_by(User.role).all()
+    return {role: count for role, count in rows}
+
+def get_admin_statistics():
+    """
+    Calcula as estatísticas gerais do dashboard administrativo.
+    Usa subconsultas escalares sobre as tabelas pré-calculadas (billing_status,
+    teacher_stats e revenue_rollup), mais uma contagem agrupada por papel em User.
+    Vencidos e próximos do vencimento são os da data atual (billing_status é
+    recalculada uma vez por dia).
+
+    As tabelas materializadas só guardam registros com professor; turmas e
+    pagamentos sem professor entram em uma parcela à parte, contada direto na
+    tabela base (pelos índices de dono), para os totais serem os mesmos da
+    contagem direta.
+    """
+    ensure_fresh()
+
+    # Vencidos e próximos do vencimento contados pelo índice de billing_status
+    overdue = select(func.count()).where(BillingStatus.status == 'overdue').scalar_subquery()
+    due_soon = select(func.count()).where(BillingStatus.status == 'due_soon').scalar_subquery()
+
+    # Totais de turmas e receita lidos das tabelas materializadas (teacher_stats e revenue_rollup)
+    total_classes = select(func.coalesce(func.sum(TeacherStats.class_count), 0)).scalar_subquery()
+    total_revenue = select(func.coalesce(func.sum(RevenueRollup.revenue), 0)).scalar_subquery()
+    # Parcela sem professor, que as tabelas materializadas não registram
+    class_owner = DanceClass.teacher_id
+    unowned_classes = select(func.count()).where(class_owner.is_(None)).scalar_subquery()
+    unowned_revenue = select(func.coalesce(func.sum(Payment.amount), 0)).where(
+        Payment.teacher_id.is_(None)
+    ).scalar_subquery()
+
+    row = db.session.query(
+        func.count(Student.id),
+        overdue,
+        due_soon,
+        total_classes + unowned_classes,
+        total_revenue + unowned_revenue
+    ).one()
+
+    role_counts = get_role_counts()
+
+    return {
+        "total_students": row[0],
+        "total_classes": row[3],
+        "total_teachers": role_counts.get("teacher", 0),
+        "total_admins": role_counts.get("admin", 0),
+        "total_revenue": float(row[4] or 0),
+        "overdue_students_count": row[1],
+        "due_soon_students_count": row[2]
+    }
+
+def get_teacher_statistics(user_id, today=None):
+    """
+    Lê os totais do dashboard de um professor da tabela materializada teacher_stats.
+
+    A receita mensal mantém a regra anterior: pagamentos do mês corrente até
+    `today`, inclusive. O total do mês vem de revenue_rollup e os
+    lançamentos com data futura dentro do mês são descontados. A atribuição ao
+    professor é feita por Payment.teacher_id (antes era o professor do aluno);
+    os dois só divergem em pagamentos lançados por outro professor.
+
+    Professor ainda sem linha em teacher_stats (nenhuma gravação desde a
+    última reconstrução) tem os totais contados direto nas tabelas base.
+    """
+    today = today or date.today()
+    month_start = today.replace(day=1)
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+
+    # Uma linha de teacher_stats e as do mês em revenue_rollup (uma por tipo), lidas juntas
+    monthly_revenue = select(func.sum(RevenueRollup.revenue)).where(
+        RevenueRollup.teacher_id == user_id,
+        RevenueRollup.month == today.strftime('%Y-%m')
+    ).scalar_subquery()
+    # Pagamentos do mês com data posterior a hoje (índice em teacher_id, payment_date)
+    future_revenue = select(func.coalesce(func.sum(Payment.amount), 0)).where(
+        Payment.teacher_id == user_id,
+        Payment.payment_date > today,
+        Payment.payment_date < next_month
+    ).scalar_subquery()
+
+    student_count = select(TeacherStats.student_count).where(TeacherStats.teacher_id == user_id).scalar_subquery()
+    class_count = select(TeacherStats.class_count).where(TeacherStats.teacher_id == user_id).scalar_subquery()
+
+    row = db.session.query(student_count, class_count, monthly_revenue, future_revenue).one()
+    total_students, total_classes = row[0], row[1]
+    if total_students is None:
+        total_students = db.session.query(func.count(Student.id)).filter(
+            Student.teacher_id == user_id
+        ).scalar()
+        total_classes = db.session.query(func.count(DanceClass.id)).filter(
+            DanceClass.teacher_id == user_id
+        ).scalar()
+
+    return {
+        "total_students": total_students,
+        "total_classes": total_classes,
+        "monthly_revenue": float(row[2] or 0) - float(row[3] or 0)
+    }
+
+def get_billing_notifications(user_id):
+    """
+    Lê de billing_status, em uma única consulta indexada, os alunos vencidos e
+    próximos do vencimento de um professor na data atual, separando as duas
+    listas em memória.
+    """
+    alerts = billing_alerts(teacher_id=user_id)
+
+    overdue_students = [student for status, student in alerts if status.status == 'overdue']
+    due_soon_students = [student for status, student in alerts if status.status == 'due_soon']
+    return overdue_students, due_soon_students
@@ -0,0 +1,155 @@
+from collections import defaultdict
+import click
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import Session
+from src.models import db, Student, DanceClass
+from src.models.private_class_combo import PrivateClassCombo
+from src.models.teacher_stats import TeacherStats
+from src.utils.bulk import upsert_increment
+
+# Coluna de dono de cada modelo e contador de TeacherStats que ela alimenta
+COUNTED_MODELS = {
+    Student: ('teacher_id', 'student_count'),
+    DanceClass: ('teacher_id', 'class_count'),
+    PrivateClassCombo: ('user_id', 'combo_count'),
+}
+COUNTER_COLUMNS = [column for _, column in COUNTED_MODELS.values()]
+
+def previous_value(obj, attr):
+    """
+    Valor do atributo antes das alterações pendentes no flush.
+    """
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, attr)
+
+def _changed(obj, *attrs):
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+class _Deltas:
+    """
+    Acumula as variações de contadores de um flush. A receita por professor e
+    mês fica no rollup de src/utils/revenue.py.
+    """
+    def __init__(self):
+        self.counts = defaultdict(lambda: defaultdict(int))
+
+    def count(self, teacher_id, column, delta):
+        if teacher_id:
+            self.counts[teacher_id][column] += delta
+
+    def apply(self, connection):
+        count_rows = []
+        for teacher_id, columns in self.counts.items():
+            row = {'teacher_id': teacher_id, 'student_count': 0, 'class_count': 0, 'combo_count': 0}
+            row.update(columns)
+            if any(row[column] for column in COUNTER_COLUMNS):
+                count_rows.append(row)
+        upsert_increment(
+            TeacherStats, count_rows,
+            index_elements=['teacher_id'],
+            increment_columns=COUNTER_COLUMNS,
+            bind=connection
+        )
+
+def collect_deltas(session):
+    """
+    Calcula as variações a partir dos objetos novos, alterados e removidos da sessão.
+    """
+    deltas = _Deltas()
+
+    for obj in session.new:
+        if type(obj) in COUNTED_MODELS:
+            attr, column = COUNTED_MODELS[type(obj)]
+            deltas.count(getattr(obj, attr), column, 1)
+
+    for obj in session.deleted:
+        if type(obj) in COUNTED_MODELS:
+            attr, column = COUNTED_MODELS[type(obj)]
+            deltas.count(previous_value(obj, attr), column, -1)
+
+    for obj in session.dirty:
+        if type(obj) in COUNTED_MODELS:
+            attr, column = COUNTED_MODELS[type(obj)]
+            if _changed(obj, attr):
+                deltas.count(previous_value(obj, attr), column, -1)
+                deltas.count(getattr(obj, attr), column, 1)
+
+    return deltas
+
+def _after_flush(session, flush_context):
+    deltas = collect_deltas(session)
+    deltas.apply(session.connection())
+
+def compute_teacher_stats(bind=None):
+    """
+    Recalcula os contadores por professor a partir das tabelas base.
+    """
+    executor = bind or db.session
+    counts = defaultdict(lambda: {column: 0 for column in COUNTER_COLUMNS})
+    for model, (attr, column) in COUNTED_MODELS.items():
+        teacher_column = getattr(model, attr)
+        rows = executor.execute(select(teacher_column, func.count()).group_by(teacher_column)).all()
+        for teacher_id, total in rows:
+            if teacher_id:
+                counts[teacher_id][column] = total
+    return counts
+
+def rebuild_teacher_stats(bind=None):
+    """
+    Reconstrói teacher_stats a partir das tabelas base.
+    Retorna a lista de divergências encontradas em relação ao estado anterior.
+    A transação fica a cargo de quem chama (comando de reparo ou migration).
+    """
+    executor = bind or db.session
+    counts = compute_teacher_stats(bind)
+    stats_table = TeacherStats.__table__
+
+    drift = []
+    stored_counts = {row.teacher_id: row for row in executor.execute(select(stats_table))}
+    for teacher_id in set(counts) | set(stored_counts):
+        expected = counts.get(teacher_id, {column: 0 for column in COUNTER_COLUMNS})
+        stored = stored_counts.get(teacher_id)
+        for column, value in expected.items():
+            current = getattr(stored, column) if stored else 0
+            if current != value:
+                drift.append({'teacher_id': teacher_id, 'field': column, 'stored': current, 'expected': value})
+
+    executor.execute(stats_table.delete())
+    if counts:
+        executor.execute(stats_table.insert(), [
+            dict(teacher_id=teacher_id, **columns) for teacher_id, columns in counts.items()
+        ])
+    return drift
+
+def get_stats_for_teacher(teacher_id):
+    """
+    Lê os totais materializados de um professor (zeros se ainda não houver linha).
+    """
+    stats = db.session.get(TeacherStats, teacher_id)
+    if stats:
+        return stats.to_dict()
+    return TeacherStats(teacher_id=teacher_id, student_count=0, class_count=0, combo_count=0).to_dict()
+
+@click.command('repair-teacher-stats')
+def repair_teacher_stats_command():
+    """Reconstrói teacher_stats a partir das tabelas base e relata divergências."""
+    drift = rebuild_teacher_stats()
+    db.session.commit()
+    if not drift:
+        click.echo('teacher_stats consistente: nenhuma divergência encontrada.')
+        return
+    click.echo(f'{len(drift)} divergência(s) corrigida(s):')
+    for item in drift:
+        click.echo(f"  {item['teacher_id']} {item['field']}: {item['stored']} -> {item['expected']}")
+
+def init_teacher_stats(app):
+    """
+    Registra os eventos de manutenção incremental e o comando de reparo.
+    A carga inicial sobre um banco já existente é feita pela migration 0009.
+    """
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+    app.cli.add_command(repair_teacher_stats_command)
@@ -0,0 +1,151 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from src.models.user import db
+from src.models.revoked_token import RevokedToken
+
+# Validade dos tokens de acesso
+TOKEN_TTL = timedelta(hours=int(os.environ.get('AUTH_TOKEN_TTL_HOURS', '12')))
+
+# Intervalo máximo (segundos) até um worker enxergar revogações feitas por outro
+REVOCATION_SYNC_SECONDS = int(os.environ.get('AUTH_REVOCATION_SYNC_SECONDS', '10'))
+
+TOKEN_VERSION = 'v1'
+
+def _secret():
+    """
+    Chave do HMAC: AUTH_TOKEN_SECRET ou, na falta dela, a SECRET_KEY da aplicação.
+    """
+    secret = os.environ.get('AUTH_TOKEN_SECRET') or current_app.config['SECRET_KEY']
+    return secret.encode()
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+def _b64decode(value):
+    return base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+
+def _sign(payload):
+    return _b64encode(hmac.new(_secret(), f'{TOKEN_VERSION}.{payload}'.encode(), hashlib.sha256).digest())
+
+def issue_token(user):
+    """
+    Emite um token assinado com id, papel, nome e validade do usuário.
+    Retorna (token, data de expiração).
+    """
+    now = time.time()
+    expires_at = int(now) + int(TOKEN_TTL.total_seconds())
+    claims = {
+        'sub': user.id,
+        'role': user.role,
+        'name': user.name,
+        'iat': round(now, 3),
+        'exp': expires_at,
+        'jti': secrets.token_hex(8)
+    }
+    payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode())
+    return f'{TOKEN_VERSION}.{payload}.{_sign(payload)}', datetime.utcfromtimestamp(expires_at)
+
+def decode_token(token):
+    """
+    Verifica assinatura, validade e revogação do token, sem acessar o banco
+    (exceto pela sincronização periódica da lista de revogação).
+    Retorna as claims. Lança ValueError se o token for inválido.
+    """
+    try:
+        version, payload, signature = token.split('.')
+    except (AttributeError, ValueError):
+        raise ValueError('Token malformado')
+    if version != TOKEN_VERSION:
+        raise ValueError('Versão de token não suportada')
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise ValueError('Assinatura inválida')
+
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        raise ValueError('Token malformado')
+    if claims.get('exp', 0) < time.time():
+        raise ValueError('Token expirado')
+    if _revocations.is_revoked(claims):
+        raise ValueError('Token revogado')
+    return claims
+
+class _RevocationList:
+    """
+    Cópia em memória da tabela revoked_token. As consultas são feitas em
+    memória; o banco é lido apenas a cada REVOCATION_SYNC_SECONDS.
+
+    Cada sincronização relê todas as revogações ainda não expiradas (a tabela
+    é pequena: cleanup_revocations remove as vencidas). Uma marca d'água por id
+    perderia linhas confirmadas fora da ordem dos ids no PostgreSQL.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jtis = {}
+        self._users = {}
+        self._synced_at = 0.0
+
+    def sync(self, force=False):
+        if not force and time.monotonic() - self._synced_at < REVOCATION_SYNC_SECONDS:
+            return
+        with self._lock:
+            rows = db.session.query(
+                RevokedToken.jti, RevokedToken.user_id, RevokedToken.revoked_at, RevokedToken.expires_at
+            ).filter(RevokedToken.expires_at > datetime.utcnow()).all()
+            jtis, users = {}, {}
+            for jti, user_id, revoked_at, expires_at in rows:
+                if jti:
+                    jtis[jti] = _utc_timestamp(expires_at)
+                if user_id:
+                    users[user_id] = max(users.get(user_id, 0), _utc_timestamp(revoked_at))
+            # Troca as duas cópias de uma vez; leituras concorrentes veem a anterior ou a nova
+            self._jtis, self._users = jtis, users
+            self._synced_at = time.monotonic()
+
+    def is_revoked(self, claims):
+        self.sync()
+        if claims.get('jti') in self._jtis:
+            return True
+        revoked_before = self._users.get(claims.get('sub'))
+        return revoked_before is not None and claims.get('iat', 0) <= revoked_before
+
+def _utc_timestamp(value):
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+_revocations = _RevocationList()
+
+def revoke_token(claims):
+    """
+    Revoga um token específico (logout).
+    """
+    db.session.add(RevokedToken(
+        jti=claims['jti'],
+        expires_at=datetime.utcfromtimestamp(claims['exp'])
+    ))
+    db.session.commit()
+    _revocations.sync(force=True)
+
+def revoke_user_tokens(user_id):
+    """
+    Revoga todos os tokens já emitidos para um usuário. Deve ser chamada quando
+    o papel do usuário mudar ou quando ele for excluído.
+    """
+    db.session.add(RevokedToken(user_id=user_id, expires_at=datetime.utcnow() + TOKEN_TTL))
+    db.session.commit()
+    _revocations.sync(force=True)
+
+def cleanup_revocations():
+    """
+    Remove revogações de tokens que já expiraram. Retorna a quantidade removida.
+    """
+    removed = RevokedToken.query.filter(RevokedToken.expires_at <= datetime.utcnow()).delete()
+    db.session.commit()
+    return removed